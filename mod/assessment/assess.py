@@ -6,25 +6,96 @@ import sys
 import os
 import tempfile
 import subprocess
-import urllib.request
 import shutil
 from typing import Dict, List, Optional, Tuple
 import numpy as np
-import soundfile as sf
-import librosa
 
 # Add parent directory to path to import shared modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from shared.audio import load_audio
-from edit_distance import edit_operations
+from shared.audio import AudioClip, download_bytes
+from shared.powsm import load_powsm, PowsmTask, shared_encoder, encode_batch, ctc_log_posteriors, quantize_int8, QUANTIZE_INT8
+from shared.batching import EncoderBatcher
+from shared.phonemes import get_inventory, parse_ipa_lattice, parse_ipa_phonemes
+from shared.tracing import DEBUG, Trace, current_trace, span
+from edit_distance import edit_operations, hierarchical_edit_operations, lattice_edit_operations, operation_word_indices
+from target_ipa_store import get_target_ipa_store, lookup_target_ipa
+from result_cache import get_result_cache, cache_key, MODEL_VERSION
+from mfa_aligner import get_mfa_aligner, mfa_environment
+from ctc_alignment import ctc_forced_align, spans_to_alignments
+
+# Phone comparison: "global" (one DP over the whole passage) or "hierarchical"
+# (word by word, when the target IPA is word-segmented)
+PHONE_ALIGNMENT_MODE = os.environ.get("ASSESSMENT_PHONE_ALIGNMENT", "global")
+
+# Timestamp source: "auto" (MFA if installed, else estimated), "mfa", "ctc" or
+# "estimated". CTC forced alignment is opt-in: set "ctc" to use it instead of MFA
+ALIGNMENT_MODE = os.environ.get("ASSESSMENT_ALIGNMENT", "auto")
+
+# Long-form mode: recordings longer than LONG_FORM_SECONDS are split at pauses
+# into segments of at most MAX_SEGMENT_SECONDS (POWSM pads or trims every
+# input to 30s), recognized LONG_FORM_BATCH segments per encoder pass
+LONG_FORM_SECONDS = float(os.environ.get("ASSESSMENT_LONG_FORM_SECONDS", "30"))
+MAX_SEGMENT_SECONDS = float(os.environ.get("ASSESSMENT_MAX_SEGMENT_SECONDS", "25"))
+LONG_FORM_BATCH = int(os.environ.get("ASSESSMENT_LONG_FORM_BATCH", "4"))
+# Longer recordings are rejected before any model pass (0 disables the cap)
+MAX_LONG_FORM_SECONDS = float(os.environ.get("ASSESSMENT_MAX_LONG_FORM_SECONDS", "300"))
+
+# Crop leading/trailing silence (outside the detected speech region plus
+# TRIM_MARGIN_SECONDS) before any model pass
+TRIM_SILENCE = os.environ.get("ASSESSMENT_TRIM_SILENCE", "1") != "0"
+TRIM_MARGIN_SECONDS = float(os.environ.get("ASSESSMENT_TRIM_MARGIN_SECONDS", "0.2"))
 
 
 # ============================================================================
 # SIGNAL QUALITY CHECKS
 # ============================================================================
 
-def check_signal_quality(audio: np.ndarray, sample_rate: int) -> Dict:
+def analyze_frames(audio: np.ndarray, sample_rate: int) -> Dict:
+    """
+    Compute per-frame energy and RMS for the whole signal in one pass.
+    
+    Uses 25ms frames with a 10ms hop. Frames are strided views into the
+    signal (no per-frame copies); audio shorter than one frame yields a
+    single partial frame. Shared by check_signal_quality() and
+    estimate_speech_boundaries().
+    
+    Args:
+        audio: Audio samples as numpy array (mono)
+        sample_rate: Sample rate in Hz
+    
+    Returns:
+        Dict with:
+        - energies: np.ndarray (sum of squares per frame)
+        - rms: np.ndarray (RMS per frame)
+        - frame_times: np.ndarray (frame start times in seconds)
+        - frame_size: int (samples per frame)
+        - hop_size: int (samples between frame starts)
+    """
+    frame_size = int(0.025 * sample_rate)  # 25ms frames
+    hop_size = int(0.010 * sample_rate)    # 10ms hop
+    
+    if len(audio) >= frame_size:
+        frames = np.lib.stride_tricks.sliding_window_view(audio, frame_size)[::hop_size]
+        frame_lengths = frame_size
+    else:
+        frames = audio[np.newaxis, :]
+        frame_lengths = max(1, len(audio))
+    
+    energies = np.einsum('ij,ij->i', frames, frames, dtype=np.float64)
+    rms = np.sqrt(energies / frame_lengths)
+    frame_times = np.arange(len(energies)) * hop_size / sample_rate
+    
+    return {
+        "energies": energies,
+        "rms": rms,
+        "frame_times": frame_times,
+        "frame_size": frame_size,
+        "hop_size": hop_size,
+    }
+
+
+def check_signal_quality(audio: np.ndarray, sample_rate: int, frames: Optional[Dict] = None) -> Dict:
     """
     Analyze audio signal quality and return metrics.
     
@@ -34,9 +105,13 @@ def check_signal_quality(audio: np.ndarray, sample_rate: int) -> Dict:
     - Silence ratio (percentage of silent frames)
     - Estimated SNR (signal-to-noise ratio)
     
+    An empty recording is not acceptable and only gets the warning
+    "empty_recording" (same keys as any other result).
+    
     Args:
         audio: Audio samples as numpy array (mono, normalized to [-1, 1])
         sample_rate: Sample rate in Hz
+        frames: Precomputed analyze_frames() result for this audio (optional)
     
     Returns:
         Dict with:
@@ -46,6 +121,7 @@ def check_signal_quality(audio: np.ndarray, sample_rate: int) -> Dict:
         - clipping_ratio: float (ratio of clipped samples)
         - silence_ratio: float (ratio of silent frames)
         - snr_estimate_db: float (estimated SNR in dB)
+        - duration_seconds: float
         - warnings: List[str] (quality issues found)
         - suggestions: List[str] (how to fix issues)
     """
@@ -60,6 +136,20 @@ def check_signal_quality(audio: np.ndarray, sample_rate: int) -> Dict:
     if audio.dtype != np.float32 and audio.dtype != np.float64:
         audio = audio.astype(np.float32) / np.iinfo(audio.dtype).max
     
+    # Empty upload: nothing to measure
+    if len(audio) == 0:
+        return {
+            "is_acceptable": False,
+            "quality_score": 0.0,
+            "rms_db": -200.0,
+            "clipping_ratio": 0.0,
+            "silence_ratio": 1.0,
+            "snr_estimate_db": 0.0,
+            "duration_seconds": 0.0,
+            "warnings": ["empty_recording"],
+            "suggestions": ["No audio was captured, check the microphone and record again"],
+        }
+    
     # 1. RMS Level
     rms = np.sqrt(np.mean(audio ** 2))
     rms_db = 20 * np.log10(rms + 1e-10)  # Add epsilon to avoid log(0)
@@ -88,24 +178,19 @@ def check_signal_quality(audio: np.ndarray, sample_rate: int) -> Dict:
         suggestions.append("Consider reducing recording volume slightly")
     
     # 3. Silence Detection (using frame-based energy)
-    frame_size = int(0.025 * sample_rate)  # 25ms frames
-    hop_size = int(0.010 * sample_rate)    # 10ms hop
-    
-    num_frames = max(1, (len(audio) - frame_size) // hop_size + 1)
-    frame_energies = []
-    
-    for i in range(num_frames):
-        start = i * hop_size
-        end = min(start + frame_size, len(audio))
-        frame = audio[start:end]
-        energy = np.sum(frame ** 2)
-        frame_energies.append(energy)
-    
-    frame_energies = np.array(frame_energies)
-    
-    # Consider frames with energy < 1% of max as silence
-    energy_threshold = np.max(frame_energies) * 0.01 if len(frame_energies) > 0 else 0
-    silent_frames = np.sum(frame_energies < energy_threshold)
+    if frames is None:
+        frames = analyze_frames(audio, sample_rate)
+    frame_energies = frames["energies"]
+    
+    # Consider frames with energy < 1% of max as silence. A recording whose
+    # loudest frame is below -80 dBFS RMS (e.g. all zeros) is silent
+    # throughout; anything louder keeps the relative threshold
+    digital_silence = (10 ** (-80 / 20)) ** 2 * frames["frame_size"]
+    peak_energy = np.max(frame_energies) if len(frame_energies) > 0 else 0
+    if peak_energy < digital_silence:
+        silent_frames = len(frame_energies)
+    else:
+        silent_frames = np.sum(frame_energies < peak_energy * 0.01)
     silence_ratio = silent_frames / max(1, len(frame_energies))
     
     if silence_ratio > 0.7:
@@ -141,9 +226,13 @@ def check_signal_quality(audio: np.ndarray, sample_rate: int) -> Dict:
     if duration < 0.5:
         warnings.append("too_short")
         suggestions.append("Recording is very short, speak longer for better analysis")
-    elif duration > 30:
+    elif duration > 30 and LONG_FORM_SECONDS <= 0:
         warnings.append("too_long")
         suggestions.append("Recording is long, consider shorter segments for faster processing")
+    elif LONG_FORM_SECONDS > 0 and 0 < MAX_LONG_FORM_SECONDS < duration:
+        # Beyond what long-form mode accepts: not assessed at all
+        warnings.append("too_long")
+        suggestions.append(f"Recording is longer than {MAX_LONG_FORM_SECONDS:.0f} seconds, record a shorter passage")
     
     # Calculate overall quality score
     quality_score = 1.0
@@ -174,6 +263,8 @@ def check_signal_quality(audio: np.ndarray, sample_rate: int) -> Dict:
     
     # Determine if acceptable
     is_acceptable = quality_score >= 0.5 and "mostly_silence" not in warnings
+    if LONG_FORM_SECONDS > 0 and 0 < MAX_LONG_FORM_SECONDS < duration:
+        is_acceptable = False
     
     return {
         "is_acceptable": is_acceptable,
@@ -201,10 +292,11 @@ def estimate_phoneme_timestamps(
     """
     Estimate timestamps for phonemes when MFA is not available.
     
-    Uses proportional distribution based on phoneme complexity:
-    - Vowels and diphthongs: longer duration (weight 1.5)
-    - Consonants: shorter duration (weight 1.0)
-    - Stops and affricates: very short (weight 0.7)
+    Uses proportional distribution based on phoneme complexity, with the
+    duration weights of the shared phoneme inventory (shared.phonemes):
+    - Vowels and diphthongs: longer duration (weight 1.5-1.8)
+    - Consonants: shorter duration (weight 0.9-1.2)
+    - Stops: very short (weight 0.7)
     
     Args:
         phonemes: List of IPA phoneme strings
@@ -223,44 +315,9 @@ def estimate_phoneme_timestamps(
     
     speech_duration = speech_end - speech_start
     
-    # Phoneme duration weights based on type
-    vowels = set("aɑæɐeɛəɜiɪoɔuʊʌyœøɨʉɯɤɵɞ")
-    diphthongs = {"aɪ", "eɪ", "ɔɪ", "aʊ", "oʊ", "ɪə", "eə", "ʊə"}
-    stops = set("pbtdkgʔ")
-    affricates = {"tʃ", "dʒ", "ts", "dz"}
-    nasals = set("mnŋɲɱ")
-    approximants = set("wjɹlɾɻ")
-    fricatives = set("fvθðszʃʒhxɣçʁχħʕ")
-    
-    # Calculate weights for each phoneme
-    weights = []
-    for p in phonemes:
-        p_lower = p.lower()
-        
-        if p_lower in diphthongs or len(p) > 1 and any(c in vowels for c in p):
-            # Diphthongs and complex vowels
-            weights.append(1.8)
-        elif p_lower in vowels or any(c in vowels for c in p_lower):
-            # Simple vowels
-            weights.append(1.5)
-        elif p_lower in affricates:
-            # Affricates (two-part sounds)
-            weights.append(1.2)
-        elif p_lower in nasals or any(c in nasals for c in p_lower):
-            # Nasals
-            weights.append(1.1)
-        elif p_lower in approximants or any(c in approximants for c in p_lower):
-            # Approximants
-            weights.append(1.0)
-        elif p_lower in fricatives or any(c in fricatives for c in p_lower):
-            # Fricatives
-            weights.append(0.9)
-        elif p_lower in stops or any(c in stops for c in p_lower):
-            # Stops (very short)
-            weights.append(0.7)
-        else:
-            # Default weight
-            weights.append(1.0)
+    # Phoneme duration weights by category (table lookup per phone id)
+    phone_ids = get_inventory().scope()
+    weights = phone_ids.duration_weights(phone_ids.encode(phonemes))
     
     # Normalize weights to sum to speech duration
     total_weight = sum(weights)
@@ -287,13 +344,14 @@ def estimate_phoneme_timestamps(
     return alignments
 
 
-def estimate_speech_boundaries(audio: np.ndarray, sample_rate: int) -> Tuple[float, float]:
+def estimate_speech_boundaries(audio: np.ndarray, sample_rate: int, frames: Optional[Dict] = None) -> Tuple[float, float]:
     """
     Estimate speech start and end times from audio using energy analysis.
     
     Args:
         audio: Audio samples as numpy array
         sample_rate: Sample rate in Hz
+        frames: Precomputed analyze_frames() result for this audio (optional)
     
     Returns:
         Tuple of (speech_start, speech_end) in seconds
@@ -305,26 +363,14 @@ def estimate_speech_boundaries(audio: np.ndarray, sample_rate: int) -> Tuple[flo
     duration = len(audio) / sample_rate
     
     # Frame-based energy analysis
-    frame_size = int(0.025 * sample_rate)  # 25ms
-    hop_size = int(0.010 * sample_rate)    # 10ms
-    
-    num_frames = max(1, (len(audio) - frame_size) // hop_size + 1)
-    frame_energies = []
-    frame_times = []
-    
-    for i in range(num_frames):
-        start = i * hop_size
-        end = min(start + frame_size, len(audio))
-        frame = audio[start:end]
-        energy = np.sqrt(np.mean(frame ** 2))
-        frame_energies.append(energy)
-        frame_times.append(start / sample_rate)
-    
-    if not frame_energies:
-        return 0.0, duration
+    if frames is None:
+        frames = analyze_frames(audio, sample_rate)
+    frame_energies = frames["rms"]
+    frame_times = frames["frame_times"]
+    frame_size = frames["frame_size"]
     
-    frame_energies = np.array(frame_energies)
-    frame_times = np.array(frame_times)
+    if len(frame_energies) == 0:
+        return 0.0, duration
     
     # Threshold: 10% of max energy
     threshold = np.max(frame_energies) * 0.1
@@ -345,24 +391,61 @@ def estimate_speech_boundaries(audio: np.ndarray, sample_rate: int) -> Tuple[flo
     return speech_start, speech_end
 
 
-def parse_ipa_phonemes(ipa_phonemes: str) -> List[str]:
+def segment_at_pauses(
+    frames: Dict,
+    sample_rate: int,
+    total_samples: int,
+    max_segment_seconds: float = MAX_SEGMENT_SECONDS,
+    min_pause_seconds: float = 0.2,
+) -> List[Tuple[int, int]]:
     """
-    Parse IPA phonemes from POWSM format (e.g., "/h//ɛ//l//o//ʊ/").
+    Split a recording into segments no longer than max_segment_seconds, cutting in pauses.
+    
+    Uses the energy frames and speech threshold (10% of the loudest frame)
+    of estimate_speech_boundaries(). Each segment ends in the middle of the
+    latest pause of at least min_pause_seconds that keeps it within the
+    limit; without such a pause it is cut at its quietest frame in the
+    second half. Segments are contiguous and cover the whole recording.
     
     Args:
-        ipa_phonemes: IPA string in POWSM format with slashes
+        frames: analyze_frames() result for the recording
+        sample_rate: Sample rate in Hz
+        total_samples: Length of the recording in samples
+        max_segment_seconds: Longest segment
+        min_pause_seconds: Shortest silence that counts as a pause
     
     Returns:
-        List of individual phonemes
+        List of (start_sample, end_sample)
     """
-    # Remove leading/trailing slashes and split
-    cleaned = ipa_phonemes.strip().strip('/')
-    if not cleaned:
-        return []
-    
-    # Split by '//' to get individual phonemes
-    phonemes = [p.strip('/') for p in cleaned.split('//') if p.strip('/')]
-    return phonemes
+    max_samples = int(max_segment_seconds * sample_rate)
+    rms = frames["rms"]
+    hop_size = frames["hop_size"]
+    if total_samples <= max_samples or len(rms) == 0:
+        return [(0, total_samples)]
+    
+    # Silent runs [start, end) in frames; cut candidates at their midpoints
+    silent = np.concatenate(([0], (rms <= np.max(rms) * 0.1).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(silent))
+    run_starts, run_ends = edges[::2], edges[1::2]
+    min_pause_frames = max(1, int(round(min_pause_seconds * sample_rate / hop_size)))
+    pauses = (run_ends - run_starts) >= min_pause_frames
+    cuts = (run_starts[pauses] + run_ends[pauses]) // 2 * hop_size
+    
+    segments = []
+    start = 0
+    while total_samples - start > max_samples:
+        limit = start + max_samples
+        candidates = cuts[(cuts > start + max_samples // 4) & (cuts <= limit)]
+        if len(candidates):
+            cut = int(candidates[-1])
+        else:
+            low = (start + max_samples // 2) // hop_size
+            high = min(len(rms), limit // hop_size)
+            cut = (low + int(np.argmin(rms[low:high]))) * hop_size if high > low else limit
+        segments.append((start, cut))
+        start = cut
+    segments.append((start, total_samples))
+    return segments
 
 
 def powsm_to_mfa_format(powsm_ipa: str) -> str:
@@ -372,11 +455,19 @@ def powsm_to_mfa_format(powsm_ipa: str) -> str:
 
 
 # Singleton model instances (loaded once on worker startup)
+# One POWSM checkpoint is shared by the PR, G2P and ASR task wrappers
+_powsm = None
 _pr_model = None
 _g2p_model = None
 _asr_model = None
 _device = None
 
+# Encoder micro-batcher shared by concurrent jobs (see enable_batching)
+_batcher = None
+
+# (s2t_model, token -> id) of the loaded model's vocabulary (see get_token_ids)
+_token_ids = None
+
 
 def get_device():
     """
@@ -391,13 +482,16 @@ def get_device():
             import torch
             if torch.cuda.is_available():
                 _device = "cuda"
-                print("DEBUG: CUDA available, using GPU")
+                if DEBUG:
+                    print("DEBUG: CUDA available, using GPU")
             else:
                 _device = "cpu"
-                print("DEBUG: CUDA not available, using CPU")
+                if DEBUG:
+                    print("DEBUG: CUDA not available, using CPU")
         except Exception as e:
             _device = "cpu"
-            print(f"DEBUG: Error checking CUDA availability: {e}, using CPU")
+            if DEBUG:
+                print(f"DEBUG: Error checking CUDA availability: {e}, using CPU")
     return _device
 
 
@@ -405,129 +499,511 @@ def get_models(device: Optional[str] = None):
     """
     Load and cache POWSM models for PR, G2P, and ASR tasks.
     
+    The weights are loaded once; the three returned models are per-task
+    decoding wrappers around the same Speech2Text instance.
+    
     Args:
         device: Device to load models on ("cuda" or "cpu"). If None, auto-detect.
         
     Returns:
         Tuple of (pr_model, g2p_model, asr_model)
     """
-    global _pr_model, _g2p_model, _asr_model
+    global _powsm, _pr_model, _g2p_model, _asr_model
     
     # Auto-detect device if not specified
     if device is None:
         device = get_device()
     
-    if _pr_model is None or _g2p_model is None or _asr_model is None:
-        from espnet2.bin.s2t_inference import Speech2Text
-        
-        print(f"DEBUG: Loading POWSM models on device: {device}")
+    if _powsm is None:
+        if DEBUG:
+            print(f"DEBUG: Loading POWSM model on device: {device}")
+        _powsm = load_powsm(device, lang_sym="<eng>", task_sym="<pr>")
+        # The model's phones get permanent ids (see shared.phonemes)
+        get_inventory().add_vocabulary(_powsm.s2t_model.token_list)
+        if QUANTIZE_INT8 and device == "cpu":
+            quantize_int8(_powsm)
+            if DEBUG:
+                print("DEBUG: POWSM encoder/decoder quantized to INT8")
         
         # PR model (Phone Recognition: Audio → IPA)
-        _pr_model = Speech2Text.from_pretrained(
-            "espnet/powsm",
-            device=device,
-            lang_sym="<eng>",
-            task_sym="<pr>",
-        )
+        _pr_model = PowsmTask(_powsm, task_sym="<pr>")
         
         # G2P model (Grapheme-to-Phoneme: Text → IPA)
-        _g2p_model = Speech2Text.from_pretrained(
-            "espnet/powsm",
-            device=device,
-            lang_sym="<eng>",
-            task_sym="<g2p>",
-        )
+        _g2p_model = PowsmTask(_powsm, task_sym="<g2p>")
 
         # ASR model (Automatic Speech Recognition: Audio → Text)
         # Use beam_size=5 for better accuracy (default is usually 3, but higher can help)
-        _asr_model = Speech2Text.from_pretrained(
-            "espnet/powsm",
-            device=device,
-            lang_sym="<eng>",
-            task_sym="<asr>",
-            beam_size=5,  # Increase from default 3 for better accuracy
-        )
+        _asr_model = PowsmTask(_powsm, task_sym="<asr>", beam_size=5)
         
-        print(f"DEBUG: POWSM models loaded successfully on {device}")
+        if DEBUG:
+            print(f"DEBUG: POWSM model loaded successfully on {device}")
     
     return _pr_model, _g2p_model, _asr_model
 
 
-def extract_ipa_from_audio(audio_uri: str, device: Optional[str] = None) -> str:
+def get_powsm(device: Optional[str] = None):
+    """
+    Return the shared Speech2Text behind the PR, G2P and ASR wrappers.
+    
+    Args:
+        device: Device to load models on ("cuda" or "cpu"). If None, auto-detect.
+    """
+    get_models(device)
+    return _powsm
+
+
+def get_token_ids(device: Optional[str] = None) -> Dict[str, int]:
+    """
+    Token to id map of the POWSM vocabulary, built once per loaded model.
+    
+    Args:
+        device: Device to load models on ("cuda" or "cpu"). If None, auto-detect.
+    """
+    global _token_ids
+    s2t_model = get_powsm(device).s2t_model
+    if _token_ids is None or _token_ids[0] is not s2t_model:
+        _token_ids = (s2t_model, {token: i for i, token in enumerate(s2t_model.token_list)})
+    return _token_ids[1]
+
+
+def warm_up_models(speech: np.ndarray, device: Optional[str] = None):
+    """
+    Run every model pass of an assessment once, outside any job.
+    
+    Called at worker startup (see shared.startup) so the first request does
+    not pay for CUDA/cuDNN initialization and allocator growth.
+    
+    Args:
+        speech: 16kHz utterance to decode (output is discarded)
+        device: Device to run inference on ("cuda" or "cpu"). If None, auto-detect.
+    """
+    pr_model, g2p_model, asr_model = get_models(device)
+    powsm = get_powsm(device)
+    with shared_encoder(powsm):
+        pr_model(speech, text_prev="<na>")
+        g2p_model(speech, text_prev="hello")
+        asr_model(speech, text_prev="hello")
+        if resolve_alignment_method() == "ctc":
+            ctc_log_posteriors(powsm, speech, 16000)
+
+
+def enable_batching(window_ms: float = 20.0, max_batch: int = 8, device: Optional[str] = None):
+    """
+    Batch POWSM encoder passes across concurrently running assessments.
+    
+    Once enabled, assess_audio() submits its recording to a shared batcher that
+    waits up to window_ms for other jobs (at most max_batch utterances) and
+    encodes them together; each job then decodes PR, G2P and ASR from its own
+    slice. Only useful when the handler runs several jobs at once.
+    
+    Args:
+        window_ms: How long to hold the first utterance waiting for others
+        max_batch: Maximum utterances per encoder pass
+        device: Device to load models on ("cuda" or "cpu"). If None, auto-detect.
+    """
+    global _batcher
+    if _batcher is None:
+        _batcher = EncoderBatcher(get_powsm(device), window_ms=window_ms, max_batch=max_batch)
+        if DEBUG:
+            print(f"DEBUG: Encoder micro-batching enabled (window {window_ms}ms, max batch {max_batch})")
+    return _batcher
+
+
+def extract_ipa_from_audio(audio: AudioClip, device: Optional[str] = None) -> str:
     """
     Extract IPA transcription from audio using POWSM PR model.
     
     Args:
-        audio_uri: URI to audio file
+        audio: Recording for this request (see fetch_audio)
         device: Device to run inference on ("cuda" or "cpu"). If None, auto-detect.
     
     Returns:
         IPA phonemes string in POWSM format (e.g., "/h//ɛ//l//o//ʊ/")
     """
-    import time
-    
     # Auto-detect device if not specified
     if device is None:
         device = get_device()
     
-    print(f"DEBUG: Starting PR inference on device: {device}")
-    
-    # Download audio from URI
-    download_start = time.time()
-    temp_path, _ = download_audio(audio_uri)
-    download_time = time.time() - download_start
-    print(f"DEBUG: Audio download took {download_time:.2f} seconds")
+    if DEBUG:
+        print(f"DEBUG: Starting PR inference on device: {device}")
     
-    try:
-    # Load audio using librosa (handles WebM, WAV, MP3, etc. via ffmpeg)
     # IMPORTANT: POWSM model expects 16kHz audio
-        load_start = time.time()
-        speech, rate = librosa.load(temp_path, sr=16000, mono=True)
-        load_time = time.time() - load_start
-        print(f"DEBUG: Audio loaded. Sample rate: {rate}Hz, Shape: {speech.shape}, Duration: {len(speech)/rate:.2f}s (took {load_time:.2f}s)")
+    speech, rate = audio.speech, audio.sample_rate
+    if DEBUG:
+        print(f"DEBUG: Audio loaded. Sample rate: {rate}Hz, Shape: {speech.shape}, Duration: {len(speech)/rate:.2f}s")
         print(f"DEBUG: Audio stats - min: {speech.min():.4f}, max: {speech.max():.4f}, mean: {speech.mean():.4f}, std: {speech.std():.4f}")
-        
-        # Get PR model
-        pr_model, _, _ = get_models(device)
-        
-        # Run PR inference
-        inference_start = time.time()
+    
+    # Get PR model
+    pr_model, _, _ = get_models(device)
+    
+    # Run PR inference
+    if DEBUG:
         print("DEBUG: Running PR inference...")
+    with span("pr"):
         result_pr = pr_model(speech, text_prev="<na>")
-        inference_time = time.time() - inference_start
-        print(f"DEBUG: PR inference took {inference_time:.2f} seconds")
-        
-        ipa_result = result_pr[0][0]
+    
+    ipa_result = result_pr[0][0]
+    if DEBUG:
         print(f"DEBUG: PR result raw: '{ipa_result}'")
+    
+    # Post-process PR output
+    if "<notimestamps>" in ipa_result:
+        ipa_result = ipa_result.split("<notimestamps>")[1].strip()
+    else:
+        ipa_result = ipa_result.strip()
         
-        # Post-process PR output
-        if "<notimestamps>" in ipa_result:
-            ipa_result = ipa_result.split("<notimestamps>")[1].strip()
-        else:
-            ipa_result = ipa_result.strip()
-            
+    if DEBUG:
         print(f"DEBUG: Final PR result: '{ipa_result}'")
-        return ipa_result
+    return ipa_result
+
+
+def generate_target_ipa(audio: AudioClip, target_text: str, device: Optional[str] = None) -> str:
+    """
+    Generate target IPA from text using POWSM audio-guided G2P.
+    
+    Args:
+        audio: Recording for this request (see fetch_audio)
+        target_text: Target text (ground truth transcript)
+        device: Device to run inference on ("cuda" or "cpu"). If None, auto-detect.
+    
+    Returns:
+        IPA phonemes string in POWSM format (e.g., "/h//ɛ//l//o//ʊ/")
+    """
+    _, g2p_model, _ = get_models(device)
+    with span("g2p"):
+        result_g2p = g2p_model(audio.speech, text_prev=target_text)
+    target_ipa_phonemes = result_g2p[0][0]
+    if "<notimestamps>" in target_ipa_phonemes:
+        target_ipa_phonemes = target_ipa_phonemes.split("<notimestamps>")[1].strip()
+    else:
+        target_ipa_phonemes = target_ipa_phonemes.strip()
+    return target_ipa_phonemes
+
+
+def recognize_text(audio: AudioClip, target_text: str, device: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Transcribe the recording using POWSM ASR, with the target text as context.
+    
+    Args:
+        audio: Recording for this request (see fetch_audio)
+        target_text: Target text (ground truth transcript)
+        device: Device to run inference on ("cuda" or "cpu"). If None, auto-detect.
+    
+    Returns:
+        Tuple of (raw ASR output, cleaned text)
+    """
+    speech, rate = audio.speech, audio.sample_rate
+    if DEBUG:
+        print(f"DEBUG: ASR input audio stats - shape: {speech.shape}, duration: {len(speech)/rate:.2f}s, sample rate: {rate}Hz")
+        print(f"DEBUG: ASR input audio stats - min: {speech.min():.4f}, max: {speech.max():.4f}, mean: {speech.mean():.4f}, std: {speech.std():.4f}")
+    
+    _, _, asr_model = get_models(device)
+    
+    # Use target text as context to improve ASR accuracy
+    # This helps the model better recognize words, especially at the start
+    # Note: text_prev provides context but doesn't force exact matches - the model
+    # will still output what it hears, but with better word recognition
+    asr_text_prev = target_text if target_text else "<na>"
+    if DEBUG:
+        print(f"DEBUG: ASR using text_prev: '{asr_text_prev[:50]}...'" if len(asr_text_prev) > 50 else f"DEBUG: ASR using text_prev: '{asr_text_prev}'")
+    
+    # Run ASR with target text as context
+    with span("asr"):
+        result_asr = asr_model(speech, text_prev=asr_text_prev)
+    actual_text_raw = result_asr[0][0]
+    
+    # Clean tags from ASR output
+    actual_text = actual_text_raw
+    if "<notimestamps>" in actual_text:
+        actual_text = actual_text.split("<notimestamps>")[1].strip()
+    
+    # Remove other potential tags loosely
+    actual_text = actual_text.replace("<eng>", "").replace("<asr>", "").strip()
+    
+    if DEBUG:
+        print(f"DEBUG: ASR result raw: '{actual_text_raw}'")
+        print(f"DEBUG: ASR result cleaned: '{actual_text}'")
+    return actual_text_raw, actual_text
+
+
+def resolve_alignment_method() -> str:
+    """Alignment method for this worker: "mfa", "ctc" or "estimated" (see ALIGNMENT_MODE)."""
+    if ALIGNMENT_MODE == "ctc":
+        return "ctc"
+    if ALIGNMENT_MODE in ("auto", "mfa") and get_mfa_aligner() is not None:
+        return "mfa"
+    return "estimated"
+
+
+def ctc_align_phones(audio: AudioClip, phonemes: List[str], device: Optional[str] = None) -> Optional[List[Dict]]:
+    """
+    Force-align recognized phones to POWSM's CTC posteriors.
+    
+    Inside a shared_encoder() block this reuses the encoder pass of PR.
+    
+    Args:
+        audio: Recording for this request (see fetch_audio)
+        phonemes: Phones to align (parsed PR output)
+        device: Device to run inference on ("cuda" or "cpu"). If None, auto-detect.
+    
+    Returns:
+        List of dicts with 'phone', 'start', 'end' keys, or None if the
+        phones cannot be aligned (caller falls back to estimation)
+    """
+    if not phonemes:
+        return []
+    
+    powsm = get_powsm(device)
+    s2t_model = powsm.s2t_model
+    try:
+        token_ids = get_token_ids(device)
+        unk_id = token_ids.get("<unk>")
+        targets = [token_ids.get(f"/{p}/", unk_id) for p in phonemes]
+        if None in targets:
+            if DEBUG:
+                print(f"DEBUG: CTC alignment skipped, phones missing from vocabulary")
+            return None
+        with span("ctc_alignment"):
+            log_probs, frame_shift = ctc_log_posteriors(powsm, audio.speech, audio.sample_rate)
+            spans = ctc_forced_align(log_probs, targets, blank=s2t_model.blank_id)
+    except Exception as e:
+        print(f"ERROR: CTC alignment failed: {e}")
+        return None
+    
+    return spans_to_alignments(phonemes, spans, frame_shift)
+
+
+def shift_alignments(alignments: Optional[List[Dict]], offset: float) -> Optional[List[Dict]]:
+    """Alignments moved later by offset seconds (e.g. from a segment or crop to the whole clip)."""
+    if alignments is None or offset == 0:
+        return alignments
+    return [
+        dict(alignment, start=round(alignment["start"] + offset, 3), end=round(alignment["end"] + offset, 3))
+        for alignment in alignments
+    ]
+
+
+def speech_region(audio: AudioClip, speech_start: float, speech_end: float, margin: float = TRIM_MARGIN_SECONDS) -> Tuple[int, int]:
+    """
+    Samples [start, end) of the detected speech region plus margin, clamped to the clip.
+    
+    Args:
+        audio: Recording for this request (see fetch_audio)
+        speech_start: Speech start in seconds (see estimate_speech_boundaries)
+        speech_end: Speech end in seconds
+        margin: Seconds kept on each side of the speech
+    """
+    total = len(audio.speech)
+    start = max(0, int((speech_start - margin) * audio.sample_rate))
+    end = min(total, int(np.ceil((speech_end + margin) * audio.sample_rate)))
+    if end <= start:
+        return 0, total
+    return start, end
+
+
+def recognize_utterance(
+    audio: AudioClip,
+    target_text: str,
+    target_ipa: Optional[str],
+    device: Optional[str] = None,
+    alignment_method: str = "estimated",
+    encoder_out=None,
+) -> Dict:
+    """
+    Run PR, CTC alignment, G2P and ASR on one utterance (up to 30s).
+    
+    All passes decode from a single encoder pass over the utterance.
+    
+    Args:
+        audio: Recording (or segment) to recognize
+        target_text: Target text (ground truth transcript)
+        target_ipa: Target IPA, or None to generate it with G2P
+        device: Device to run inference on ("cuda" or "cpu"). If None, auto-detect.
+        alignment_method: "ctc" also force-aligns the recognized phones
+        encoder_out: Precomputed encoder states for the utterance (optional)
+    
+    Returns:
+        Dict with actual_ipa, ctc_alignments (None unless aligned),
+        target_ipa, actual_text_raw and actual_text
+    """
+    with shared_encoder(get_powsm(device), encoder_out=encoder_out):
+        # Step 1: Extract actual pronunciation from audio using PR
+        if DEBUG:
+            print("DEBUG: Step 1: Phone Recognition (PR)...")
+        actual_ipa_phonemes = extract_ipa_from_audio(audio, device)
         
-    finally:
-        # Clean up temporary file
-        try:
-            os.unlink(temp_path)
-        except:
-            pass
+        # Step 1b: CTC forced alignment of the recognized phones (same encoder pass)
+        ctc_alignments = None
+        if alignment_method == "ctc":
+            if DEBUG:
+                print("DEBUG: Step 1b: CTC forced alignment...")
+            ctc_alignments = ctc_align_phones(audio, parse_ipa_phonemes(actual_ipa_phonemes), device)
+        
+        # Step 2: Target pronunciation from G2P unless given
+        if target_ipa is None:
+            if DEBUG:
+                print("DEBUG: Step 2: Grapheme-to-Phoneme (G2P)...")
+            target_ipa = generate_target_ipa(audio, target_text, device)
+        
+        # Step 2b: Run ASR
+        if DEBUG:
+            print("DEBUG: Step 2b: Running ASR...")
+        actual_text_raw, actual_text = recognize_text(audio, target_text, device)
+    
+    return {
+        "actual_ipa": actual_ipa_phonemes,
+        "ctc_alignments": ctc_alignments,
+        "target_ipa": target_ipa,
+        "actual_text_raw": actual_text_raw,
+        "actual_text": actual_text,
+    }
+
+
+def recognize_long_form(
+    audio: AudioClip,
+    segments: List[Tuple[int, int]],
+    target_text: str,
+    target_ipa: Optional[str],
+    device: Optional[str] = None,
+    alignment_method: str = "estimated",
+) -> Dict:
+    """
+    recognize_utterance() for recordings longer than the model input, segment by segment.
+    
+    Segments (see segment_at_pauses) are encoded LONG_FORM_BATCH at a time
+    in one batched encoder pass, so memory stays bounded by the batch, not
+    the recording. Phone sequences, ASR text and CTC alignments are
+    stitched back together, alignments shifted by each segment's offset.
+    
+    Without a target IPA, the target text is divided among the segments in
+    proportion to the words ASR heard in each, and G2P runs per segment
+    on the encoder states kept from the batch.
+    
+    Returns:
+        Same as recognize_utterance(), for the whole recording
+    """
+    powsm = get_powsm(device)
+    rate = audio.sample_rate
+    clips = [audio.slice(start, end) for start, end in segments]
+    
+    recognized = []
+    # Kept for G2P when it has to run after all segments (no target IPA)
+    encoder_outs = []
+    for group_start in range(0, len(clips), max(1, LONG_FORM_BATCH)):
+        group = clips[group_start:group_start + max(1, LONG_FORM_BATCH)]
+        with span("encoder"):
+            group_outs = encode_batch(powsm, [clip.speech for clip in group])
+        for clip, encoder_out in zip(group, group_outs):
+            # G2P needs the segment's share of the text, known once ASR has run on all segments
+            recognized.append(recognize_utterance(
+                clip, target_text, target_ipa or "", device, alignment_method, encoder_out
+            ))
+        if target_ipa is None:
+            encoder_outs.extend(group_outs)
+    
+    if DEBUG:
+        print(f"DEBUG: Long-form: recognized {len(segments)} segments")
+    
+    if target_ipa is None:
+        target_ipa = segment_target_ipa(clips, recognized, target_text, device, encoder_outs)
+    return stitch_segments(segments, recognized, rate, target_ipa, alignment_method)
+
+
+def segment_target_ipa(
+    clips: List[AudioClip],
+    recognized: List[Dict],
+    target_text: str,
+    device: Optional[str] = None,
+    encoder_outs: Optional[List] = None,
+) -> str:
+    """
+    Target IPA for a recording recognized segment by segment, with G2P per segment.
+    
+    The target text is divided among the segments in proportion to the
+    words ASR heard in each (by duration when ASR heard nothing).
+    
+    Args:
+        clips: Segment clips, in order
+        recognized: recognize_utterance() result per segment
+        target_text: Target text for the whole recording
+        device: Device to run inference on ("cuda" or "cpu"). If None, auto-detect.
+        encoder_outs: Encoder states per segment from recognition, so G2P
+            does not encode the segments again (encoded here if None)
+    """
+    heard = [len(r["actual_text"].split()) for r in recognized]
+    if sum(heard) == 0:
+        heard = [len(clip.speech) for clip in clips]
+    words = target_text.split()
+    total = sum(heard)
+    if encoder_outs is None:
+        encoder_outs = [None] * len(clips)
+    powsm = get_powsm(device)
+    pieces = []
+    seen = 0
+    for clip, count, encoder_out in zip(clips, heard, encoder_outs):
+        first = round(len(words) * seen / total)
+        seen += count
+        segment_text = " ".join(words[first:round(len(words) * seen / total)])
+        if not segment_text:
+            pieces.append("")
+            continue
+        with shared_encoder(powsm, encoder_out=encoder_out):
+            pieces.append(generate_target_ipa(clip, segment_text, device))
+    # G2P output has no word boundaries, so segments are joined without one
+    return "".join(pieces)
+
+
+def stitch_segments(
+    segments: List[Tuple[int, int]],
+    recognized: List[Dict],
+    sample_rate: int,
+    target_ipa: str,
+    alignment_method: str = "estimated",
+) -> Dict:
+    """
+    Join per-segment recognize_utterance() results into one for the whole recording.
+    
+    Args:
+        segments: (start_sample, end_sample) of each segment in the recording
+        recognized: recognize_utterance() result per segment
+        sample_rate: Sample rate of the recording
+        target_ipa: Target IPA for the whole recording
+        alignment_method: "ctc" stitches the CTC alignments (None if any segment has none)
+    
+    Returns:
+        Same as recognize_utterance(), CTC alignments shifted by each segment's offset
+    """
+    ctc_alignments = None
+    if alignment_method == "ctc" and all(r["ctc_alignments"] is not None for r in recognized):
+        ctc_alignments = []
+        for (start, _), r in zip(segments, recognized):
+            ctc_alignments.extend(shift_alignments(r["ctc_alignments"], start / sample_rate))
+    
+    return {
+        "actual_ipa": "".join(r["actual_ipa"] for r in recognized),
+        "ctc_alignments": ctc_alignments,
+        "target_ipa": target_ipa,
+        "actual_text_raw": " ".join(r["actual_text_raw"] for r in recognized),
+        "actual_text": " ".join(r["actual_text"] for r in recognized if r["actual_text"]),
+    }
 
 
-def download_audio(audio_uri: str) -> Tuple[str, str]:
+def fetch_audio(audio_uri: str, decode: bool = False) -> AudioClip:
     """
-    Download audio from URI to a temporary file.
+    Download audio from URI once for the whole assessment.
+    
+    The returned clip decodes to 16kHz on first use and is shared by every
+    stage (PR, G2P, ASR, signal quality, MFA).
     
     Args:
         audio_uri: URL to audio file
+        decode: Decode right away (e.g. on an I/O thread) instead of on first use
         
     Returns:
-        Tuple of (temp_file_path, audio format suffix)
+        AudioClip holding the downloaded bytes
     """
-    print(f"DEBUG: Downloading audio from: {audio_uri}")
+    if DEBUG:
+        print(f"DEBUG: Downloading audio from: {audio_uri}")
     
     # Determine file extension from URI
     if '.wav' in audio_uri.lower():
@@ -543,29 +1019,20 @@ def download_audio(audio_uri: str) -> Tuple[str, str]:
     else:
         suffix = '.webm'  # Default to webm since browsers record WebM
     
-    # Create temporary file
-    temp_file = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
-    temp_path = temp_file.name
-    temp_file.close()
-    
     try:
-        # Download audio
-        import ssl
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
+        # Download into memory (certificates unchecked, as in dev/docker setups)
+        data = download_bytes(audio_uri, verify=False)
         
-        with urllib.request.urlopen(audio_uri, context=ctx) as response, open(temp_path, 'wb') as out_file:
-            shutil.copyfileobj(response, out_file)
-            
-        file_size = os.path.getsize(temp_path)
-        print(f"DEBUG: Audio downloaded to {temp_path} ({file_size} bytes)")
-        return temp_path, suffix
+        if DEBUG:
+            print(f"DEBUG: Audio downloaded ({len(data)} bytes)")
+        audio = AudioClip(data, suffix=suffix, target_sr=16000)
     except Exception as e:
         print(f"ERROR: Failed to download audio from {audio_uri}: {str(e)}")
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
         raise e
+    
+    if decode:
+        audio.decode()
+    return audio
 
 
 def run_mfa_alignment(
@@ -641,21 +1108,8 @@ def run_mfa_alignment(
         mfa_temp_dir,
     ]
     
-    env_dict = env.copy() if env else os.environ.copy()
-    
-    # Set MFA root directory (use network volume if available)
-    # MFA_ROOT_DIR stores dictionaries, acoustic models, and configuration
-    network_volume_path = "/runpod-volume"
-    if os.path.exists(network_volume_path):
-        mfa_root_dir = os.path.join(network_volume_path, ".cache", "mfa")
-        os.makedirs(mfa_root_dir, exist_ok=True)
-        env_dict["MFA_ROOT_DIR"] = mfa_root_dir
-        print(f"DEBUG: Using network volume for MFA root directory at {mfa_root_dir}")
-    else:
-        # Use default MFA root location (~/Documents/MFA)
-        mfa_root_dir = os.path.expanduser("~/Documents/MFA")
-        env_dict["MFA_ROOT_DIR"] = mfa_root_dir
-        print(f"DEBUG: Using default MFA root directory at {mfa_root_dir}")
+    # MFA root directory on the network volume if available
+    env_dict = mfa_environment(env)
     
     try:
         result = subprocess.run(
@@ -779,155 +1233,344 @@ def parse_textgrid(textgrid_path: str) -> List[Dict]:
         return []
 
 
+def preflight_check(audio: AudioClip) -> Dict:
+    """
+    Analyze the decoded recording before running any model.
+    
+    Runs signal quality and speech boundary detection on one shared frame
+    analysis. Recordings that are not acceptable (e.g. silent or badly
+    clipped) get a structured rejection so the caller can skip inference.
+    
+    Args:
+        audio: Recording for this request (see fetch_audio)
+    
+    Returns:
+        Dict with:
+        - signal_quality: Dict (see check_signal_quality)
+        - speech_start: float (seconds)
+        - speech_end: float (seconds)
+        - frames: Dict (see analyze_frames)
+        - rejection: Optional[Dict] (result to return instead of assessing, or None)
+    """
+    speech, rate = audio.speech, audio.sample_rate
+    
+    # Signal quality check
+    frames = analyze_frames(speech, rate)
+    signal_quality = check_signal_quality(speech, rate, frames)
+    if DEBUG:
+        print(f"DEBUG: Signal quality score: {signal_quality['quality_score']}, warnings: {signal_quality['warnings']}")
+    
+    # Estimate speech boundaries for better timestamp estimation
+    speech_start, speech_end = estimate_speech_boundaries(speech, rate, frames)
+    if DEBUG:
+        print(f"DEBUG: Estimated speech boundaries: {speech_start:.2f}s - {speech_end:.2f}s")
+    
+    rejection = None
+    if not signal_quality["is_acceptable"] or "mostly_silence" in signal_quality["warnings"]:
+        reasons = ", ".join(signal_quality["warnings"]) or "low_quality"
+        rejection = {
+            "error": f"Recording rejected: {reasons}",
+            "rejected": True,
+            "signal_quality": signal_quality,
+        }
+    
+    return {
+        "signal_quality": signal_quality,
+        "speech_start": speech_start,
+        "speech_end": speech_end,
+        "frames": frames,
+        "rejection": rejection,
+    }
+
+
+def cached_result(audio: AudioClip, target_text: str, target_ipa: Optional[str] = None) -> Optional[Dict]:
+    """
+    Return the stored assessment of this exact recording and target, if any.
+    
+    Only needs the raw bytes, so it can run before decoding.
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return None
+    return cache.get(cache_key(audio.digest(), target_text, target_ipa, result_version(target_ipa)))
+
+
+def result_version(target_ipa: Optional[str] = None) -> str:
+    """
+    MODEL_VERSION plus every setting that changes an assessment result.
+    
+    Workers with different settings (e.g. with and without MFA) share the
+    on-disk result cache, so the settings are part of the cache key. Without
+    a target IPA the result depends on the target IPA index too, so its
+    revision is included.
+    """
+    parts = [
+        MODEL_VERSION,
+        f"align={resolve_alignment_method()}",
+        f"phones={PHONE_ALIGNMENT_MODE}",
+        f"trim={TRIM_MARGIN_SECONDS if TRIM_SILENCE else 'off'}",
+        f"long={LONG_FORM_SECONDS}/{MAX_SEGMENT_SECONDS}/{LONG_FORM_BATCH}/{MAX_LONG_FORM_SECONDS}",
+    ]
+    if target_ipa is None:
+        parts.append(f"index={get_target_ipa_store().revision()}")
+    return "+".join(parts)
+
+
 def assess(audio_uri: str, target_text: str, target_ipa: Optional[str] = None, device: Optional[str] = None) -> Dict:
     """
     Assess pronunciation by comparing actual vs target IPA.
     
+    Downloads the recording once and runs assess_audio() on it.
+    
     Args:
         audio_uri: URI to audio file
         target_text: Target text (ground truth transcript)
         target_ipa: Optional target IPA (if not provided, will generate with G2P)
         device: Device to run inference on ("cuda" or "cpu"). If None, auto-detect.
     
+    Returns:
+        See assess_audio()
+    """
+    with fetch_audio(audio_uri) as audio:
+        return assess_audio(audio, target_text, target_ipa, device)
+
+
+def assess_audio(
+    audio: AudioClip,
+    target_text: str,
+    target_ipa: Optional[str] = None,
+    device: Optional[str] = None,
+    check_cache: bool = True,
+) -> Dict:
+    """
+    Assess pronunciation of an already downloaded recording.
+    
+    Args:
+        audio: Recording for this request (see fetch_audio)
+        target_text: Target text (ground truth transcript)
+        target_ipa: Optional target IPA (if not provided, looked up in the
+            target IPA index, then generated with G2P)
+        device: Device to run inference on ("cuda" or "cpu"). If None, auto-detect.
+        check_cache: Look the result up in the result cache first; False
+            when the caller already missed with cached_result() (the new
+            result is still stored)
+    
     Returns:
         Dictionary with:
         - actual_ipa: str (detected IPA from PR)
         - target_ipa: str (target IPA from G2P)
         - score: float (0.0-1.0)
         - errors: List[Dict] (errors with timestamps from MFA)
+        - timings: Dict[str, float] (milliseconds per stage, see shared.tracing)
+        
+        Unusable recordings return {"error", "rejected": True, "signal_quality"}
+        without running any model (see preflight_check).
     """
-    import time
-    
-    total_start = time.time()
+    # Stages are timed into the caller's trace (the handler's, covering
+    # download and decode) or, called directly, into a trace of our own
+    trace = current_trace()
+    owns_trace = trace is None
+    if owns_trace:
+        trace = Trace()
     
     # Auto-detect device if not specified
     if device is None:
         device = get_device()
     
-    print(f"DEBUG: Starting assessment on device: {device}")
-    
-    # Step 1: Extract actual pronunciation from audio using PR
-    print("DEBUG: Step 1: Phone Recognition (PR)...")
-    actual_ipa_phonemes = extract_ipa_from_audio(audio_uri, device)
-    print(f"DEBUG: Raw actual IPA from PR: '{actual_ipa_phonemes[:100]}...'" if len(actual_ipa_phonemes) > 100 else f'DEBUG: Raw actual IPA from PR: {actual_ipa_phonemes}')
-    actual_phonemes = parse_ipa_phonemes(actual_ipa_phonemes)
-    print(f"DEBUG: Detected {len(actual_phonemes)} phones from PR")
-    print(f"DEBUG: Actual phonemes list: {actual_phonemes[:20]}..." if len(actual_phonemes) > 20 else f"DEBUG: Actual phonemes list: {actual_phonemes}")
+    if DEBUG:
+        print(f"DEBUG: Starting assessment on device: {device}")
+    
+    with trace.activate():
+        # Repeated submission of the same recording and target: reuse the result
+        cache = get_result_cache()
+        result = None
+        if cache is not None:
+            key = cache_key(audio.digest(), target_text, target_ipa, result_version(target_ipa))
+            if check_cache:
+                result = cache.get(key)
+            if result is not None and DEBUG:
+                print(f"DEBUG: Result cache hit, returning stored assessment")
+        
+        if result is None:
+            result = _assess_uncached(audio, target_text, target_ipa, device)
+            if cache is not None:
+                cache.put(key, result)
     
-    # Step 2: Generate target pronunciation from text using G2P
-    print("DEBUG: Step 2: Grapheme-to-Phoneme (G2P)...")
+    result["timings"] = trace.finish() if owns_trace else trace.timings()
+    return result
+
+
+def _assess_uncached(audio: AudioClip, target_text: str, target_ipa: Optional[str], device: str) -> Dict:
+    """Body of assess_audio() for recordings not found in the result cache."""
+    # Step 0: Pre-flight signal quality and speech boundaries, before any model pass
+    if DEBUG:
+        print("DEBUG: Step 0: Pre-flight audio analysis...")
+    with span("preflight"):
+        preflight = preflight_check(audio)
+    if preflight["rejection"] is not None:
+        if DEBUG:
+            print("DEBUG: Recording rejected before inference")
+        return preflight["rejection"]
+    speech_start, speech_end = preflight["speech_start"], preflight["speech_end"]
+    alignment_method = resolve_alignment_method()
+    
+    # Target pronunciation: given, precomputed for known texts, or G2P (during recognition)
     if target_ipa is None:
-        # Download audio for G2P (audio-guided)
-        temp_path, _ = download_audio(audio_uri)
-        try:
-            speech, rate = librosa.load(temp_path, sr=16000, mono=True)
-            _, g2p_model, _ = get_models(device)
-            result_g2p = g2p_model(speech, text_prev=target_text)
-            target_ipa_phonemes = result_g2p[0][0]
-            if "<notimestamps>" in target_ipa_phonemes:
-                target_ipa_phonemes = target_ipa_phonemes.split("<notimestamps>")[1].strip()
-            else:
-                target_ipa_phonemes = target_ipa_phonemes.strip()
-        finally:
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
+        target_ipa = lookup_target_ipa(target_text)
+        if target_ipa is not None and DEBUG:
+            print("DEBUG: Using precomputed target IPA from index")
+    
+    # Models only see the speech region: leading/trailing silence is cropped,
+    # and timestamps are shifted back to the original clip below
+    model_audio, frames, crop_offset = audio, preflight["frames"], 0.0
+    if TRIM_SILENCE:
+        crop_start, crop_end = speech_region(audio, speech_start, speech_end)
+        if crop_end - crop_start < len(audio.speech):
+            model_audio = audio.slice(crop_start, crop_end)
+            frames = None
+            crop_offset = crop_start / audio.sample_rate
+            if DEBUG:
+                print(f"DEBUG: Cropped to speech {crop_offset:.2f}s - {crop_end / audio.sample_rate:.2f}s")
+    
+    # Steps 1-2b: PR, CTC alignment, G2P and ASR. Long recordings are split at
+    # pauses and recognized segment by segment
+    segments = [(0, len(model_audio.speech))]
+    if LONG_FORM_SECONDS > 0 and model_audio.duration > LONG_FORM_SECONDS:
+        if frames is None:
+            frames = analyze_frames(model_audio.speech, model_audio.sample_rate)
+        segments = segment_at_pauses(frames, model_audio.sample_rate, len(model_audio.speech))
+    if len(segments) > 1:
+        recognized = recognize_long_form(model_audio, segments, target_text, target_ipa, device, alignment_method)
     else:
-        target_ipa_phonemes = target_ipa
-    
-    target_phonemes = parse_ipa_phonemes(target_ipa_phonemes)
-    print(f"DEBUG: Target {len(target_phonemes)} phones from G2P")
-    print(f"DEBUG: Raw target IPA: '{target_ipa_phonemes[:100]}...' if len(target_ipa_phonemes) > 100 else f'DEBUG: Raw target IPA: '{target_ipa_phonemes}'")
+        # One encoder pass for every task, batched with other concurrent jobs
+        # when micro-batching is enabled
+        encoder_out = None
+        if _batcher is not None:
+            with span("encoder"):
+                encoder_out = _batcher.encode(model_audio.speech)
+        recognized = recognize_utterance(model_audio, target_text, target_ipa, device, alignment_method, encoder_out)
+    recognized["ctc_alignments"] = shift_alignments(recognized["ctc_alignments"], crop_offset)
+    
+    return score_assessment(audio, target_text, recognized, preflight, alignment_method)
+
+
+def score_assessment(audio: AudioClip, target_text: str, recognized: Dict, preflight: Dict, alignment_method: str) -> Dict:
+    """
+    Steps 3-6 of an assessment: compare recognized speech to the target, align and score.
     
-    # Step 3: Run edit distance to find errors
-    print(f"DEBUG: Running edit distance: actual ({len(actual_phonemes)}) vs target ({len(target_phonemes)})")
-    operations = edit_operations(actual_phonemes, target_phonemes)
-    print(f"DEBUG: Edit distance found {len(operations)} operations")
+    Args:
+        audio: Whole recording (timestamps are relative to its start)
+        target_text: Target text (ground truth transcript)
+        recognized: recognize_utterance()-style results for the whole
+            recording (CTC alignments already in its time base)
+        preflight: preflight_check() result for the recording
+        alignment_method: "mfa", "ctc" or "estimated" (see resolve_alignment_method)
     
-    # Step 4: Get audio for signal quality checks and timestamp estimation
-    print("DEBUG: Step 4: Downloading audio for analysis...")
-    temp_path, _ = download_audio(audio_uri)
-    try:
-        speech, rate = librosa.load(temp_path, sr=16000, mono=True)
-        audio_duration = len(speech) / rate
-        
-        # Signal quality check
-        print("DEBUG: Step 5: Signal quality analysis...")
-        signal_quality = check_signal_quality(speech, rate)
-        print(f"DEBUG: Signal quality score: {signal_quality['quality_score']}, warnings: {signal_quality['warnings']}")
-        
-        # Estimate speech boundaries for better timestamp estimation
-        speech_start, speech_end = estimate_speech_boundaries(speech, rate)
-        print(f"DEBUG: Estimated speech boundaries: {speech_start:.2f}s - {speech_end:.2f}s")
-        
-        # Run ASR
-        print("DEBUG: Step 5b: Running ASR...")
-        print(f"DEBUG: ASR input audio stats - shape: {speech.shape}, duration: {len(speech)/rate:.2f}s, sample rate: {rate}Hz")
-        print(f"DEBUG: ASR input audio stats - min: {speech.min():.4f}, max: {speech.max():.4f}, mean: {speech.mean():.4f}, std: {speech.std():.4f}")
-        
-        _, _, asr_model = get_models(device)
-        
-        # Use target text as context to improve ASR accuracy
-        # This helps the model better recognize words, especially at the start
-        # Note: text_prev provides context but doesn't force exact matches - the model
-        # will still output what it hears, but with better word recognition
-        asr_text_prev = target_text if target_text else "<na>"
-        print(f"DEBUG: ASR using text_prev: '{asr_text_prev[:50]}...'" if len(asr_text_prev) > 50 else f"DEBUG: ASR using text_prev: '{asr_text_prev}'")
-        
-        # Run ASR with target text as context
-        result_asr = asr_model(speech, text_prev=asr_text_prev)
-        actual_text_raw = result_asr[0][0]
-        
-        # Clean tags from ASR output
-        actual_text = actual_text_raw
-        if "<notimestamps>" in actual_text:
-            actual_text = actual_text.split("<notimestamps>")[1].strip()
-        
-        # Remove other potential tags loosely
-        actual_text = actual_text.replace("<eng>", "").replace("<asr>", "").strip()
-        
-        # Remove other potential tags loosely (duplicate line removed)
-        
-        print(f"DEBUG: ASR result raw: '{actual_text_raw}'")
-        print(f"DEBUG: ASR result cleaned: '{actual_text}'")
-        
-        # Compare with PR results to see if phonemes match
+    Returns:
+        See assess_audio()
+    """
+    signal_quality = preflight["signal_quality"]
+    speech_start, speech_end = preflight["speech_start"], preflight["speech_end"]
+    audio_duration = audio.duration
+    actual_ipa_phonemes = recognized["actual_ipa"]
+    target_ipa_phonemes = recognized["target_ipa"]
+    actual_text_raw, actual_text = recognized["actual_text_raw"], recognized["actual_text"]
+    ctc_alignments = recognized["ctc_alignments"]
+    if alignment_method == "ctc" and ctc_alignments is None:
+        alignment_method = "estimated"
+    
+    if DEBUG:
+        print(f"DEBUG: Raw actual IPA from PR: '{actual_ipa_phonemes[:100]}...'" if len(actual_ipa_phonemes) > 100 else f'DEBUG: Raw actual IPA from PR: {actual_ipa_phonemes}')
+    actual_phonemes = parse_ipa_phonemes(actual_ipa_phonemes)
+    if DEBUG:
+        print(f"DEBUG: Detected {len(actual_phonemes)} phones from PR")
+        print(f"DEBUG: Actual phonemes list: {actual_phonemes[:20]}..." if len(actual_phonemes) > 20 else f"DEBUG: Actual phonemes list: {actual_phonemes}")
+    
+    target_lattice = parse_ipa_lattice(target_ipa_phonemes)
+    target_words = [alternatives[0] for alternatives in target_lattice]
+    target_phonemes = [p for word in target_words for p in word]
+    if DEBUG:
+        print(f"DEBUG: Target {len(target_phonemes)} phones from G2P")
+        print(f"DEBUG: Raw target IPA: '{target_ipa_phonemes[:100]}...' if len(target_ipa_phonemes) > 100 else f'DEBUG: Raw target IPA: '{target_ipa_phonemes}'")
+    
+    # Step 3: Run edit distance to find errors (on interned phone ids)
+    if DEBUG:
+        print(f"DEBUG: Running edit distance: actual ({len(actual_phonemes)}) vs target ({len(target_phonemes)})")
+    with span("edit_distance"):
+        # One scope: unknown phones match across actual and target only here
+        phone_ids = get_inventory().scope()
+        actual_ids = phone_ids.encode(actual_phonemes)
+        if any(len(alternatives) > 1 for alternatives in target_lattice):
+            # Pronunciation variants: best variant per word in a single DP pass
+            id_operations, choices = lattice_edit_operations(
+                actual_ids,
+                [[phone_ids.encode(variant) for variant in alternatives] for alternatives in target_lattice],
+            )
+            target_words = [alternatives[c] for alternatives, c in zip(target_lattice, choices)]
+            target_phonemes = [p for word in target_words for p in word]
+            if DEBUG:
+                print(f"DEBUG: Chosen pronunciation variants: {choices}")
+        elif PHONE_ALIGNMENT_MODE == "hierarchical" and len(target_words) > 1:
+            if DEBUG:
+                print(f"DEBUG: Hierarchical alignment over {len(target_words)} target words")
+            id_operations = hierarchical_edit_operations(actual_ids, [phone_ids.encode(word) for word in target_words])
+        else:
+            id_operations = edit_operations(actual_ids, phone_ids.encode(target_phonemes))
+        # Back to phone strings in the reported operations
+        operations = [
+            (op[0], op[1]) + tuple(phone_ids.phone(phone_id) for phone_id in op[2:])
+            for op in id_operations
+        ]
+        # Word-segmented targets: report which target word each phone error belongs to
+        operation_words = None
+        if len(target_words) > 1:
+            operation_words = operation_word_indices(operations, [len(word) for word in target_words])
+    # Target pronunciation actually compared against (differs from target_ipa with variants)
+    chosen_target_ipa = " ".join("".join(f"/{p}/" for p in word) for word in target_words if word)
+    if DEBUG:
+        print(f"DEBUG: Edit distance found {len(operations)} operations")
+    
+    # Compare with PR results to see if phonemes match
+    if DEBUG:
         print(f"DEBUG: Comparing ASR vs PR:")
         print(f"DEBUG:   PR detected phonemes: {actual_phonemes[:10]}..." if len(actual_phonemes) > 10 else f"DEBUG:   PR detected phonemes: {actual_phonemes}")
         print(f"DEBUG:   ASR detected text: '{actual_text}'")
         print(f"DEBUG:   Target text: '{target_text}'")
-        
-        # Debug characters
+    
+    # Debug characters
+    if DEBUG:
         print(f"DEBUG: ASR raw chars: {[f'{c}: {ord(c):04x}' for c in actual_text_raw[:50]]}")
-
-        # Step 5c: Word-level comparison
+    
+    # Step 5c: Word-level comparison
+    if DEBUG:
         print("DEBUG: Step 5c: Word-level comparison...")
-        def normalize_text_to_list(text):
-            # Convert to lowercase and remove punctuation
-            import string
-            import re
-            text = text.lower()
-            # Remove punctuation except apostrophes within words
-            text = re.sub(r'[^\w\s\']', '', text)
-            return text.split()
-            
-        def normalize_text_string(text):
-            import string
-            import re
-            text = text.lower()
-            text = re.sub(r'[^\w\s\']', '', text)
-            # Collapse whitespace
-            return ' '.join(text.split())
-
+    def normalize_text_to_list(text):
+        # Convert to lowercase and remove punctuation
+        import string
+        import re
+        text = text.lower()
+        # Remove punctuation except apostrophes within words
+        text = re.sub(r'[^\w\s\']', '', text)
+        return text.split()
+        
+    def normalize_text_string(text):
+        import string
+        import re
+        text = text.lower()
+        text = re.sub(r'[^\w\s\']', '', text)
+        # Collapse whitespace
+        return ' '.join(text.split())
+    
+    with span("word_comparison"):
         normalized_target_words = normalize_text_to_list(target_text)
         normalized_actual_words = normalize_text_to_list(actual_text)
         
         target_text_normalized = normalize_text_string(target_text)
         actual_text_normalized = normalize_text_string(actual_text)
         
-        print(f"DEBUG: Normalized target words: {normalized_target_words}")
-        print(f"DEBUG: Normalized actual words: {normalized_actual_words}")
+        if DEBUG:
+            print(f"DEBUG: Normalized target words: {normalized_target_words}")
+            print(f"DEBUG: Normalized actual words: {normalized_actual_words}")
         
         word_operations = edit_operations(normalized_actual_words, normalized_target_words)
         
@@ -935,12 +1578,12 @@ def assess(audio_uri: str, target_text: str, target_ipa: Optional[str] = None, d
         for op in word_operations:
             op_type = op[0]
             position = op[1]
-            
+        
             error_dict = {
                 "type": op_type,
                 "position": position
             }
-            
+        
             if op_type == "substitute":
                 error_dict["expected"] = op[2] if len(op) > 2 else None
                 error_dict["actual"] = normalized_actual_words[position] if position < len(normalized_actual_words) else None
@@ -948,11 +1591,11 @@ def assess(audio_uri: str, target_text: str, target_ipa: Optional[str] = None, d
                 error_dict["actual"] = normalized_actual_words[position] if position < len(normalized_actual_words) else None
             elif op_type == "delete":
                 error_dict["expected"] = op[2] if len(op) > 2 else None
-            
+        
             # TODO: Add timestamp estimation for words
             # For now, we'll leave timestamps null or estimate proportionally
             word_errors.append(error_dict)
-            
+        
         # Calculate word score
         # Use accuracy-based scoring: (correct_words / total_words)
         # Where correct_words = total_words - deletions - substitutions
@@ -966,172 +1609,159 @@ def assess(audio_uri: str, target_text: str, target_ipa: Optional[str] = None, d
             # Correct words are those that weren't deleted or substituted
             correct_words = total_words - deletions - substitutions
             word_score = max(0.0, correct_words / total_words)
-            
+        
+    if DEBUG:
         print(f"DEBUG: Found {len(word_errors)} word errors, score: {word_score:.4f}")
-
-    finally:
-        try:
-            os.unlink(temp_path)
-        except:
-            pass
     
-    # Step 5: MFA alignment or timestamp estimation
-    print("DEBUG: Step 6: Alignment/Timestamp estimation...")
+    # Step 5: MFA/CTC alignment or timestamp estimation
+    if DEBUG:
+        print("DEBUG: Step 6: Alignment/Timestamp estimation...")
     estimated_alignments = []
-    mfa_alignments = []
-    use_mfa = False
-    
-    # Check if MFA is available
-    mfa_command = "mfa"
-    mfa_paths = [
-        "mfa",  # In PATH
-        "/opt/conda/envs/mfa/bin/mfa",  # MFA conda environment
-        "/opt/conda/envs/worker/bin/mfa",  # Worker conda environment
-        "/opt/conda/bin/mfa",  # Base conda
-    ]
-    
-    for mfa_path in mfa_paths:
-        try:
-            result = subprocess.run([mfa_path, "version"], capture_output=True, timeout=5)
-            if result.returncode == 0:
-                use_mfa = True
-                mfa_command = mfa_path
-                print(f"DEBUG: MFA is available at {mfa_command}")
-                break
-        except:
-            continue
-    
-    if use_mfa:
-        # Use MFA for precise alignment
-        temp_path, _ = download_audio(audio_uri)
-        try:
-            with tempfile.TemporaryDirectory() as temp_base:
-                actual_transcription = powsm_to_mfa_format(actual_ipa_phonemes)
-                actual_result = run_mfa_alignment(
-                    audio_file=temp_path,
-                    transcription=actual_transcription,
-                    temp_base=temp_base,
-                    mfa_command=mfa_command,
-                )
-                mfa_alignments = actual_result.get("alignments", [])
-                print(f"DEBUG: MFA aligned {len(mfa_alignments)} phones")
-        finally:
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
+    forced_alignments = []
+    
+    if alignment_method == "mfa":
+        with span("mfa"):
+            # MFA is detected once per worker (see mfa_aligner)
+            aligner = get_mfa_aligner()
+            # Use MFA for precise alignment, through the persistent server
+            actual_transcription = powsm_to_mfa_format(actual_ipa_phonemes)
+            forced_alignments = aligner.align(audio.wav_path(), actual_transcription)
+            if forced_alignments is None:
+                # Persistent server unavailable: one-shot `mfa align`
+                with tempfile.TemporaryDirectory() as temp_base:
+                    actual_result = run_mfa_alignment(
+                        audio_file=audio.wav_path(),
+                        transcription=actual_transcription,
+                        temp_base=temp_base,
+                        mfa_command=aligner.mfa_command,
+                    )
+                    forced_alignments = actual_result.get("alignments", [])
+        if DEBUG:
+            print(f"DEBUG: MFA aligned {len(forced_alignments)} phones")
+    elif alignment_method == "ctc":
+        forced_alignments = ctc_alignments
+        if DEBUG:
+            print(f"DEBUG: CTC aligned {len(ctc_alignments)} phones")
     else:
         # Use proportional timestamp estimation
-        print("DEBUG: MFA not available, using proportional timestamp estimation")
+        if DEBUG:
+            print("DEBUG: No aligner available, using proportional timestamp estimation")
         estimated_alignments = estimate_phoneme_timestamps(
             actual_phonemes,
             audio_duration,
             speech_start=speech_start,
             speech_end=speech_end,
         )
-        print(f"DEBUG: Estimated timestamps for {len(estimated_alignments)} phones")
+        if DEBUG:
+            print(f"DEBUG: Estimated timestamps for {len(estimated_alignments)} phones")
     
     # Use whichever alignments are available
-    alignments = mfa_alignments if mfa_alignments else estimated_alignments
+    alignments = forced_alignments if forced_alignments else estimated_alignments
     
-    # Map errors to timestamps
-    errors = []
-    for op in operations:
-        op_type = op[0]
-        position = op[1]
+    with span("scoring"):
+        # Map errors to timestamps
+        errors = []
+        for op_index, op in enumerate(operations):
+            op_type = op[0]
+            position = op[1]
         
-        error_dict = {
-            "type": op_type,
-            "position": position
-        }
+            error_dict = {
+                "type": op_type,
+                "position": position
+            }
+            if operation_words is not None:
+                error_dict["word_index"] = operation_words[op_index]
         
-        if op_type == "substitute":
-            error_dict["expected"] = op[2] if len(op) > 2 else None
-            error_dict["actual"] = actual_phonemes[position] if position < len(actual_phonemes) else None
-        elif op_type == "insert":
-            error_dict["expected"] = op[2] if len(op) > 2 else None
-        elif op_type == "delete":
-            error_dict["actual"] = actual_phonemes[position] if position < len(actual_phonemes) else None
+            if op_type == "substitute":
+                error_dict["expected"] = op[2] if len(op) > 2 else None
+                error_dict["actual"] = actual_phonemes[position] if position < len(actual_phonemes) else None
+            elif op_type == "insert":
+                error_dict["expected"] = op[2] if len(op) > 2 else None
+            elif op_type == "delete":
+                error_dict["actual"] = actual_phonemes[position] if position < len(actual_phonemes) else None
         
-        # Get timestamp from alignments
-        # Note: 'delete' errors (User Deletion) use Target Index for position, so we cannot 
-        # look up timestamp in Actual Alignments (which aligns to Actual Index).
-        # For now, we omit timestamp for deletions.
-        if op_type != "delete" and alignments and position < len(alignments):
-            alignment = alignments[position]
-            error_dict["timestamp"] = {
-                "start": alignment.get("start", 0.0),
-                "end": alignment.get("end", 0.0),
-                "estimated": alignment.get("estimated", not use_mfa),
-            }
-        else:
-            # Fallback: proportional estimate based on position
-            if actual_phonemes:
-                progress = position / len(actual_phonemes)
-                start_time = speech_start + progress * (speech_end - speech_start)
-                phone_duration = (speech_end - speech_start) / max(1, len(actual_phonemes))
+            # Get timestamp from alignments
+            # Note: 'delete' errors (User Deletion) use Target Index for position, so we cannot 
+            # look up timestamp in Actual Alignments (which aligns to Actual Index).
+            # For now, we omit timestamp for deletions.
+            if op_type != "delete" and alignments and position < len(alignments):
+                alignment = alignments[position]
                 error_dict["timestamp"] = {
-                    "start": round(start_time, 3),
-                    "end": round(start_time + phone_duration, 3),
-                    "estimated": True,
+                    "start": alignment.get("start", 0.0),
+                    "end": alignment.get("end", 0.0),
+                    "estimated": alignment.get("estimated", alignment_method == "estimated"),
                 }
             else:
-                error_dict["timestamp"] = {
-                    "start": 0.0,
-                    "end": 0.0,
-                    "estimated": True,
-                }
+                # Fallback: proportional estimate based on position
+                if actual_phonemes:
+                    progress = position / len(actual_phonemes)
+                    start_time = speech_start + progress * (speech_end - speech_start)
+                    phone_duration = (speech_end - speech_start) / max(1, len(actual_phonemes))
+                    error_dict["timestamp"] = {
+                        "start": round(start_time, 3),
+                        "end": round(start_time + phone_duration, 3),
+                        "estimated": True,
+                    }
+                else:
+                    error_dict["timestamp"] = {
+                        "start": 0.0,
+                        "end": 0.0,
+                        "estimated": True,
+                    }
         
-        errors.append(error_dict)
-    
-    # Calculate score using accuracy-based approach
-    # Score = (correct_phonemes / total_phonemes)
-    # Where correct_phonemes = total_phonemes - deletions - substitutions
-    total_phonemes = len(target_phonemes)
-    total_actual_phonemes = len(actual_phonemes)
-    
-    print(f"DEBUG: Scoring calculation:")
-    print(f"DEBUG:   Target phonemes: {len(target_phonemes)}")
-    print(f"DEBUG:   Actual phonemes: {len(actual_phonemes)}")
-    print(f"DEBUG:   Target phoneme list: {target_phonemes[:40]}..." if len(target_phonemes) > 40 else f"DEBUG:   Target phoneme list: {target_phonemes}")
-    print(f"DEBUG:   Actual phoneme list: {actual_phonemes[:40]}..." if len(actual_phonemes) > 40 else f"DEBUG:   Actual phoneme list: {actual_phonemes}")
-    print(f"DEBUG:   Total operations: {len(operations)}")
-    
-    if total_phonemes == 0:
-        score = 1.0 if len(actual_phonemes) == 0 else 0.0
-        print(f"DEBUG:   Score (edge case): {score}")
-    else:
-        # Count errors
-        deletions = sum(1 for op in operations if op[0] == "delete")
-        substitutions = sum(1 for op in operations if op[0] == "substitute")
-        insertions = sum(1 for op in operations if op[0] == "insert")
+            errors.append(error_dict)
+        
+        # Calculate score using accuracy-based approach
+        # Score = (correct_phonemes / total_phonemes)
+        # Where correct_phonemes = total_phonemes - deletions - substitutions
+        total_phonemes = len(target_phonemes)
+        total_actual_phonemes = len(actual_phonemes)
         
-        print(f"DEBUG:   Deletions: {deletions}")
-        print(f"DEBUG:   Substitutions: {substitutions}")
-        print(f"DEBUG:   Insertions: {insertions}")
+        if DEBUG:
+            print(f"DEBUG: Scoring calculation:")
+            print(f"DEBUG:   Target phonemes: {len(target_phonemes)}")
+            print(f"DEBUG:   Actual phonemes: {len(actual_phonemes)}")
+            print(f"DEBUG:   Target phoneme list: {target_phonemes[:40]}..." if len(target_phonemes) > 40 else f"DEBUG:   Target phoneme list: {target_phonemes}")
+            print(f"DEBUG:   Actual phoneme list: {actual_phonemes[:40]}..." if len(actual_phonemes) > 40 else f"DEBUG:   Actual phoneme list: {actual_phonemes}")
+            print(f"DEBUG:   Total operations: {len(operations)}")
         
-        # Correct phonemes are those that weren't deleted or substituted
-        # This counts how many target phonemes were correctly matched
-        correct_phonemes = total_phonemes - deletions - substitutions
+        if total_phonemes == 0:
+            score = 1.0 if len(actual_phonemes) == 0 else 0.0
+            if DEBUG:
+                print(f"DEBUG:   Score (edge case): {score}")
+        else:
+            # Count errors
+            deletions = sum(1 for op in operations if op[0] == "delete")
+            substitutions = sum(1 for op in operations if op[0] == "substitute")
+            insertions = sum(1 for op in operations if op[0] == "insert")
         
-        print(f"DEBUG:   Correct phonemes (target - deletions - substitutions): {correct_phonemes} = {total_phonemes} - {deletions} - {substitutions}")
+            if DEBUG:
+                print(f"DEBUG:   Deletions: {deletions}")
+                print(f"DEBUG:   Substitutions: {substitutions}")
+                print(f"DEBUG:   Insertions: {insertions}")
         
-        # Verify: matches + deletions + substitutions should equal total_phonemes
-        matches_implied = correct_phonemes
-        total_accounted = matches_implied + deletions + substitutions
-        if total_accounted != total_phonemes:
-            print(f"DEBUG:   WARNING: Total accounted ({total_accounted}) != total phonemes ({total_phonemes})")
-            print(f"DEBUG:   This suggests an issue with the edit distance calculation")
+            # Correct phonemes are those that weren't deleted or substituted
+            # This counts how many target phonemes were correctly matched
+            correct_phonemes = total_phonemes - deletions - substitutions
         
-        score = max(0.0, correct_phonemes / total_phonemes)
-        print(f"DEBUG:   Final score: {score:.4f} ({score*100:.2f}%)")
+            if DEBUG:
+                print(f"DEBUG:   Correct phonemes (target - deletions - substitutions): {correct_phonemes} = {total_phonemes} - {deletions} - {substitutions}")
         
-        # Also log a sample of operations for debugging
-        if len(operations) > 0:
-            print(f"DEBUG:   Sample operations (first 10): {operations[:10]}")
-    
-    total_time = time.time() - total_start
-    print(f"DEBUG: Total assessment time: {total_time:.2f} seconds")
+            # Verify: matches + deletions + substitutions should equal total_phonemes
+            matches_implied = correct_phonemes
+            total_accounted = matches_implied + deletions + substitutions
+            if total_accounted != total_phonemes:
+                if DEBUG:
+                    print(f"DEBUG:   WARNING: Total accounted ({total_accounted}) != total phonemes ({total_phonemes})")
+                    print(f"DEBUG:   This suggests an issue with the edit distance calculation")
+        
+            score = max(0.0, correct_phonemes / total_phonemes)
+            if DEBUG:
+                print(f"DEBUG:   Final score: {score:.4f} ({score*100:.2f}%)")
+        
+            # Also log a sample of operations for debugging
+            if DEBUG and operations:
+                print(f"DEBUG:   Sample operations (first 10): {operations[:10]}")
     
     return {
         "actual_text": actual_text if 'actual_text' in locals() else "",
@@ -1139,12 +1769,13 @@ def assess(audio_uri: str, target_text: str, target_ipa: Optional[str] = None, d
         "target_text_normalized": target_text_normalized if 'target_text_normalized' in locals() else "",
         "actual_ipa": actual_ipa_phonemes,
         "target_ipa": target_ipa_phonemes,
+        "chosen_target_ipa": chosen_target_ipa,
         "score": score,
         "word_score": word_score if 'word_score' in locals() else 0.0,
         "errors": errors,
         "word_errors": word_errors,
         "signal_quality": signal_quality,
         "alignments": alignments,
-        "alignment_method": "mfa" if use_mfa else "estimated",
+        "alignment_method": alignment_method,
     }
 
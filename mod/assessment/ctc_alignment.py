@@ -0,0 +1,110 @@
+"""
+CTC forced alignment of a phone sequence against frame-level posteriors.
+
+Viterbi over the standard CTC trellis (labels interleaved with blanks):
+finds the single most likely frame path that emits exactly the given
+labels, and reads each label's frames off that path.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+def ctc_forced_align(log_probs: np.ndarray, targets: Sequence[int], blank: int = 0) -> List[Tuple[int, int]]:
+    """
+    Force-align a label sequence to CTC log posteriors.
+
+    Args:
+        log_probs: Array of shape (frames, vocab) with log posteriors
+        targets: Label ids to align, in order (no blanks)
+        blank: Blank label id
+
+    Returns:
+        List of (first_frame, last_frame) per target label, inclusive
+
+    Raises:
+        ValueError: If there are too few frames to emit the labels
+    """
+    num_labels = len(targets)
+    if num_labels == 0:
+        return []
+    num_frames = log_probs.shape[0]
+
+    # Extended sequence: blank, l1, blank, l2, ..., lN, blank
+    ext = np.full(2 * num_labels + 1, blank, dtype=np.int64)
+    ext[1::2] = targets
+    num_states = len(ext)
+
+    # A label state may be entered from two states back (skipping the blank)
+    # unless it repeats the previous label
+    can_skip = np.zeros(num_states, dtype=bool)
+    can_skip[3::2] = ext[3::2] != ext[1:-2:2]
+
+    emissions = log_probs[:, ext]
+    neg_inf = -np.inf
+    score = np.full(num_states, neg_inf)
+    score[:2] = emissions[0, :2]
+    backpointers = np.zeros((num_frames, num_states), dtype=np.int8)
+    states = np.arange(num_states)
+
+    candidates = np.empty((3, num_states))
+    for t in range(1, num_frames):
+        candidates[0] = score
+        candidates[1, 0] = neg_inf
+        candidates[1, 1:] = score[:-1]
+        candidates[2, :2] = neg_inf
+        candidates[2, 2:] = np.where(can_skip[2:], score[:-2], neg_inf)
+        choice = np.argmax(candidates, axis=0)  # Ties prefer staying
+        score = candidates[choice, states] + emissions[t]
+        backpointers[t] = choice
+
+    # The path ends on the last label or the trailing blank
+    state = num_states - 1 if score[-1] >= score[-2] else num_states - 2
+    if not np.isfinite(score[state]):
+        raise ValueError(f"Cannot align {num_labels} labels to {num_frames} frames")
+
+    path = np.empty(num_frames, dtype=np.int64)
+    for t in range(num_frames - 1, -1, -1):
+        path[t] = state
+        state -= backpointers[t, state]
+
+    spans = []
+    for k in range(num_labels):
+        frames = np.flatnonzero(path == 2 * k + 1)
+        spans.append((int(frames[0]), int(frames[-1])))
+    return spans
+
+
+def spans_to_alignments(
+    phones: Sequence[str],
+    spans: Sequence[Tuple[int, int]],
+    frame_shift: float,
+    max_trailing_frames: int = 5,
+) -> List[Dict]:
+    """
+    Convert frame spans to phone intervals in seconds.
+
+    CTC posteriors are peaky (a phone often occupies one or two frames), so
+    each phone is extended over the blank frames that follow it, up to the
+    next phone or max_trailing_frames, whichever comes first.
+
+    Args:
+        phones: Phone labels, one per span
+        spans: (first_frame, last_frame) per phone, see ctc_forced_align
+        frame_shift: Seconds per frame
+        max_trailing_frames: Blank frames a phone may extend over
+
+    Returns:
+        List of dicts with 'phone', 'start', 'end' keys
+    """
+    alignments = []
+    for i, (phone, (first, last)) in enumerate(zip(phones, spans)):
+        end = last + 1 + max_trailing_frames
+        if i + 1 < len(spans):
+            end = min(end, spans[i + 1][0])
+        alignments.append({
+            "phone": phone,
+            "start": round(first * frame_shift, 3),
+            "end": round(end * frame_shift, 3),
+        })
+    return alignments
@@ -1,6 +1,62 @@
+"""
+Edit operations between what was said and what should have been said.
+
+edit_operations() is the entry point. edit_operations_reference() is the
+plain Python dynamic program and defines the expected output;
+edit_operations_fast() computes the same operation lists (including the
+backtrace tie-break order) with NumPy row sweeps, JIT-compiled with numba
+when it is installed, and edit_operations_banded() does so storing only a
+band around the diagonal. Both numpy and numba are optional.
+
+hierarchical_edit_operations() aligns word-segmented targets block by
+block instead of with one global DP.
+"""
+from array import array
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Try to import numba for JIT compilation (optional)
+try:
+    from numba import jit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    # Dummy decorator if numba not available
+    def jit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
 OPERATION_COSTS = {"insert": 1, "delete": 1, "substitute": 2}
 
+# Below this many DP cells the array setup costs more than it saves
+FAST_MIN_CELLS = 1024
+
+# From this many DP cells (paragraphs) only a band around the diagonal is stored
+BANDED_MIN_CELLS = 250_000
+
+
 def edit_operations(actual, target):
+    """
+    Edit operations comparing actual to target (see edit_operations_reference).
+    
+    When numpy is available, uses edit_operations_fast() for larger inputs
+    and edit_operations_banded() for long passages, so memory stays linear
+    in the passage length.
+    """
+    cells = len(actual) * len(target)
+    if HAS_NUMPY and cells >= BANDED_MIN_CELLS:
+        return edit_operations_banded(actual, target)
+    if HAS_NUMPY and cells >= FAST_MIN_CELLS:
+        return edit_operations_fast(actual, target)
+    return edit_operations_reference(actual, target)
+
+
+def edit_operations_reference(actual, target):
     """
     Returns list of edit operations comparing actual (what was said) to target (what should be said).
     
@@ -68,3 +124,497 @@ def edit_operations(actual, target):
     
     ops.reverse()
     return ops
+
+
+# ============================================================================
+# ACCELERATED IMPLEMENTATION
+# ============================================================================
+
+# Operation codes returned by _backtrace_codes
+_SUBSTITUTE, _INSERT, _DELETE = 0, 1, 2
+
+# Cost of cells outside a band (headroom keeps INF + costs within int32)
+_BAND_INF = 1 << 30
+
+
+def _encode(actual, target):
+    """Map symbols to integer ids shared by both sequences."""
+    if isinstance(actual, array) and isinstance(target, array):
+        # Already interned (e.g. shared.phonemes ids)
+        return np.array(actual, dtype=np.int64), np.array(target, dtype=np.int64)
+    ids = {}
+    a = np.array([ids.setdefault(x, len(ids)) for x in actual], dtype=np.int64)
+    b = np.array([ids.setdefault(x, len(ids)) for x in target], dtype=np.int64)
+    return a, b
+
+
+def _fill_dp_loops_impl(a, b, insert_cost, delete_cost, substitute_cost):
+    m = a.shape[0]
+    n = b.shape[0]
+    dp = np.empty((m + 1, n + 1), dtype=np.int64)
+    for i in range(m + 1):
+        dp[i, 0] = i * insert_cost
+    for j in range(n + 1):
+        dp[0, j] = j * delete_cost
+    for i in range(1, m + 1):
+        ai = a[i - 1]
+        for j in range(1, n + 1):
+            if ai == b[j - 1]:
+                dp[i, j] = dp[i - 1, j - 1]
+            else:
+                dp[i, j] = min(
+                    dp[i - 1, j] + insert_cost,
+                    dp[i, j - 1] + delete_cost,
+                    dp[i - 1, j - 1] + substitute_cost,
+                )
+    return dp
+
+
+def _fill_dp_rows(a, b, insert_cost, delete_cost, substitute_cost):
+    """
+    Fill the DP table one row at a time with NumPy.
+    
+    Within a row, dp[i][j] = min(c[j], dp[i][j-1] + delete_cost) where c
+    holds the up/diagonal candidates, so the row is
+    j * delete_cost + running_min(c[k] - k * delete_cost).
+    For matching symbols the reference takes the diagonal without the
+    left candidate; both agree when insert and delete costs are equal,
+    since neighbouring cells then differ by at most that cost.
+    """
+    m, n = len(a), len(b)
+    dp = np.empty((m + 1, n + 1), dtype=np.int64)
+    offsets = np.arange(n + 1, dtype=np.int64) * delete_cost
+    dp[0] = offsets
+    candidates = np.empty(n + 1, dtype=np.int64)
+    for i in range(1, m + 1):
+        prev = dp[i - 1]
+        diagonal = prev[:-1]
+        candidates[0] = i * insert_cost
+        np.minimum(prev[1:] + insert_cost, diagonal + substitute_cost, out=candidates[1:])
+        matches = b == a[i - 1]
+        candidates[1:][matches] = diagonal[matches]
+        candidates -= offsets
+        np.minimum.accumulate(candidates, out=dp[i])
+        dp[i] += offsets
+    return dp
+
+
+def _cell_impl(dp, i, j, shift, offset):
+    # dp[i][j] of a full table (shift 0, offset 0) or of a diagonal band
+    # stored as band[i, j - i - offset] (shift 1); cells outside are infinite
+    k = j - shift * i - offset
+    if k < 0 or k >= dp.shape[1]:
+        return _BAND_INF
+    return dp[i, k]
+
+
+def _backtrace_codes_impl(dp, a, b, insert_cost, delete_cost, substitute_cost, shift, offset):
+    # Same branch order as edit_operations_reference()
+    i = a.shape[0]
+    j = b.shape[0]
+    codes = np.empty(i + j, dtype=np.int64)
+    rows = np.empty(i + j, dtype=np.int64)
+    cols = np.empty(i + j, dtype=np.int64)
+    count = 0
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and a[i - 1] == b[j - 1]:
+            i -= 1
+            j -= 1
+            continue
+        current = _cell(dp, i, j, shift, offset)
+        if i > 0 and j > 0 and current == _cell(dp, i - 1, j - 1, shift, offset) + substitute_cost:
+            code = _SUBSTITUTE
+        elif i > 0 and current == _cell(dp, i - 1, j, shift, offset) + insert_cost:
+            code = _INSERT
+        elif j > 0 and current == _cell(dp, i, j - 1, shift, offset) + delete_cost:
+            code = _DELETE
+        elif i > 0:
+            code = _INSERT
+        else:
+            code = _DELETE
+        codes[count] = code
+        rows[count] = i - 1
+        cols[count] = j - 1
+        count += 1
+        if code != _DELETE:
+            i -= 1
+        if code != _INSERT:
+            j -= 1
+    return codes[:count], rows[:count], cols[:count]
+
+
+# JIT compile if numba is available
+if HAS_NUMBA:
+    _fill_dp_loops = jit(nopython=True, cache=True)(_fill_dp_loops_impl)
+    _cell = jit(nopython=True, cache=True)(_cell_impl)
+    _backtrace_codes = jit(nopython=True, cache=True)(_backtrace_codes_impl)
+else:
+    _fill_dp_loops = _fill_dp_loops_impl
+    _cell = _cell_impl
+    _backtrace_codes = _backtrace_codes_impl
+
+
+def edit_operations_fast(actual, target):
+    """
+    Same result as edit_operations_reference(), computed on integer arrays.
+    
+    Symbols are interned to ids (they must be hashable). The DP table is
+    filled with numba-compiled loops when numba is installed, otherwise with
+    NumPy row sweeps; the backtrace mirrors the reference branch by branch.
+    Requires numpy.
+    """
+    insert_cost = OPERATION_COSTS["insert"]
+    delete_cost = OPERATION_COSTS["delete"]
+    substitute_cost = OPERATION_COSTS["substitute"]
+    
+    a, b = _encode(actual, target)
+    if HAS_NUMBA or insert_cost != delete_cost:
+        dp = _fill_dp_loops(a, b, insert_cost, delete_cost, substitute_cost)
+    else:
+        dp = _fill_dp_rows(a, b, insert_cost, delete_cost, substitute_cost)
+    codes, rows, cols = _backtrace_codes(dp, a, b, insert_cost, delete_cost, substitute_cost, 0, 0)
+    return _decode_ops(codes, rows, cols, actual, target)
+
+
+def _decode_ops(codes, rows, cols, actual, target):
+    """Operation tuples from _backtrace_codes output (in reverse order)."""
+    ops = []
+    for code, i, j in zip(codes.tolist()[::-1], rows.tolist()[::-1], cols.tolist()[::-1]):
+        if code == _SUBSTITUTE:
+            ops.append(("substitute", i, target[j], actual[i]))
+        elif code == _INSERT:
+            ops.append(("insert", i, actual[i]))
+        else:
+            ops.append(("delete", j, target[j]))
+    return ops
+
+
+# ============================================================================
+# BANDED ALIGNMENT (long passages)
+# ============================================================================
+
+def _fill_band(a, b, lo, width, insert_cost, delete_cost, substitute_cost):
+    """
+    Fill the DP cells with lo <= j - i < lo + width, one row at a time.
+    
+    Row i is stored as band[i, k] for j = i + lo + k. Same row sweep as
+    _fill_dp_rows(); cells outside the band or the table stay _BAND_INF.
+    """
+    m, n = len(a), len(b)
+    band = np.full((m + 1, width), _BAND_INF, dtype=np.int32)
+    offsets = np.arange(width, dtype=np.int32) * delete_cost
+    # Target ids indexed by column j (column 0 never matches)
+    b_by_column = np.concatenate(([-1], b))
+    
+    k0, k1 = max(0, -lo), min(width - 1, n - lo)
+    band[0, k0:k1 + 1] = (np.arange(k0, k1 + 1) + lo) * delete_cost
+    
+    up = np.empty(width, dtype=np.int32)
+    for i in range(1, m + 1):
+        first = i + lo  # Column of band[i, 0]
+        k0, k1 = max(0, -first), min(width - 1, n - first)
+        if k0 > k1:
+            continue
+        prev = band[i - 1]
+        # Cell above band[i, k] is band[i-1, k+1], the diagonal one band[i-1, k]
+        up[:-1] = prev[1:]
+        up[-1] = _BAND_INF
+        diagonal = prev[k0:k1 + 1]
+        candidates = np.minimum(up[k0:k1 + 1] + insert_cost, diagonal + substitute_cost)
+        matches = b_by_column[first + k0:first + k1 + 1] == a[i - 1]
+        candidates[matches] = diagonal[matches]
+        if first + k0 == 0:
+            candidates[0] = i * insert_cost
+        candidates -= offsets[:k1 - k0 + 1]
+        row = band[i, k0:k1 + 1]
+        np.minimum.accumulate(candidates, out=row)
+        row += offsets[:k1 - k0 + 1]
+    return band
+
+
+def edit_operations_banded(actual, target, initial_slack: int = 16):
+    """
+    Same result as edit_operations_reference() in O((m+n)*d) time and memory.
+    
+    Ukkonen-style: only cells near the diagonal band between (0, 0) and
+    (m, n) are computed, i.e. j - i within `slack` of [min(0, n-m),
+    max(0, n-m)]. A path leaving that range by e cells needs 2e extra
+    insertions/deletions, so a band result of cost <= (|n-m| + 2*slack + 1)
+    times the cheaper of those costs proves every optimal path lies inside
+    the band; otherwise the band is widened (at least doubled, and far
+    enough that the cost just found would be proven) and recomputed. Cells
+    used by the backtrace then hold exact values and cells outside the band
+    could not have matched, so the operations (and tie-breaks) are identical
+    to the reference. Requires numpy.
+    
+    Args:
+        actual: List of symbols/words from what was actually said
+        target: List of symbols/words from what should have been said
+        initial_slack: Band half-width beyond |n-m| for the first attempt
+    """
+    insert_cost = OPERATION_COSTS["insert"]
+    delete_cost = OPERATION_COSTS["delete"]
+    substitute_cost = OPERATION_COSTS["substitute"]
+    if insert_cost != delete_cost:
+        # The row sweep relies on equal insert/delete costs
+        return edit_operations_fast(actual, target)
+    
+    a, b = _encode(actual, target)
+    m, n = len(a), len(b)
+    diff = n - m
+    slack = max(1, initial_slack)
+    while True:
+        lo = min(0, diff) - slack
+        hi = max(0, diff) + slack
+        covers_table = lo <= -m and hi >= n
+        if covers_table:
+            lo, hi = -m, n
+        band = _fill_band(a, b, lo, hi - lo + 1, insert_cost, delete_cost, substitute_cost)
+        cost = band[m, n - m - lo]
+        indel_cost = min(insert_cost, delete_cost)
+        if covers_table or cost <= (abs(diff) + 2 * slack + 1) * indel_cost:
+            break
+        # The band's path cost bounds the optimum, so this slack is sufficient
+        slack = max(2 * slack, (cost // indel_cost - abs(diff)) // 2)
+    
+    codes, rows, cols = _backtrace_codes(band, a, b, insert_cost, delete_cost, substitute_cost, 1, lo)
+    return _decode_ops(codes, rows, cols, actual, target)
+
+
+# ============================================================================
+# HIERARCHICAL (WORD-THEN-PHONE) ALIGNMENT
+# ============================================================================
+
+# Words shorter than this are too likely to match by accident to anchor on
+MIN_ANCHOR_PHONES = 2
+
+
+def _find_anchor(actual, word, start, expected, window):
+    """Position of word in actual[start:] closest to expected, within window."""
+    length = len(word)
+    best = None
+    last = min(len(actual) - length, expected + window)
+    for position in range(max(start, expected - window), last + 1):
+        if actual[position:position + length] == word:
+            if best is None or abs(position - expected) < abs(best - expected):
+                best = position
+            elif position > expected:
+                break
+    return best
+
+
+def hierarchical_edit_operations(actual, target_words):
+    """
+    Edit operations against a word-segmented target, aligned word by word.
+    
+    Target words that occur verbatim in actual near their expected position
+    are anchored as exact matches; edit_operations() then only runs on the
+    short stretches between anchors. Many tiny DPs replace one large one.
+    The result has the same format and positions as edit_operations() on the
+    flattened target. It is optimal within each stretch, but anchoring can
+    occasionally differ from the global optimum.
+    
+    Args:
+        actual: List of symbols from what was actually said
+        target_words: Target symbols grouped by word (list of lists)
+    
+    Returns:
+        List of operation tuples, see edit_operations_reference()
+    """
+    actual = list(actual)
+    ops = []
+    actual_done = 0  # actual[:actual_done] and target[:target_done] are aligned
+    target_done = 0
+    target_start = 0
+    
+    def align_gap(actual_end, target_end):
+        gap_ops = edit_operations(actual[actual_done:actual_end], target[target_done:target_end])
+        for op in gap_ops:
+            offset = target_done if op[0] == "delete" else actual_done
+            ops.append((op[0], op[1] + offset) + tuple(op[2:]))
+    
+    target = [symbol for word in target_words for symbol in word]
+    for word in target_words:
+        word = list(word)
+        if len(word) >= MIN_ANCHOR_PHONES:
+            expected = actual_done + (target_start - target_done)
+            window = max(8, 2 * len(word))
+            position = _find_anchor(actual, word, actual_done, expected, window)
+            if position is not None:
+                align_gap(position, target_start)
+                actual_done = position + len(word)
+                target_done = target_start + len(word)
+        target_start += len(word)
+    
+    align_gap(len(actual), len(target))
+    return ops
+
+
+def operation_word_indices(ops, word_lengths):
+    """
+    Target word index of each operation.
+    
+    Replays the alignment implied by ops (symbols between operations are
+    matches) to find the target position of every operation. Insertions
+    belong to the word of the preceding target symbol (the first word for
+    leading insertions).
+    
+    Args:
+        ops: Operations from edit_operations() or hierarchical_edit_operations()
+        word_lengths: Number of target symbols in each word
+    
+    Returns:
+        List of word indices, one per operation
+    """
+    word_of = [index for index, length in enumerate(word_lengths) for _ in range(length)]
+    if not word_of:
+        return [0] * len(ops)
+    
+    indices = []
+    i = j = 0  # Next actual and target positions
+    for op in ops:
+        op_type, position = op[0], op[1]
+        if op_type == "delete":
+            i += position - j
+            j = position
+            indices.append(word_of[min(j, len(word_of) - 1)])
+            j += 1
+        else:
+            j += position - i
+            i = position
+            if op_type == "substitute":
+                indices.append(word_of[min(j, len(word_of) - 1)])
+                j += 1
+            else:
+                indices.append(word_of[min(max(j - 1, 0), len(word_of) - 1)])
+            i += 1
+    return indices
+
+
+# ============================================================================
+# MULTI-REFERENCE (PRONUNCIATION VARIANT) ALIGNMENT
+# ============================================================================
+
+def lattice_edit_operations(actual, lattice):
+    """
+    Edit operations against the best of several pronunciations per word, in one pass.
+    
+    The target is a sequence of words, each with one or more acceptable
+    pronunciations (an empty pronunciation makes the word optional). Each
+    alternative gets its own DP table whose first column is the best cost
+    of the words before it; the column after a word is the minimum over
+    its alternatives. This finds the cheapest path through the lattice at
+    the cost of a single DP over all alternatives' symbols, instead of one
+    DP per combination. Tables are filled column by column with NumPy
+    (equal insert/delete costs assumed, as in edit_operations_fast()).
+    
+    With one pronunciation per word the result is identical to
+    edit_operations() on the flattened target. Requires numpy.
+    
+    Args:
+        actual: List of symbols from what was actually said
+        lattice: Per word, a list of alternative pronunciations (symbol lists)
+    
+    Returns:
+        Tuple of (operations, choices): operations as edit_operations()
+        returns them, with target positions in the chosen pronunciations
+        concatenated; choices is the index of the chosen alternative per
+        word (first alternative on ties)
+    """
+    insert_cost = OPERATION_COSTS["insert"]
+    delete_cost = OPERATION_COSTS["delete"]
+    substitute_cost = OPERATION_COSTS["substitute"]
+    if insert_cost != delete_cost:
+        raise ValueError("lattice_edit_operations requires equal insert and delete costs")
+    
+    ids = {}
+    def encode(sequence):
+        return np.array([ids.setdefault(x, len(ids)) for x in sequence], dtype=np.int64)
+    
+    a = encode(actual)
+    m = len(a)
+    row_offsets = np.arange(m + 1, dtype=np.int64) * insert_cost
+    
+    # Forward pass: one table per alternative, shape (m + 1, len(alternative) + 1)
+    entry = row_offsets.copy()  # Cost of actual[:i] against all previous words
+    word_tables = []
+    exits = []
+    candidates = np.empty(m + 1, dtype=np.int64)
+    for alternatives in lattice:
+        tables = []
+        exit_costs = None
+        for alternative in alternatives:
+            b = encode(alternative)
+            table = np.empty((m + 1, len(b) + 1), dtype=np.int64)
+            table[:, 0] = entry
+            for j in range(1, len(b) + 1):
+                # Column sweep: dp[i][j] = min(c[i], dp[i-1][j] + insert_cost)
+                left = table[:, j - 1]
+                diagonal = left[:-1]
+                candidates[0] = left[0] + delete_cost
+                np.minimum(left[1:] + delete_cost, diagonal + substitute_cost, out=candidates[1:])
+                matches = a == b[j - 1]
+                candidates[1:][matches] = diagonal[matches]
+                candidates -= row_offsets
+                np.minimum.accumulate(candidates, out=table[:, j])
+                table[:, j] += row_offsets
+            tables.append(table)
+            last = table[:, -1]
+            exit_costs = last.copy() if exit_costs is None else np.minimum(exit_costs, last)
+        if not tables:
+            continue
+        word_tables.append((alternatives, tables))
+        exits.append(exit_costs)
+        entry = exit_costs
+    
+    # Backtrace with the branch order of edit_operations_reference()
+    choices = [0] * len(word_tables)
+    steps = []  # (op_type, actual position, word, position in word)
+    i = m
+    for k in range(len(word_tables) - 1, -1, -1):
+        alternatives, tables = word_tables[k]
+        choice = next(c for c, table in enumerate(tables) if table[i, -1] == exits[k][i])
+        choices[k] = choice
+        table = tables[choice]
+        b = alternatives[choice]
+        j = len(b)
+        while j > 0:
+            if i > 0 and actual[i - 1] == b[j - 1]:
+                i -= 1
+                j -= 1
+            elif i > 0 and table[i, j] == table[i - 1, j - 1] + substitute_cost:
+                steps.append(("substitute", i - 1, k, j - 1))
+                i -= 1
+                j -= 1
+            elif i > 0 and table[i, j] == table[i - 1, j] + insert_cost:
+                steps.append(("insert", i - 1, k, j))
+                i -= 1
+            elif table[i, j] == table[i, j - 1] + delete_cost:
+                steps.append(("delete", i, k, j - 1))
+                j -= 1
+            elif i > 0:
+                steps.append(("insert", i - 1, k, j))
+                i -= 1
+            else:
+                steps.append(("delete", i, k, j - 1))
+                j -= 1
+    while i > 0:
+        steps.append(("insert", i - 1, 0, 0))
+        i -= 1
+    
+    chosen = [alternatives[c] for (alternatives, _), c in zip(word_tables, choices)]
+    word_starts = []
+    total = 0
+    for pronunciation in chosen:
+        word_starts.append(total)
+        total += len(pronunciation)
+    
+    ops = []
+    for op_type, i, k, j in reversed(steps):
+        if op_type == "substitute":
+            ops.append(("substitute", i, chosen[k][j], actual[i]))
+        elif op_type == "insert":
+            ops.append(("insert", i, actual[i]))
+        else:
+            ops.append(("delete", word_starts[k] + j, chosen[k][j]))
+    return ops, choices
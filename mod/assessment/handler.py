@@ -1,51 +1,116 @@
 """
 RunPod handler for pronunciation assessment endpoint.
 """
+import time
+
+_boot_start = time.perf_counter()
+
 import runpod
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import sys
 import os
-import subprocess
-import time
-
-print(f"DEBUG: sys.path: {sys.path}")
-try:
-    print("DEBUG: pip freeze:")
-    subprocess.run([sys.executable, "-m", "pip", "freeze"], check=False)
-except Exception as e:
-    print(f"DEBUG: Failed to run pip freeze: {e}")
 
 from typing import Any, Dict, List
 
 # Add parent directory to path to import shared modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from assess import assess, get_models
+from assess import assess_audio, fetch_audio, cached_result, get_models, enable_batching, warm_up_models
+from shared.startup import boot_worker
+from shared.tracing import DEBUG, Trace
+from mfa_aligner import get_mfa_aligner
+from result_cache import get_result_cache
+from target_ipa_store import get_target_ipa_store
+
+# Concurrent jobs per worker. Above 1, jobs overlap their audio I/O with other
+# jobs' inference, and their POWSM encoder passes are micro-batched (held for
+# up to BATCH_WINDOW_MS; 0 disables batching).
+MAX_CONCURRENCY = int(os.environ.get("ASSESSMENT_CONCURRENCY", "1"))
+BATCH_WINDOW_MS = float(os.environ.get("ASSESSMENT_BATCH_WINDOW_MS", "20"))
+
+# Download and decode run here, off the event loop and off the inference threads
+_io_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="audio-io")
+
+
+def start_mfa():
+    """Detect MFA once and load its models in the persistent alignment server."""
+    aligner = get_mfa_aligner()
+    if aligner is not None:
+        aligner.start()
+
 
-# Pre-load models on worker startup (not on first request)
-print("DEBUG: Pre-loading POWSM models on worker startup...")
-start_time = time.time()
-get_models()  # This will load and cache the models
-load_time = time.time() - start_time
-print(f"DEBUG: Models pre-loaded in {load_time:.2f} seconds")
+# Load and warm up POWSM before the first request; MFA, the audio decoder
+# (soundfile), the target IPA index and the result cache load alongside
+# (see shared.startup)
+boot_worker(
+    load_models=get_models,
+    warm_up=warm_up_models,
+    background={
+        "mfa": start_mfa,
+        "import_soundfile": lambda: __import__("soundfile"),
+        "target_ipa_index": lambda: len(get_target_ipa_store()),
+        "result_cache": get_result_cache,
+    },
+    start=_boot_start,
+)
 
+if MAX_CONCURRENCY > 1 and BATCH_WINDOW_MS > 0:
+    enable_batching(window_ms=BATCH_WINDOW_MS, max_batch=MAX_CONCURRENCY)
 
-def handler(job):
+
+def prepare_job(audio_uri: str, target_text: str, target_ipa=None, trace=None):
+    """
+    Download the recording and decode it unless the result is already cached.
+    
+    Download and decode are timed into trace (the I/O pool does not inherit
+    the handler's context).
+    
+    Returns:
+        Tuple of (audio, cached result or None)
+    """
+    with (trace or Trace()).activate():
+        audio = fetch_audio(audio_uri)
+        cached = cached_result(audio, target_text, target_ipa)
+        if cached is None:
+            audio.decode()
+    return audio, cached
+
+
+def concurrency_modifier(current_concurrency: int) -> int:
+    """Number of jobs RunPod may hand this worker at once."""
+    return MAX_CONCURRENCY
+
+
+async def handler(job):
     """
     RunPod job handler for pronunciation assessment.
     
+    Download and decode run on the audio I/O pool and the assessment on a
+    worker thread, where model execution is serialized by the device
+    semaphore (see shared.powsm). With MAX_CONCURRENCY > 1 one job's
+    fetch/decode therefore overlaps another job's inference. Repeated
+    submissions are answered from the result cache without decoding.
+    Every stage is timed into the job's trace (see shared.tracing).
+    
     Input:
         {
             "audio_uri": str,        # URI to audio file
             "target_text": str,      # Target text (ground truth transcript)
-            "target_ipa": str?       # Optional target IPA (if not provided, will generate with G2P)
+            "target_ipa": str?       # Optional target IPA (if not provided, will generate with G2P);
+                                     # words may be separated by spaces for word-level errors,
+                                     # and "|" separates accepted variants of a word
         }
     
     Output:
         {
             "actual_ipa": str,       # Detected IPA from PR
             "target_ipa": str,       # Target IPA from G2P
+            "chosen_target_ipa": str, # Target variants that matched best
             "score": float,          # Pronunciation score (0.0-1.0)
-            "errors": List[Dict]     # List of errors with timestamps
+            "errors": List[Dict],    # List of errors with timestamps
+            "timings": Dict          # Milliseconds per stage (download, decode, pr, ...)
         }
     """
     try:
@@ -60,7 +125,24 @@ def handler(job):
         if not target_text:
             return {"error": "Missing 'target_text' in input"}
         
-        result = assess(audio_uri, target_text, target_ipa)
+        trace = Trace()
+        loop = asyncio.get_running_loop()
+        audio, cached = await loop.run_in_executor(
+            _io_pool, partial(prepare_job, audio_uri, target_text, target_ipa, trace)
+        )
+        with audio:
+            if cached is not None:
+                if DEBUG:
+                    print("DEBUG: Result cache hit, skipping assessment")
+                result = cached
+            else:
+                # to_thread copies this context, so assess_audio times into trace
+                with trace.activate():
+                    # prepare_job already missed the result cache: don't look again
+                    result = await asyncio.to_thread(
+                        partial(assess_audio, audio, target_text, target_ipa, check_cache=False)
+                    )
+        result["timings"] = trace.finish()
         return result
         
     except ValueError as e:
@@ -73,4 +155,7 @@ def handler(job):
 
 
 if __name__ == "__main__":
-    runpod.serverless.start({"handler": handler})
+    runpod.serverless.start({
+        "handler": handler,
+        "concurrency_modifier": concurrency_modifier,
+    })
@@ -0,0 +1,297 @@
+"""
+Long-lived MFA alignment backend.
+
+MFA is detected once per worker. Instead of launching `mfa align` per
+request (which reloads the dictionary and acoustic model every time),
+alignment jobs go through a local queue to a persistent mfa_server.py
+process that keeps the models loaded and returns phone intervals directly.
+
+Configured with:
+- MFA_PERSISTENT: set to 0 to always use one-shot `mfa align` (default 1)
+- MFA_ALIGN_TIMEOUT: seconds per alignment job (default 300)
+"""
+import json
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future, InvalidStateError, TimeoutError
+from typing import Dict, List, Optional
+
+# Add parent directory to path to import shared modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.tracing import DEBUG
+
+# Where MFA may be installed, in order of preference
+MFA_PATHS = [
+    "mfa",  # In PATH
+    "/opt/conda/envs/mfa/bin/mfa",  # MFA conda environment
+    "/opt/conda/envs/worker/bin/mfa",  # Worker conda environment
+    "/opt/conda/bin/mfa",  # Base conda
+]
+
+NETWORK_VOLUME_PATH = "/runpod-volume"
+
+
+def find_mfa_command() -> Optional[str]:
+    """Return the first working MFA command, or None if MFA is not installed."""
+    for mfa_path in MFA_PATHS:
+        try:
+            result = subprocess.run([mfa_path, "version"], capture_output=True, timeout=5)
+            if result.returncode == 0:
+                return mfa_path
+        except Exception:
+            continue
+    return None
+
+
+def mfa_environment(env: Optional[dict] = None) -> dict:
+    """
+    Environment for MFA processes.
+
+    MFA_ROOT_DIR stores dictionaries, acoustic models, and configuration;
+    it lives on the network volume if available.
+    """
+    env_dict = env.copy() if env else os.environ.copy()
+    if os.path.exists(NETWORK_VOLUME_PATH):
+        mfa_root_dir = os.path.join(NETWORK_VOLUME_PATH, ".cache", "mfa")
+        os.makedirs(mfa_root_dir, exist_ok=True)
+        if DEBUG:
+            print(f"DEBUG: Using network volume for MFA root directory at {mfa_root_dir}")
+    else:
+        # Use default MFA root location (~/Documents/MFA)
+        mfa_root_dir = os.path.expanduser("~/Documents/MFA")
+        if DEBUG:
+            print(f"DEBUG: Using default MFA root directory at {mfa_root_dir}")
+    env_dict["MFA_ROOT_DIR"] = mfa_root_dir
+    return env_dict
+
+
+def _mfa_python(mfa_command: str) -> str:
+    """Python interpreter of the environment MFA is installed in."""
+    resolved = shutil.which(mfa_command) or mfa_command
+    candidate = os.path.join(os.path.dirname(os.path.realpath(resolved)), "python")
+    return candidate if os.path.exists(candidate) else sys.executable
+
+
+class MfaAligner:
+    """
+    Aligns utterances through a persistent MFA server process.
+
+    align() may be called from any thread; jobs are queued and run one at a
+    time by a dispatcher thread that owns the server. The server is started
+    on the first job (or by start()) and restarted if it dies. If it cannot
+    be started at all, or a job fails or times out, align() returns None
+    and callers fall back to one-shot `mfa align` (see
+    assess.run_mfa_alignment).
+    """
+
+    def __init__(
+        self,
+        mfa_command: str,
+        dictionary_id: str = "english_us_mfa",
+        acoustic_id: str = "english_mfa",
+        persistent: bool = True,
+        timeout: float = 300.0,
+        startup_timeout: float = 300.0,
+    ):
+        self.mfa_command = mfa_command
+        self.dictionary_id = dictionary_id
+        self.acoustic_id = acoustic_id
+        self.persistent = persistent
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self._process: Optional[subprocess.Popen] = None
+        self._responses: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        self._jobs: "queue.Queue[tuple]" = queue.Queue()
+        self._next_id = 0
+        self._thread = None
+        self._available = True  # False once the server failed to start
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the dispatcher (and load the server) ahead of the first job."""
+        with self._lock:
+            if self._thread is None and self.persistent:
+                self._thread = threading.Thread(target=self._run, name="mfa-aligner", daemon=True)
+                self._thread.start()
+                self._jobs.put(None)  # Warm-up: start the server now
+
+    def align(self, audio_file: str, transcription: str) -> Optional[List[Dict]]:
+        """
+        Align a transcription (MFA format, see powsm_to_mfa_format) to audio.
+
+        Args:
+            audio_file: Path to a WAV file
+            transcription: Space-separated transcription
+
+        Returns:
+            List of dicts with 'phone', 'start', 'end' (empty if MFA aligned
+            nothing), or None if the persistent server is unavailable or the
+            job failed or timed out
+        """
+        if not self.persistent:
+            return None
+        if not transcription:
+            return []
+        self.start()
+        future: Future = Future()
+        self._jobs.put((audio_file, transcription, future))
+        try:
+            # Queued behind other jobs, possibly behind a server (re)start
+            return future.result(timeout=self.timeout + self.startup_timeout)
+        except TimeoutError:
+            future.cancel()
+            print("ERROR: MFA alignment job timed out in the queue")
+            return None
+
+    def _start_server(self) -> bool:
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mfa_server.py")
+        cmd = [
+            _mfa_python(self.mfa_command),
+            script,
+            "--dictionary",
+            self.dictionary_id,
+            "--acoustic-model",
+            self.acoustic_id,
+        ]
+        if DEBUG:
+            print(f"DEBUG: Starting persistent MFA server: {' '.join(cmd)}")
+        try:
+            self._process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                bufsize=1,
+                env=mfa_environment(),
+            )
+        except OSError as e:
+            print(f"ERROR: Failed to start MFA server: {e}")
+            return False
+
+        self._responses = queue.Queue()
+        threading.Thread(
+            target=self._read_responses,
+            args=(self._process, self._responses),
+            name="mfa-server-reader",
+            daemon=True,
+        ).start()
+
+        message = self._next_response(self.startup_timeout)
+        if message is None or not message.get("ready"):
+            error = message.get("error") if message else "no response"
+            print(f"ERROR: MFA server failed to load models: {error}")
+            self._stop_server()
+            return False
+        if DEBUG:
+            print("DEBUG: Persistent MFA server ready")
+        return True
+
+    def _stop_server(self):
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+
+    @staticmethod
+    def _read_responses(process: subprocess.Popen, responses: "queue.Queue[Optional[Dict]]"):
+        for line in process.stdout:
+            try:
+                responses.put(json.loads(line))
+            except ValueError:
+                continue
+        responses.put(None)  # Server exited
+
+    def _next_response(self, timeout: float) -> Optional[Dict]:
+        try:
+            return self._responses.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    @staticmethod
+    def _resolve(future: Future, result: Optional[List[Dict]]):
+        """Resolve a job's future unless its caller already gave up on it."""
+        try:
+            future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            future = job[2] if job is not None else None
+            if future is not None and future.cancelled():
+                continue
+            try:
+                result = self._process_job(job)
+            except Exception as e:
+                # Never leave a caller waiting: fall back to one-shot `mfa align`
+                print(f"ERROR: MFA aligner failed: {e}")
+                self._stop_server()
+                result = None
+            if future is not None:
+                self._resolve(future, result)
+
+    def _process_job(self, job) -> Optional[List[Dict]]:
+        """Run one job (None: just make sure the server is up)."""
+        if self._available and (self._process is None or self._process.poll() is not None):
+            # Models that fail to load will not load on retry either
+            self._available = self._start_server()
+            if not self._available:
+                print("WARNING: Persistent MFA unavailable, falling back to one-shot `mfa align`")
+
+        if job is None or not self._available:
+            return None
+        audio_file, transcription, _ = job
+
+        self._next_id += 1
+        request = {"id": self._next_id, "audio_file": audio_file, "text": transcription}
+        try:
+            self._process.stdin.write(json.dumps(request, ensure_ascii=False) + "\n")
+            self._process.stdin.flush()
+        except OSError as e:
+            print(f"ERROR: MFA server connection lost: {e}")
+            self._stop_server()
+            return None
+
+        response = self._next_response(self.timeout)
+        if response is None:
+            print("ERROR: MFA server timed out or exited, restarting on next job")
+            self._stop_server()
+            return None
+        if "error" in response:
+            print(f"ERROR: MFA alignment failed: {response['error']}")
+            return None
+        return response.get("alignments", [])
+
+
+# Singleton aligner (None when MFA is not installed)
+_aligner = None
+_aligner_initialized = False
+_aligner_lock = threading.Lock()
+
+
+def get_mfa_aligner() -> Optional[MfaAligner]:
+    """Return the worker-wide MFA aligner, detecting MFA on first call."""
+    global _aligner, _aligner_initialized
+    with _aligner_lock:
+        if not _aligner_initialized:
+            mfa_command = find_mfa_command()
+            if mfa_command is not None:
+                if DEBUG:
+                    print(f"DEBUG: MFA is available at {mfa_command}")
+                _aligner = MfaAligner(
+                    mfa_command,
+                    persistent=os.environ.get("MFA_PERSISTENT", "1") != "0",
+                    timeout=float(os.environ.get("MFA_ALIGN_TIMEOUT", "300")),
+                )
+            else:
+                if DEBUG:
+                    print("DEBUG: MFA not available")
+            _aligner_initialized = True
+    return _aligner
@@ -0,0 +1,146 @@
+"""
+Persistent MFA alignment server.
+
+Runs under the Python interpreter of the MFA environment (MFA is usually
+installed in its own conda env, so it cannot be imported by the worker).
+Loads the acoustic model and compiles the pronunciation dictionary once,
+then aligns one utterance per request:
+
+    stdin:  {"id": 1, "audio_file": "/tmp/x.wav", "text": "h ɛ l o"}
+    stdout: {"id": 1, "alignments": [{"phone": "h", "start": 0.1, "end": 0.2}, ...]}
+            {"id": 1, "error": "..."}
+
+The first line written is {"ready": true} once models are loaded, or
+{"error": "..."} if they could not be. Everything MFA logs goes to stderr.
+
+Started by mfa_aligner.MfaAligner; not meant to be run by hand.
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Labels MFA emits for silence/non-speech; TextGrid output leaves these empty
+SILENCE_LABELS = {"", "sil", "<eps>"}
+
+
+def resolve_model_path(model_class, name: str) -> Path:
+    """Path of a pretrained MFA model given its ID or a file path."""
+    if os.path.exists(name):
+        return Path(name)
+    return Path(model_class.get_pretrained_path(name))
+
+
+class Aligner:
+    """Acoustic model, lexicon and tokenizer kept in memory between requests."""
+
+    def __init__(self, dictionary_id: str, acoustic_id: str, beam: int, retry_beam: int):
+        from kalpy.fstext.lexicon import LexiconCompiler
+        from montreal_forced_aligner import config
+        from montreal_forced_aligner.models import AcousticModel, DictionaryModel
+        from montreal_forced_aligner.tokenization.simple import SimpleTokenizer
+
+        self.acoustic_model = AcousticModel(resolve_model_path(AcousticModel, acoustic_id))
+        parameters = self.acoustic_model.parameters
+
+        self.lexicon_compiler = LexiconCompiler(
+            disambiguation=False,
+            silence_probability=parameters["silence_probability"],
+            initial_silence_probability=parameters["initial_silence_probability"],
+            final_silence_correction=parameters["final_silence_correction"],
+            final_non_silence_correction=parameters["final_non_silence_correction"],
+            silence_phone=parameters["optional_silence_phone"],
+            oov_phone=parameters["oov_phone"],
+            position_dependent_phones=parameters["position_dependent_phones"],
+            phones=parameters["non_silence_phones"],
+            ignore_case=config.IGNORE_CASE,
+        )
+        self.lexicon_compiler.load_pronunciations(resolve_model_path(DictionaryModel, dictionary_id))
+        self.lexicon_compiler.create_fsts()
+        self.lexicon_compiler.clear()
+
+        self.tokenizer = SimpleTokenizer(
+            word_table=self.lexicon_compiler.word_table,
+            word_break_markers=config.WORD_BREAK_MARKERS,
+            punctuation=config.PUNCTUATION,
+            clitic_markers=config.CLITIC_MARKERS,
+            compound_markers=config.COMPOUND_MARKERS,
+            brackets=config.BRACKETS,
+            laughter_word=config.LAUGHTER_WORD,
+            oov_word=config.OOV_WORD,
+            bracketed_word=config.BRACKETED_WORD,
+            cutoff_word=config.CUTOFF_WORD,
+            ignore_case=config.IGNORE_CASE,
+        )
+        self.align_options = {"beam": beam, "retry_beam": retry_beam}
+
+    def align(self, audio_file: str, text: str):
+        from kalpy.feat.cmvn import CmvnComputer
+        from kalpy.utterance import Segment
+        from kalpy.utterance import Utterance as KalpyUtterance
+        from montreal_forced_aligner.online.alignment import align_utterance_online
+
+        normalized, _, _ = self.tokenizer(text)
+        utterance = KalpyUtterance(Segment(audio_file), normalized)
+        utterance.generate_mfccs(self.acoustic_model.mfcc_computer)
+        cmvn = CmvnComputer().compute_cmvn_from_features([utterance.mfccs])
+        utterance.apply_cmvn(cmvn)
+
+        ctm = align_utterance_online(
+            self.acoustic_model,
+            utterance,
+            self.lexicon_compiler,
+            **self.align_options,
+        )
+
+        alignments = []
+        for word in ctm.word_intervals:
+            for phone in word.phones:
+                if phone.label in SILENCE_LABELS:
+                    continue
+                alignments.append({
+                    "phone": phone.label,
+                    "start": round(float(phone.begin), 4),
+                    "end": round(float(phone.end), 4),
+                })
+        return alignments
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent MFA alignment server (JSON lines on stdin/stdout)")
+    parser.add_argument("--dictionary", default="english_us_mfa", help="MFA dictionary ID or path")
+    parser.add_argument("--acoustic-model", default="english_mfa", help="MFA acoustic model ID or path")
+    parser.add_argument("--beam", type=int, default=400)
+    parser.add_argument("--retry-beam", type=int, default=1600)
+    args = parser.parse_args()
+
+    # Keep the protocol stream clean: anything printed by MFA goes to stderr
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), 'w', encoding='utf-8', buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    def send(message):
+        protocol.write(json.dumps(message, ensure_ascii=False) + "\n")
+        protocol.flush()
+
+    try:
+        aligner = Aligner(args.dictionary, args.acoustic_model, args.beam, args.retry_beam)
+    except Exception as e:
+        send({"error": f"{type(e).__name__}: {e}"})
+        return 1
+    send({"ready": True})
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        try:
+            alignments = aligner.align(request["audio_file"], request["text"])
+            send({"id": request.get("id"), "alignments": alignments})
+        except Exception as e:
+            send({"id": request.get("id"), "error": f"{type(e).__name__}: {e}"})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Content-addressed cache of assessment results.
+
+The same recording is often submitted more than once (client retries, proxy
+retries, users re-opening results). Results are keyed by a hash of the audio
+bytes, the target text/IPA and the result version (models, scoring code and
+every setting that changes the result, see assess.result_version), kept in a
+bounded in-memory LRU and optionally on disk (e.g. the network volume) so
+other workers can reuse them.
+
+Configured with:
+- ASSESSMENT_RESULT_CACHE_SIZE: in-memory entries (default 256, 0 disables the cache)
+- ASSESSMENT_RESULT_CACHE_DIR: on-disk tier, off unless set (e.g.
+  /runpod-volume/.cache/assessment_results)
+- ASSESSMENT_RESULT_CACHE_DISK_ENTRIES: files kept in the on-disk tier
+  (default 10000; the least recently used are removed beyond that)
+"""
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from shared.powsm import POWSM_MODEL_TAG, QUANTIZE_INT8
+
+# On-disk results are pruned back to the limit once every PRUNE_EVERY writes
+PRUNE_EVERY = 64
+
+
+def _read_service_version() -> str:
+    try:
+        with open(os.path.join(os.path.dirname(__file__), "VERSION"), 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return "unknown"
+
+
+# Results change whenever the models (including INT8 quantization) or the scoring code change
+MODEL_VERSION = f"{POWSM_MODEL_TAG}{'+int8' if QUANTIZE_INT8 else ''}+assessment-{_read_service_version()}"
+
+
+def cache_key(audio_digest: str, target_text: str, target_ipa: Optional[str], model_version: str) -> str:
+    """
+    Build the cache key for one assessment request.
+
+    Args:
+        audio_digest: SHA-256 hex digest of the audio bytes
+        target_text: Target text as submitted
+        target_ipa: Target IPA as submitted (None when not provided)
+        model_version: Identifies models, scoring code and settings producing
+            the result (see assess.result_version)
+    """
+    payload = json.dumps([audio_digest, target_text, target_ipa, model_version], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _json_default(value):
+    # numpy scalars in signal quality metrics
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ResultCache:
+    """
+    Bounded LRU of assessment results with an optional on-disk tier.
+
+    Stored and returned results are copies, so callers may modify them. The
+    on-disk tier is bounded too: file modification times record use, and
+    the oldest files beyond max_disk_entries are removed.
+    """
+
+    def __init__(self, max_entries: int = 256, disk_dir: Optional[str] = None, max_disk_entries: int = 10000):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir or None
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached result for key, or None."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                return copy.deepcopy(result)
+
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            os.utime(path)  # Recently used: pruned last
+        except (OSError, ValueError) as e:
+            print(f"ERROR: Failed to read cached result {path}: {e}")
+            return None
+        self._remember(key, result)
+        return copy.deepcopy(result)
+
+    def put(self, key: str, result: Dict):
+        """Store a copy of result under key (memory, and disk if configured)."""
+        # JSON round trip: a detached copy that matches what the disk tier returns
+        serialized = json.dumps(result, ensure_ascii=False, default=_json_default)
+        self._remember(key, json.loads(serialized))
+
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(serialized)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"ERROR: Failed to write cached result {path}: {e}")
+            return
+        with self._lock:
+            self._writes += 1
+            due = self._writes % PRUNE_EVERY == 0
+        if due:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """Remove the least recently used files beyond max_disk_entries."""
+        if self.disk_dir is None:
+            return
+        files = []
+        for directory, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if name.endswith(".json"):
+                    path = os.path.join(directory, name)
+                    try:
+                        files.append((os.path.getmtime(path), path))
+                    except OSError:
+                        pass  # Removed by another worker
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort()
+        for _, path in files[:len(files) - self.max_disk_entries]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def _remember(self, key: str, result: Dict):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Singleton cache (None when disabled)
+_cache = None
+_cache_initialized = False
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Return the worker-wide result cache, or None if disabled."""
+    global _cache, _cache_initialized
+    if not _cache_initialized:
+        with _cache_lock:
+            if not _cache_initialized:
+                max_entries = int(os.environ.get("ASSESSMENT_RESULT_CACHE_SIZE", "256"))
+                if max_entries > 0:
+                    _cache = ResultCache(
+                        max_entries=max_entries,
+                        disk_dir=os.environ.get("ASSESSMENT_RESULT_CACHE_DIR"),
+                        max_disk_entries=int(os.environ.get("ASSESSMENT_RESULT_CACHE_DISK_ENTRIES", "10000")),
+                    )
+                _cache_initialized = True
+    return _cache
+
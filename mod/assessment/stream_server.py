@@ -0,0 +1,147 @@
+"""
+WebSocket server for streaming pronunciation assessment.
+
+Runs next to the RunPod handler (handler.py) for clients that stream the
+recording while the user speaks instead of uploading it afterwards.
+Protocol on /ws/assess:
+- client: a JSON text message {"target_text", "target_ipa"?, "sample_rate"?}
+- client: binary messages of 16-bit little-endian mono PCM at 16kHz
+- server: {"type": "segment", ...} for every speech segment recognized
+- client: {"type": "end"} when the recording stops
+- server: {"type": "result", ...} (see assess_audio) and closes
+
+Errors are sent as {"type": "error", "error"} before closing.
+
+Run from mod/ with:
+    python assessment/stream_server.py
+"""
+import time
+
+_boot_start = time.perf_counter()
+
+import asyncio
+import json
+import sys
+import os
+from typing import Optional
+
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+import uvicorn
+
+# Add parent directory to path to import shared modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from assess import get_models, warm_up_models
+from streaming import StreamingSession
+from shared.startup import boot_worker
+from shared.tracing import DEBUG
+from mfa_aligner import get_mfa_aligner
+from target_ipa_store import get_target_ipa_store
+
+HOST = os.environ.get("ASSESSMENT_STREAM_HOST", "0.0.0.0")
+PORT = int(os.environ.get("ASSESSMENT_STREAM_PORT", "8000"))
+
+app = FastAPI(title="Streaming pronunciation assessment")
+
+
+def start_mfa():
+    """Detect MFA once and load its models in the persistent alignment server."""
+    aligner = get_mfa_aligner()
+    if aligner is not None:
+        aligner.start()
+
+
+def is_end_message(text: Optional[str]) -> bool:
+    """True for the client's {"type": "end"}; any other text is not an error."""
+    if not text:
+        return False
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return False
+    return isinstance(payload, dict) and payload.get("type") == "end"
+
+
+@app.websocket("/ws/assess")
+async def assess_stream(websocket: WebSocket):
+    """
+    One streamed assessment per connection.
+
+    PCM is fed to the session's VAD on the event loop; completed segments
+    are recognized in order on a worker thread while the stream goes on,
+    and the final alignment and scoring run once the client sends "end".
+    """
+    await websocket.accept()
+    recognizer = None
+    try:
+        start = await websocket.receive_json()
+        if not isinstance(start, dict):
+            raise ValueError("start message must be a JSON object")
+        target_text = start.get("target_text")
+        if not target_text:
+            await websocket.send_json({"type": "error", "error": "Missing 'target_text' in start message"})
+            await websocket.close()
+            return
+        session = StreamingSession(target_text, start.get("target_ipa"), int(start.get("sample_rate", 16000)))
+
+        # Segments are recognized one at a time, in order, off the event loop
+        segments: asyncio.Queue = asyncio.Queue()
+
+        async def recognize_segments():
+            while True:
+                segment = await segments.get()
+                if segment is None:
+                    return
+                event = await asyncio.to_thread(session.recognize, segment)
+                await websocket.send_json(event)
+
+        recognizer = asyncio.create_task(recognize_segments())
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes") is not None:
+                for segment in session.feed(message["bytes"]):
+                    segments.put_nowait(segment)
+            elif is_end_message(message.get("text")):
+                break
+            # Anything else (e.g. keep-alive text) is ignored
+
+        segments.put_nowait(None)
+        await recognizer
+        result = await asyncio.to_thread(session.finish)
+        await websocket.send_json({"type": "result", **result})
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        if DEBUG:
+            print("DEBUG: Stream closed by client before the end message")
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "error": f"Invalid input: {str(e)}"})
+        await websocket.close()
+    except Exception as e:
+        print(f"ERROR: Unexpected exception in stream: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        try:
+            await websocket.send_json({"type": "error", "error": f"Assessment failed: {str(e)}"})
+            await websocket.close()
+        except Exception:
+            pass
+    finally:
+        if recognizer is not None and not recognizer.done():
+            recognizer.cancel()
+
+
+if __name__ == "__main__":
+    # Same boot sequence as the RunPod handler (see shared.startup)
+    boot_worker(
+        load_models=get_models,
+        warm_up=warm_up_models,
+        background={
+            "mfa": start_mfa,
+            "target_ipa_index": lambda: len(get_target_ipa_store()),
+        },
+        start=_boot_start,
+    )
+    uvicorn.run(app, host=HOST, port=PORT)
@@ -0,0 +1,254 @@
+"""
+Streaming pronunciation assessment.
+
+The client sends the recording as raw PCM while the user speaks. An energy
+VAD (SpeechSegmenter) closes a speech segment at every pause, and each
+completed segment gets its PR, CTC alignment and ASR passes right away
+(recognize_utterance), so by the time the stream ends only the last
+segment, G2P, alignment and scoring remain. The final result has the same
+shape as assess_audio()'s. stream_server.py serves sessions over a
+WebSocket.
+"""
+import sys
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Add parent directory to path to import shared modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.audio import AudioClip
+from shared.powsm import encode_batch
+from shared.tracing import DEBUG, Trace, span
+from assess import (
+    MAX_SEGMENT_SECONDS,
+    get_device,
+    get_powsm,
+    preflight_check,
+    recognize_utterance,
+    resolve_alignment_method,
+    score_assessment,
+    segment_at_pauses,
+    segment_target_ipa,
+    stitch_segments,
+)
+from target_ipa_store import lookup_target_ipa
+
+# Streams are 16-bit little-endian mono PCM at the model rate
+SAMPLE_RATE = 16000
+
+# A segment closes after PAUSE_SECONDS of silence; PAD_SECONDS
+# of the surrounding audio is kept on both sides of the speech
+PAUSE_SECONDS = float(os.environ.get("ASSESSMENT_STREAM_PAUSE_SECONDS", "0.5"))
+PAD_SECONDS = float(os.environ.get("ASSESSMENT_STREAM_PAD_SECONDS", "0.2"))
+
+# Hops quieter than this RMS are never speech (about -40 dBFS)
+MIN_SPEECH_RMS = 0.01
+
+
+def pcm16_to_float(pcm: bytes) -> np.ndarray:
+    """16-bit little-endian PCM to float32 samples in [-1, 1)."""
+    return np.frombuffer(pcm, dtype='<i2').astype(np.float32) / 32768.0
+
+
+class SpeechSegmenter:
+    """
+    Energy VAD that splits a stream into speech segments as samples arrive.
+
+    Works on 10ms hops. A hop is speech when its RMS exceeds both
+    MIN_SPEECH_RMS and three times the noise floor, a running estimate
+    that follows the quiet hops (quickly down, slowly up). A segment opens
+    at the first speech hop and closes after pause_seconds of silence, or
+    when it reaches max_segment_seconds (the model input limit).
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        pause_seconds: float = PAUSE_SECONDS,
+        pad_seconds: float = PAD_SECONDS,
+        max_segment_seconds: float = MAX_SEGMENT_SECONDS,
+    ):
+        self.hop_size = int(0.010 * sample_rate)
+        self.pause_hops = max(1, int(round(pause_seconds * sample_rate / self.hop_size)))
+        self.pad = int(pad_seconds * sample_rate)
+        self.max_samples = int(max_segment_seconds * sample_rate)
+        self.noise_floor = MIN_SPEECH_RMS / 3
+        self.total = 0             # Samples received
+        self._pending = np.zeros(0, dtype=np.float32)  # Incomplete hop
+        self._hops = 0             # Complete hops analyzed
+        self._last_end = 0         # End of the last closed segment
+        self._start = None         # Start of the open segment (sample), if any
+        self._speech_end = 0       # End of the latest speech hop (sample)
+        self._silent_hops = 0      # Silent hops since then
+
+    def feed(self, samples: np.ndarray) -> List[Tuple[int, int]]:
+        """Add samples; return the segments (start, end) they completed."""
+        self.total += len(samples)
+        samples = np.concatenate((self._pending, samples))
+        count = len(samples) // self.hop_size
+        self._pending = samples[count * self.hop_size:]
+        if count == 0:
+            return []
+        hops = samples[:count * self.hop_size].reshape(count, self.hop_size)
+        rms = np.sqrt(np.einsum('ij,ij->i', hops, hops, dtype=np.float64) / self.hop_size)
+
+        segments = []
+        for value in rms:
+            hop_start = self._hops * self.hop_size
+            self._hops += 1
+            if value > max(MIN_SPEECH_RMS, 3 * self.noise_floor):
+                if self._start is None:
+                    self._start = max(self._last_end, hop_start - self.pad)
+                self._speech_end = hop_start + self.hop_size
+                self._silent_hops = 0
+            else:
+                rate = 0.5 if value < self.noise_floor else 0.01
+                self.noise_floor += rate * (value - self.noise_floor)
+                if self._start is not None:
+                    self._silent_hops += 1
+                    if self._silent_hops >= self.pause_hops:
+                        segments.append(self._close(min(self._speech_end + self.pad, hop_start + self.hop_size)))
+            if self._start is not None and self._hops * self.hop_size - self._start >= self.max_samples:
+                # No pause in time: cut here; speech goes on in a new segment
+                segments.append(self._close(self._hops * self.hop_size))
+        return segments
+
+    def flush(self) -> List[Tuple[int, int]]:
+        """End of stream: close the open segment, if any."""
+        if self._start is None:
+            return []
+        return [self._close(min(self.total, self._speech_end + self.pad))]
+
+    def _close(self, end: int) -> Tuple[int, int]:
+        segment = (self._start, end)
+        self._last_end = end
+        self._start = None
+        self._silent_hops = 0
+        return segment
+
+
+class StreamingSession:
+    """
+    One streamed assessment: feed() PCM as it arrives, recognize() each
+    completed segment (on a worker thread), then finish() for the result.
+
+    recognize() and finish() must not run concurrently with each other;
+    feed() may run alongside them (it only appends to the buffer and runs
+    the VAD).
+    """
+
+    def __init__(
+        self,
+        target_text: str,
+        target_ipa: Optional[str] = None,
+        sample_rate: int = SAMPLE_RATE,
+        device: Optional[str] = None,
+    ):
+        if sample_rate != SAMPLE_RATE:
+            raise ValueError(f"sample_rate must be {SAMPLE_RATE} (16-bit mono PCM), got {sample_rate}")
+        self.target_text = target_text
+        self.target_ipa = target_ipa if target_ipa is not None else lookup_target_ipa(target_text)
+        self.device = device or get_device()
+        self.alignment_method = resolve_alignment_method()
+        self.segmenter = SpeechSegmenter(sample_rate)
+        self.segments: List[Tuple[int, int]] = []
+        self.recognized: List[Dict] = []
+        self.encoder_outs: List = []
+        self.trace = Trace()
+        self._chunks: List[np.ndarray] = []
+        self._chunks_lock = threading.Lock()
+        self._odd_byte = b""
+        self._samples = np.zeros(0, dtype=np.float32)
+
+    def feed(self, pcm: bytes) -> List[Tuple[int, int]]:
+        """Add a PCM chunk; return the segments it completed (to recognize())."""
+        pcm = self._odd_byte + pcm
+        self._odd_byte = pcm[len(pcm) & ~1:]
+        samples = pcm16_to_float(pcm[:len(pcm) & ~1])
+        with self._chunks_lock:
+            self._chunks.append(samples)
+        return self.segmenter.feed(samples)
+
+    def samples(self) -> np.ndarray:
+        """Everything received so far."""
+        with self._chunks_lock:
+            chunks, self._chunks = self._chunks, []
+        if chunks:
+            self._samples = np.concatenate([self._samples] + chunks)
+        return self._samples
+
+    def recognize(self, segment: Tuple[int, int]) -> Dict:
+        """
+        PR, CTC alignment and ASR for one completed segment.
+
+        G2P is deferred to finish(), when the whole text can be divided
+        among the segments.
+
+        Returns:
+            Event for the client: {"type": "segment", "start", "end",
+            "actual_ipa", "actual_text"} (times in seconds)
+        """
+        start, end = segment
+        clip = AudioClip.from_samples(self.samples()[start:end], SAMPLE_RATE)
+        with self.trace.activate():
+            encoder_out = None
+            if self.target_ipa is None:
+                # Kept so G2P in finish() decodes from the same encoder pass
+                with span("encoder"):
+                    encoder_out = encode_batch(get_powsm(self.device), [clip.speech])[0]
+            recognized = recognize_utterance(
+                clip, self.target_text, self.target_ipa or "", self.device, self.alignment_method, encoder_out
+            )
+        self.segments.append(segment)
+        self.recognized.append(recognized)
+        self.encoder_outs.append(encoder_out)
+        if DEBUG:
+            print(f"DEBUG: Stream segment {start / SAMPLE_RATE:.2f}s - {end / SAMPLE_RATE:.2f}s: {recognized['actual_ipa']}")
+        return {
+            "type": "segment",
+            "start": round(start / SAMPLE_RATE, 3),
+            "end": round(end / SAMPLE_RATE, 3),
+            "actual_ipa": recognized["actual_ipa"],
+            "actual_text": recognized["actual_text"],
+        }
+
+    def finish(self) -> Dict:
+        """
+        End of stream: recognize the last segment, then align and score.
+
+        Returns:
+            Same as assess_audio(). Timings cover the work after the stream
+            ended, plus "stream" (seconds the stream was open, in ms) and the
+            per-stage time already spent on earlier segments.
+        """
+        self.trace.add("stream", time.perf_counter() - self.trace.start)
+        self.trace.start = time.perf_counter()
+        for segment in self.segmenter.flush():
+            self.recognize(segment)
+
+        with AudioClip.from_samples(self.samples(), SAMPLE_RATE) as audio, self.trace.activate():
+            with span("preflight"):
+                preflight = preflight_check(audio)
+            if preflight["rejection"] is not None:
+                result = preflight["rejection"]
+            else:
+                if not self.segments:
+                    # Speech the VAD missed (e.g. below MIN_SPEECH_RMS): recognize it all
+                    for segment in segment_at_pauses(preflight["frames"], SAMPLE_RATE, len(audio.speech)):
+                        self.recognize(segment)
+                target_ipa = self.target_ipa
+                if target_ipa is None:
+                    clips = [audio.slice(start, end) for start, end in self.segments]
+                    target_ipa = segment_target_ipa(
+                        clips, self.recognized, self.target_text, self.device, self.encoder_outs
+                    )
+                recognized = stitch_segments(
+                    self.segments, self.recognized, SAMPLE_RATE, target_ipa, self.alignment_method
+                )
+                result = score_assessment(audio, self.target_text, recognized, preflight, self.alignment_method)
+
+        result["timings"] = self.trace.finish()
+        return result
@@ -0,0 +1,312 @@
+"""
+Persistent target-IPA index for known practice texts.
+
+Canonical target pronunciations for the fixed practice catalogue never
+change, so they are precomputed once and stored in a JSON index keyed by
+normalized text. assess() looks texts up here before falling back to
+audio-guided G2P.
+
+The index lives on the network volume when one is attached
+(/runpod-volume/.cache/target_ipa.json), otherwise under ~/.cache/nonce/.
+Set TARGET_IPA_INDEX to use a different file.
+
+Build or extend it with:
+    python assessment/target_ipa_store.py build records.json \\
+        --practice-texts ../doc/practice_text.json
+
+The practice catalogue itself has no IPA; index it with G2P:
+    python assessment/target_ipa_store.py practice ../doc/practice_text.json \\
+        --audio-dir reference_recordings/
+Texts with a reference recording (<audio-dir>/<position>.wav, 1-based
+catalogue position, any audio suffix) use audio-guided G2P; the others
+use G2P over a silent clip, i.e. the model's canonical pronunciation of
+the text.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Add parent directory to path to import shared modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.tracing import DEBUG
+
+NETWORK_VOLUME_PATH = "/runpod-volume"
+
+
+def default_index_path() -> str:
+    """Location of the target-IPA index (network volume if available)."""
+    if os.environ.get("TARGET_IPA_INDEX"):
+        return os.environ["TARGET_IPA_INDEX"]
+    if os.path.exists(NETWORK_VOLUME_PATH):
+        return os.path.join(NETWORK_VOLUME_PATH, ".cache", "target_ipa.json")
+    return os.path.expanduser("~/.cache/nonce/target_ipa.json")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for index lookups.
+
+    Lowercases, removes punctuation except apostrophes and collapses
+    whitespace (same normalization as the word-level comparison).
+    """
+    text = text.lower()
+    text = re.sub(r'[^\w\s\']', '', text)
+    return ' '.join(text.split())
+
+
+class TargetIpaStore:
+    """
+    Target IPA index keyed by normalized text, backed by a JSON file.
+
+    The file is read once on first lookup; save() writes it atomically so
+    workers sharing the volume never see a partial file.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_index_path()
+        self._entries: Optional[Dict[str, str]] = None
+        self._revision: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, str]:
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    entries = {}
+                    if os.path.exists(self.path):
+                        try:
+                            with open(self.path, 'r', encoding='utf-8') as f:
+                                entries = json.load(f).get("entries", {})
+                            if DEBUG:
+                                print(f"DEBUG: Loaded {len(entries)} target IPA entries from {self.path}")
+                        except (OSError, ValueError) as e:
+                            print(f"ERROR: Failed to read target IPA index {self.path}: {e}")
+                    self._entries = entries
+        return self._entries
+
+    def get(self, text: str) -> Optional[str]:
+        """Return the stored target IPA (POWSM format) for text, or None."""
+        return self._load().get(normalize_text(text))
+
+    def put(self, text: str, ipa: str):
+        """Add or replace the target IPA for text (call save() to persist)."""
+        self._load()[normalize_text(text)] = ipa
+        self._revision = None
+
+    def revision(self) -> str:
+        """Short digest of the index content; changes whenever any entry does."""
+        entries = self._load()
+        if self._revision is None:
+            payload = json.dumps(entries, ensure_ascii=False, sort_keys=True)
+            self._revision = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+        return self._revision
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __contains__(self, text: str) -> bool:
+        return normalize_text(text) in self._load()
+
+    def save(self):
+        """Write the index to disk atomically."""
+        entries = self._load()
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"entries": entries}, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+# Singleton store (index file is read once per worker)
+_store = None
+
+
+def get_target_ipa_store() -> TargetIpaStore:
+    """Return the worker-wide target IPA store."""
+    global _store
+    if _store is None:
+        _store = TargetIpaStore()
+    return _store
+
+
+def lookup_target_ipa(text: str) -> Optional[str]:
+    """Return precomputed target IPA for text, or None if not indexed."""
+    return get_target_ipa_store().get(text)
+
+
+# ============================================================================
+# BULK BUILDER
+# ============================================================================
+
+def _record_ipa(record: Dict) -> Optional[str]:
+    """Target IPA of a record in POWSM format, if the record carries one."""
+    if record.get("word_ipa_tokens"):
+        # Word-segmented: words separated by spaces (see shared.phonemes.parse_ipa_words)
+        return " ".join("".join(f"/{p}/" for p in word) for word in record["word_ipa_tokens"])
+    if record.get("word_ipa_variants"):
+        # Accepted pronunciations per word, separated by "|" (see shared.phonemes.parse_ipa_lattice)
+        return " ".join(
+            "|".join("".join(f"/{p}/" for p in variant) for variant in variants)
+            for variants in record["word_ipa_variants"]
+        )
+    for key in ("target_ipa", "ipa_phonemes", "ipa"):
+        if record.get(key):
+            return record[key]
+    if record.get("ipa_tokens"):
+        return "".join(f"/{p}/" for p in record["ipa_tokens"])
+    return None
+
+
+def _g2p_without_audio(text: str) -> str:
+    """POWSM G2P of text over one second of silence (no audio guidance)."""
+    import numpy as np
+    from assess import generate_target_ipa
+    from shared.audio import AudioClip
+
+    with AudioClip.from_samples(np.zeros(16000, dtype=np.float32)) as audio:
+        return generate_target_ipa(audio, text)
+
+
+def build_index(
+    records: Iterable[Dict],
+    store: TargetIpaStore,
+    overwrite: bool = False,
+    text_only: bool = False,
+) -> Tuple[int, List[str]]:
+    """
+    Add records to the index.
+
+    Each record has "text" (or "content") and either a target IPA
+    ("target_ipa", "ipa_phonemes", "ipa" in POWSM format, "ipa_tokens",
+    "word_ipa_tokens" with one token list per word, which enables
+    word-level alignment, or "word_ipa_variants" with a list of accepted
+    token lists per word) or an "audio_uri" of a reference recording, which
+    is run through POWSM audio-guided G2P.
+
+    Args:
+        records: Records to index
+        store: Store to add entries to (not saved)
+        overwrite: Replace entries that already exist
+        text_only: Run G2P without audio for records with neither
+            (otherwise they are skipped)
+
+    Returns:
+        Tuple of (number of entries added, texts that were skipped)
+    """
+    added = 0
+    skipped = []
+    for record in records:
+        text = record.get("text") or record.get("content")
+        if not text:
+            continue
+        if text in store and not overwrite:
+            continue
+
+        ipa = _record_ipa(record)
+        if ipa is None and record.get("audio_uri"):
+            from assess import fetch_audio, generate_target_ipa
+            with fetch_audio(record["audio_uri"]) as audio:
+                ipa = generate_target_ipa(audio, text)
+        elif ipa is None and text_only:
+            ipa = _g2p_without_audio(text)
+
+        if not ipa:
+            skipped.append(text)
+            continue
+        store.put(text, ipa)
+        added += 1
+    return added, skipped
+
+
+def _load_records(path: str) -> List[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+
+def practice_records(catalogue: List[Dict], audio_dir: Optional[str] = None) -> List[Dict]:
+    """
+    Build records for the practice catalogue (entries with "content").
+
+    A reference recording <audio_dir>/<position>.<suffix> (1-based position
+    in the catalogue) becomes the record's audio_uri.
+    """
+    recordings = {}
+    if audio_dir:
+        for name in os.listdir(audio_dir):
+            stem = os.path.splitext(name)[0]
+            if stem.isdigit():
+                recordings[int(stem)] = "file://" + os.path.abspath(os.path.join(audio_dir, name))
+    records = []
+    for position, entry in enumerate(catalogue, start=1):
+        if not entry.get("content"):
+            continue
+        record = {"text": entry["content"]}
+        if position in recordings:
+            record["audio_uri"] = recordings[position]
+        records.append(record)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the target IPA index for practice texts")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Add records (JSON list or JSONL) to the index")
+    build.add_argument("records", nargs="+", help="Files with text + target IPA or reference audio_uri")
+    build.add_argument("--index", default=None, help="Index file (default: TARGET_IPA_INDEX or network volume)")
+    build.add_argument("--overwrite", action="store_true", help="Replace existing entries")
+    build.add_argument("--practice-texts", default=None, help="Practice catalogue JSON to report coverage for")
+
+    practice = subparsers.add_parser("practice", help="Index the practice catalogue with G2P")
+    practice.add_argument("catalogue", help="Practice catalogue JSON (e.g. ../doc/practice_text.json)")
+    practice.add_argument("--audio-dir", default=None, help="Reference recordings named by catalogue position")
+    practice.add_argument("--index", default=None, help="Index file (default: TARGET_IPA_INDEX or network volume)")
+    practice.add_argument("--overwrite", action="store_true", help="Replace existing entries")
+
+    args = parser.parse_args()
+
+    store = TargetIpaStore(args.index)
+    if args.command == "practice":
+        records = practice_records(_load_records(args.catalogue), args.audio_dir)
+        guided = sum(1 for record in records if "audio_uri" in record)
+        added, _ = build_index(records, store, overwrite=args.overwrite, text_only=True)
+        store.save()
+        print(f"Added {added} entries ({guided} texts with reference audio), "
+              f"index now has {len(store)} entries at {store.path}")
+        return
+
+    total_added = 0
+    for path in args.records:
+        added, skipped = build_index(_load_records(path), store, overwrite=args.overwrite)
+        total_added += added
+        for text in skipped:
+            print(f"Skipped (no target IPA or audio_uri): {text}")
+    store.save()
+    print(f"Added {total_added} entries, index now has {len(store)} entries at {store.path}")
+
+    if args.practice_texts:
+        catalogue = _load_records(args.practice_texts)
+        missing = [r["content"] for r in catalogue if r.get("content") and r["content"] not in store]
+        print(f"Practice texts covered: {len(catalogue) - len(missing)}/{len(catalogue)}")
+        for text in missing:
+            print(f"Missing: {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,47 @@
 """
 RunPod handler for IPA generation endpoint.
 """
+import time
+
+_boot_start = time.perf_counter()
+
 import runpod
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import sys
 import os
-import subprocess
-import time
-
-print(f"DEBUG: sys.path: {sys.path}")
-try:
-    print("DEBUG: pip freeze:")
-    subprocess.run([sys.executable, "-m", "pip", "freeze"], check=False)
-except Exception as e:
-    print(f"DEBUG: Failed to run pip freeze: {e}")
 
 from typing import Any, Dict, List
 
 # Add parent directory to path to import shared modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from generate import generate_ipa, get_models
+from generate import generate_ipa, get_models, load_speech, warm_up_models
+from shared.startup import boot_worker
 
-# Pre-load model on worker startup (not on first request)
-print("DEBUG: Pre-loading G2P model on worker startup...")
-start_time = time.time()
-get_models()  # This will load and cache the model
-load_time = time.time() - start_time
-print(f"DEBUG: Model pre-loaded in {load_time:.2f} seconds")
+# Concurrent jobs per worker. Above 1, one job's download/decode overlaps
+# another job's G2P inference (model calls are serialized on the device).
+MAX_CONCURRENCY = int(os.environ.get("IPA_GENERATION_CONCURRENCY", "1"))
 
+# Download and decode run here, off the event loop and off the inference threads
+_io_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="audio-io")
 
-def handler(job):
+# Load and warm up the G2P model before the first request (see shared.startup)
+boot_worker(load_models=get_models, warm_up=warm_up_models, start=_boot_start)
+
+
+def concurrency_modifier(current_concurrency: int) -> int:
+    """Number of jobs RunPod may hand this worker at once."""
+    return MAX_CONCURRENCY
+
+
+async def handler(job):
     """
     RunPod job handler for IPA generation.
     
+    Download and decode run on the audio I/O pool, G2P on a worker thread.
+    
     Input:
         {
             "text": str,           # English text string
@@ -56,7 +65,9 @@ def handler(job):
         if not audio_uri:
             return {"error": "Missing 'audio_uri' in input"}
         
-        result = generate_ipa(text, audio_uri)
+        loop = asyncio.get_running_loop()
+        speech, _ = await loop.run_in_executor(_io_pool, partial(load_speech, audio_uri))
+        result = await asyncio.to_thread(generate_ipa, text, audio_uri, speech=speech)
         return result
         
     except ValueError as e:
@@ -69,5 +80,8 @@ def handler(job):
 
 
 if __name__ == "__main__":
-    runpod.serverless.start({"handler": handler})
+    runpod.serverless.start({
+        "handler": handler,
+        "concurrency_modifier": concurrency_modifier,
+    })
 
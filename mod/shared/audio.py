@@ -2,12 +2,47 @@
 Shared audio loading and preprocessing utilities.
 Used by both assessment and IPA generation endpoints.
 """
-import requests
+import hashlib
+import io
+import shutil
+import ssl
+import subprocess
 import tempfile
+import urllib.request
 import os
+from math import gcd
 from typing import Tuple, Optional
 import numpy as np
 
+from shared.tracing import DEBUG, span
+
+# Containers libsndfile decodes straight from memory; everything else (WebM,
+# MP4/M4A) is piped through ffmpeg, or librosa when ffmpeg is not installed
+SOUNDFILE_CONTAINERS = {"wav", "flac", "ogg", "mp3"}
+
+
+def download_bytes(audio_uri: str, timeout: float = 30, verify: bool = True) -> bytes:
+    """
+    Download a file into memory.
+    
+    The whole body is returned as bytes (response.read()), with no
+    temporary file; decode_audio_bytes() decodes it from memory.
+    
+    Args:
+        audio_uri: URL to download (http, https or file)
+        timeout: Seconds a connect or read may block
+        verify: Verify the server's TLS certificate
+    
+    Raises:
+        urllib.error.URLError: If the download fails
+    """
+    context = ssl.create_default_context()
+    if not verify:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    with span("download"), urllib.request.urlopen(audio_uri, context=context, timeout=timeout) as response:
+        return response.read()
+
 
 def load_audio(audio_uri: str, target_sr: int = 16000) -> Tuple[np.ndarray, int]:
     """
@@ -29,36 +64,221 @@ def load_audio(audio_uri: str, target_sr: int = 16000) -> Tuple[np.ndarray, int]
     if not audio_uri:
         raise ValueError("audio_uri is required")
     
-    # Download audio file to temporary location
+    # Download into memory and decode from there
     try:
-        response = requests.get(audio_uri, timeout=30)
-        response.raise_for_status()
-    except requests.RequestException as e:
+        data = download_bytes(audio_uri)
+    except OSError as e:
         raise ValueError(f"Failed to download audio from {audio_uri}: {str(e)}")
     
-    # Save to temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-        tmp_file.write(response.content)
-        tmp_path = tmp_file.name
+    audio = decode_audio_bytes(data, suffix='.wav', target_sr=target_sr)
+    return audio, target_sr
+
+
+def sniff_container(data: bytes) -> Optional[str]:
+    """
+    Container format from the file's magic bytes.
     
+    Returns:
+        "wav", "flac", "ogg", "webm", "mp4", "mp3", or None if unknown
+    """
+    head = data[:12]
+    if head[:4] in (b"RIFF", b"RF64") and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"\x1a\x45\xdf\xa3":  # EBML (WebM/Matroska)
+        return "webm"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    # ID3 tag, or an MPEG audio frame sync with a layer set (ADTS AAC has none)
+    if head[:3] == b"ID3" or (len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0 and head[1] & 0x06):
+        return "mp3"
+    return None
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """
+    Resample mono float32 audio, returning it unchanged when the rates match.
+    
+    Uses soxr when available, else scipy's
+    polyphase filter.
+    """
+    if orig_sr == target_sr:
+        return audio
+    try:
+        import soxr
+    except ImportError:
+        from scipy.signal import resample_poly
+        factor = gcd(orig_sr, target_sr)
+        return resample_poly(audio, target_sr // factor, orig_sr // factor).astype(np.float32, copy=False)
+    return soxr.resample(audio, orig_sr, target_sr, quality="HQ")
+
+
+def _read_soundfile(data: bytes) -> Tuple[np.ndarray, int]:
+    """Decode with libsndfile from memory (BytesIO shares the bytes, no temp file)."""
+    import soundfile as sf
+    return sf.read(io.BytesIO(data), dtype='float32')
+
+
+def _read_ffmpeg(data: bytes, target_sr: int) -> Optional[Tuple[np.ndarray, int]]:
+    """
+    Decode through an ffmpeg pipe, downmixed and resampled by ffmpeg.
+    
+    Returns None when ffmpeg is not installed or cannot read the data from
+    a pipe (e.g. MP4 with its index at the end).
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return None
+    process = subprocess.run(
+        [ffmpeg, "-nostdin", "-loglevel", "error", "-i", "pipe:0",
+         "-f", "f32le", "-ac", "1", "-ar", str(target_sr), "pipe:1"],
+        input=data, capture_output=True,
+    )
+    if process.returncode != 0:
+        if DEBUG:
+            print(f"DEBUG: ffmpeg pipe decode failed: {process.stderr.decode(errors='replace').strip()}")
+        return None
+    return np.frombuffer(process.stdout, dtype='<f4').copy(), target_sr
+
+
+def _read_librosa(data: bytes, suffix: str) -> Tuple[np.ndarray, int]:
+    """Decode any format ffmpeg knows, at its native rate (via a temporary file)."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+        tmp_file.write(data)
+        tmp_path = tmp_file.name
     try:
-        # Load audio using librosa (handles resampling and mono conversion)
         import librosa
-        audio, sr = librosa.load(tmp_path, sr=target_sr, mono=True)
-        
-        # Normalize to float32 range [-1.0, 1.0]
-        if audio.dtype != np.float32:
-            audio = audio.astype(np.float32)
-        
-        return audio, sr
-    except Exception as e:
-        raise RuntimeError(f"Failed to load audio: {str(e)}")
+        return librosa.load(tmp_path, sr=None, mono=True, dtype=np.float32)
     finally:
-        # Clean up temporary file
         if os.path.exists(tmp_path):
             os.unlink(tmp_path)
 
 
+def decode_audio_bytes(data: bytes, suffix: str = '.wav', target_sr: int = 16000) -> np.ndarray:
+    """
+    Decode an encoded audio file held in memory to mono float32 samples.
+    
+    The container is sniffed from the bytes (the suffix is only a hint for
+    unknown data). WAV, FLAC, Ogg (Vorbis/Opus) and MP3 are decoded by
+    soundfile directly to float32; WebM and MP4 are piped through ffmpeg
+    (librosa from a temporary file as the last resort). Audio is downmixed
+    and resampled (see resample()) only when it is not already mono at
+    target_sr.
+    
+    Args:
+        data: Raw bytes of the audio file (WAV, WebM, MP3, M4A, ...)
+        suffix: File extension hinting the container format
+        target_sr: Target sample rate (default: 16000 Hz)
+    
+    Returns:
+        numpy array of audio samples (mono, float32, normalized)
+    
+    Raises:
+        RuntimeError: If audio decoding fails
+    """
+    container = sniff_container(data)
+    try:
+        audio = None
+        if container in SOUNDFILE_CONTAINERS:
+            try:
+                audio, rate = _read_soundfile(data)
+            except Exception as e:
+                # e.g. a codec this libsndfile build lacks
+                if DEBUG:
+                    print(f"DEBUG: soundfile could not decode {container}, falling back to ffmpeg: {e}")
+        if audio is None:
+            decoded = _read_ffmpeg(data, target_sr)
+            if decoded is None:
+                decoded = _read_librosa(data, f".{container}" if container else suffix)
+            audio, rate = decoded
+        
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1, dtype=np.float32)
+        return resample(audio, rate, target_sr)
+    except Exception as e:
+        raise RuntimeError(f"Failed to load audio: {str(e)}")
+
+
+class AudioClip:
+    """
+    A single recording, downloaded once and decoded once per request.
+    
+    Holds the raw bytes, the decoded mono float32 samples (decoded lazily on
+    first access, from memory) and, for tools that need a file on disk such
+    as MFA, a temporary 16-bit WAV written on demand; nothing else touches
+    the disk. Use as a context manager, or call close(), to remove the
+    temporary WAV.
+    """
+    
+    def __init__(self, data: bytes, suffix: str = '.wav', target_sr: int = 16000):
+        self.data = data
+        self.suffix = suffix
+        self.sample_rate = target_sr
+        self._speech: Optional[np.ndarray] = None
+        self._wav_path: Optional[str] = None
+        self._digest: Optional[str] = None
+    
+    @classmethod
+    def from_samples(cls, speech: np.ndarray, sample_rate: int = 16000) -> "AudioClip":
+        """Clip of already decoded samples (no encoded bytes)."""
+        clip = cls(b"", suffix='.wav', target_sr=sample_rate)
+        clip._speech = speech
+        return clip
+    
+    def slice(self, start: int, end: int) -> "AudioClip":
+        """Clip of samples [start, end) (a view of the decoded samples)."""
+        return AudioClip.from_samples(self.speech[start:end], self.sample_rate)
+    
+    @property
+    def speech(self) -> np.ndarray:
+        """Decoded samples at self.sample_rate (mono, float32)."""
+        return self.decode()
+    
+    def digest(self) -> str:
+        """SHA-256 hex digest of the raw audio bytes (content address)."""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.data).hexdigest()
+        return self._digest
+    
+    def decode(self) -> np.ndarray:
+        """Decode the audio if not done yet and return the samples."""
+        if self._speech is None:
+            with span("decode"):
+                self._speech = decode_audio_bytes(self.data, self.suffix, self.sample_rate)
+        return self._speech
+    
+    @property
+    def duration(self) -> float:
+        """Duration of the decoded audio in seconds."""
+        return len(self.speech) / self.sample_rate
+    
+    def wav_path(self) -> str:
+        """Path to a temporary WAV of the decoded audio, written on first call."""
+        if self._wav_path is None:
+            import soundfile as sf
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
+                tmp_path = tmp_file.name
+            sf.write(tmp_path, self.speech, self.sample_rate, subtype='PCM_16')
+            self._wav_path = tmp_path
+        return self._wav_path
+    
+    def close(self):
+        """Remove the temporary WAV, if one was written."""
+        if self._wav_path is not None:
+            if os.path.exists(self._wav_path):
+                os.unlink(self._wav_path)
+            self._wav_path = None
+    
+    def __enter__(self) -> "AudioClip":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
 def get_audio_duration(audio_uri: str) -> float:
     """
     Get duration of audio file in seconds without fully loading it.
@@ -0,0 +1,73 @@
+"""
+Dynamic micro-batching of POWSM encoder passes across concurrent jobs.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Tuple
+
+from shared.powsm import encode_batch
+from shared.tracing import DEBUG
+
+
+class EncoderBatcher:
+    """
+    Collects utterances from concurrent jobs and encodes them as one batch.
+
+    Each job calls encode(speech) from its own thread and blocks until its
+    batch has run. A background thread waits for the first utterance, keeps
+    collecting for up to window_ms or until max_batch utterances are queued,
+    then runs a single padded encoder pass and hands every caller its own
+    slice of the output.
+    """
+
+    def __init__(self, speech2text, window_ms: float = 20.0, max_batch: int = 8):
+        self.speech2text = speech2text
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._queue: "queue.Queue[Tuple[object, Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="encoder-batcher", daemon=True)
+        self._thread.start()
+
+    def encode(self, speech):
+        """
+        Encode one utterance as part of the next batch.
+
+        Args:
+            speech: 16kHz mono float array
+
+        Returns:
+            (enc, enc_lens) for this utterance, see shared.powsm.encode_batch
+        """
+        future: Future = Future()
+        self._queue.put((speech, future))
+        return future.result()
+
+    def _collect(self) -> List[Tuple[object, Future]]:
+        items = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(items) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            try:
+                outputs = encode_batch(self.speech2text, [speech for speech, _ in items])
+            except Exception as e:
+                print(f"ERROR: Batched encoder pass failed: {e}")
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+            if DEBUG:
+                print(f"DEBUG: Encoded batch of {len(items)} utterance(s)")
+            for (_, future), output in zip(items, outputs):
+                future.set_result(output)
@@ -0,0 +1,311 @@
+"""
+Shared phoneme inventory.
+
+Maps every POWSM/IPA phone to a small integer id (fits in an unsigned
+16-bit array), with category and duration-weight tables indexed by id, so
+comparison and scoring code can work on compact integer sequences instead
+of strings. Only known phones (the categorized symbols and the model's phone
+vocabulary) are interned permanently; any other token (e.g. from a client's
+target_ipa) gets a temporary id that lives for one comparison (PhoneScope),
+so arbitrary input cannot grow the worker-wide inventory.
+
+Also parses POWSM-format IPA ("/h//ɛ//l//oʊ/", words separated by
+whitespace, pronunciation variants by "|") for both workers.
+"""
+import threading
+from array import array
+from typing import Iterable, List, Optional, Sequence
+
+# Phone categories (values of PhonemeInventory.categories)
+OTHER = 0
+DIPHTHONG = 1
+VOWEL = 2
+AFFRICATE = 3
+NASAL = 4
+APPROXIMANT = 5
+FRICATIVE = 6
+STOP = 7
+
+CATEGORY_NAMES = {
+    OTHER: "other",
+    DIPHTHONG: "diphthong",
+    VOWEL: "vowel",
+    AFFRICATE: "affricate",
+    NASAL: "nasal",
+    APPROXIMANT: "approximant",
+    FRICATIVE: "fricative",
+    STOP: "stop",
+}
+
+# Relative phone durations used for proportional timestamp estimation:
+# vowels and diphthongs are longer, stops very short
+DURATION_WEIGHTS = {
+    DIPHTHONG: 1.8,
+    VOWEL: 1.5,
+    AFFRICATE: 1.2,
+    NASAL: 1.1,
+    APPROXIMANT: 1.0,
+    FRICATIVE: 0.9,
+    STOP: 0.7,
+    OTHER: 1.0,
+}
+
+VOWELS = set("aɑæɐeɛəɜiɪoɔuʊʌyœøɨʉɯɤɵɞ")
+DIPHTHONGS = {"aɪ", "eɪ", "ɔɪ", "aʊ", "oʊ", "ɪə", "eə", "ʊə"}
+STOPS = set("pbtdkgʔ")
+AFFRICATES = {"tʃ", "dʒ", "ts", "dz"}
+NASALS = set("mnŋɲɱ")
+APPROXIMANTS = set("wjɹlɾɻ")
+FRICATIVES = set("fvθðszʃʒhxɣçʁχħʕ")
+
+
+def classify_phone(phone: str) -> int:
+    """
+    Category of a phone (one of the module-level category constants).
+
+    Modifiers are tolerated: a phone counts as a vowel if it contains a
+    vowel letter, and multi-character phones with a vowel (e.g. "oʊ", "ɪ̃")
+    count as diphthongs / complex vowels.
+    """
+    p_lower = phone.lower()
+    if p_lower in DIPHTHONGS or len(phone) > 1 and any(c in VOWELS for c in phone):
+        return DIPHTHONG
+    if p_lower in VOWELS or any(c in VOWELS for c in p_lower):
+        return VOWEL
+    if p_lower in AFFRICATES:
+        return AFFRICATE
+    if p_lower in NASALS or any(c in NASALS for c in p_lower):
+        return NASAL
+    if p_lower in APPROXIMANTS or any(c in APPROXIMANTS for c in p_lower):
+        return APPROXIMANT
+    if p_lower in FRICATIVES or any(c in FRICATIVES for c in p_lower):
+        return FRICATIVE
+    if p_lower in STOPS or any(c in STOPS for c in p_lower):
+        return STOP
+    return OTHER
+
+
+class PhonemeInventory:
+    """
+    Interned phone ids with per-id category and duration-weight tables.
+
+    Ids are assigned in first-seen order starting from the base inventory,
+    and stay stable for the lifetime of the process. Interning is
+    thread-safe; lookups of known phones take no lock. encode() never
+    interns: unknown phones get temporary ids (see PhoneScope).
+    """
+
+    MAX_PHONES = 1 << 16  # ids must fit array('H')
+
+    def __init__(self, phones: Iterable[str] = ()):
+        self.phones: List[str] = []
+        self.categories = array('B')
+        self.weights = array('d')
+        self._ids = {}
+        self._lock = threading.Lock()
+        for phone in phones:
+            self.intern(phone)
+
+    def __len__(self) -> int:
+        return len(self.phones)
+
+    def intern(self, phone: str) -> int:
+        """Id of phone, adding it to the inventory if new."""
+        phone_id = self._ids.get(phone)
+        if phone_id is not None:
+            return phone_id
+        with self._lock:
+            phone_id = self._ids.get(phone)
+            if phone_id is None:
+                if len(self.phones) >= self.MAX_PHONES:
+                    raise ValueError(f"Phoneme inventory full ({self.MAX_PHONES} phones)")
+                phone_id = len(self.phones)
+                category = classify_phone(phone)
+                self.phones.append(phone)
+                self.categories.append(category)
+                self.weights.append(DURATION_WEIGHTS[category])
+                self._ids[phone] = phone_id
+        return phone_id
+
+    def add_vocabulary(self, tokens: Iterable[str]) -> int:
+        """
+        Intern the phones of a model vocabulary (POWSM tokens like "/ɛ/").
+
+        Other tokens (special symbols, text) are skipped. Returns the
+        inventory size.
+        """
+        for token in tokens:
+            if len(token) > 2 and token.startswith("/") and token.endswith("/"):
+                self.intern(token[1:-1])
+        return len(self.phones)
+
+    def lookup(self, phone: str) -> Optional[int]:
+        """Id of a known phone, or None (never interns)."""
+        return self._ids.get(phone)
+
+    def scope(self) -> "PhoneScope":
+        """Ids for one comparison (unknown phones get temporary ids)."""
+        return PhoneScope(self)
+
+    def encode(self, phones: Iterable[str]) -> array:
+        """
+        Phone strings to a compact array('H') of ids.
+
+        Unknown phones get temporary ids valid for this call only; encode
+        through one scope() to compare sequences containing unknown phones.
+        """
+        return self.scope().encode(phones)
+
+    def encode_numpy(self, phones: Iterable[str]):
+        """Phone strings to a NumPy uint16 array of ids."""
+        import numpy as np
+        return np.frombuffer(self.encode(phones), dtype=np.uint16)
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        """Ids back to phone strings."""
+        return [self.phones[i] for i in ids]
+
+    def category_of(self, ids: Sequence[int]) -> List[int]:
+        """Category per id."""
+        return [self.categories[i] for i in ids]
+
+    def duration_weights(self, ids: Sequence[int]) -> List[float]:
+        """Duration weight per id (see DURATION_WEIGHTS)."""
+        return [self.weights[i] for i in ids]
+
+
+class PhoneScope:
+    """
+    Phone ids for one comparison (e.g. the actual and target phones of a job).
+
+    Known phones keep their inventory ids. Unknown phones get temporary ids
+    counting down from the top of the id range: equal within this scope,
+    different from every known phone, and dropped with the scope.
+    """
+
+    def __init__(self, inventory: PhonemeInventory):
+        self.inventory = inventory
+        self._ids = {}
+        self._phones: List[str] = []
+
+    def id_of(self, phone: str) -> int:
+        """Id of phone (temporary if it is not in the inventory)."""
+        phone_id = self.inventory.lookup(phone)
+        if phone_id is not None:
+            return phone_id
+        phone_id = self._ids.get(phone)
+        if phone_id is None:
+            phone_id = self.inventory.MAX_PHONES - 1 - len(self._phones)
+            if phone_id < len(self.inventory):
+                raise ValueError(f"Too many unknown phones in one comparison ({len(self._phones)})")
+            self._phones.append(phone)
+            self._ids[phone] = phone_id
+        return phone_id
+
+    def encode(self, phones: Iterable[str]) -> array:
+        """Phone strings to a compact array('H') of ids."""
+        return array('H', [self.id_of(phone) for phone in phones])
+
+    def phone(self, phone_id: int) -> str:
+        """Phone string of an id from this scope."""
+        if phone_id < len(self.inventory):
+            return self.inventory.phones[phone_id]
+        return self._phones[self.inventory.MAX_PHONES - 1 - phone_id]
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        """Ids back to phone strings."""
+        return [self.phone(i) for i in ids]
+
+    def category_of(self, ids: Sequence[int]) -> List[int]:
+        """Category per id."""
+        return [self._category(i) for i in ids]
+
+    def duration_weights(self, ids: Sequence[int]) -> List[float]:
+        """Duration weight per id (see DURATION_WEIGHTS)."""
+        return [DURATION_WEIGHTS[self._category(i)] for i in ids]
+
+    def _category(self, phone_id: int) -> int:
+        if phone_id < len(self.inventory):
+            return self.inventory.categories[phone_id]
+        return classify_phone(self.phone(phone_id))
+
+
+# Base inventory: the categorized symbols, so common phones get small, stable ids
+BASE_PHONES = sorted(VOWELS | DIPHTHONGS | STOPS | AFFRICATES | NASALS | APPROXIMANTS | FRICATIVES)
+
+# Singleton inventory (shared by every job in the worker)
+_inventory = None
+
+
+def get_inventory() -> PhonemeInventory:
+    """Return the worker-wide phoneme inventory."""
+    global _inventory
+    if _inventory is None:
+        _inventory = PhonemeInventory(BASE_PHONES)
+    return _inventory
+
+
+def parse_ipa_phonemes(ipa_phonemes: str, as_ids: bool = False):
+    """
+    Parse IPA phonemes from POWSM format (e.g., "/h//ɛ//l//o//ʊ/").
+
+    Whitespace between words (see parse_ipa_words) is ignored.
+
+    Args:
+        ipa_phonemes: IPA string in POWSM format with slashes
+        as_ids: Return phone ids of the shared inventory as array('H')
+            (unknown phones get ids valid for this call only, see
+            PhoneScope) instead of strings
+
+    Returns:
+        List of individual phonemes (or array of their ids)
+    """
+    phonemes = [p for word in parse_ipa_words(ipa_phonemes) for p in word]
+    if as_ids:
+        return get_inventory().encode(phonemes)
+    return phonemes
+
+
+def parse_ipa_words(ipa_phonemes: str) -> List[List[str]]:
+    """
+    Parse POWSM-format IPA with words separated by whitespace
+    (e.g., "/h//ə//l//oʊ/ /w//ɝ//l//d/") into phonemes per word.
+
+    POWSM output has no word boundaries, so it parses as a single word;
+    word-segmented target IPA can be supplied by the caller or the target
+    IPA index. Words with pronunciation variants (see parse_ipa_lattice)
+    contribute their first variant.
+
+    Args:
+        ipa_phonemes: IPA string in POWSM format with slashes
+
+    Returns:
+        List of phoneme lists, one per word
+    """
+    return [alternatives[0] for alternatives in parse_ipa_lattice(ipa_phonemes) if alternatives[0]]
+
+
+def parse_ipa_lattice(ipa_phonemes: str) -> List[List[List[str]]]:
+    """
+    Parse word-segmented POWSM-format IPA with pronunciation variants.
+
+    Variants of a word are separated by "|", e.g.
+    "/t//ə/|/t//u/ /m//ɑ//ɹ//oʊ/" accepts "tə" or "tu" for the first word.
+    An empty variant makes the word optional.
+
+    Args:
+        ipa_phonemes: IPA string in POWSM format with slashes
+
+    Returns:
+        Per word, the list of alternative phoneme lists
+    """
+    lattice = []
+    for word in ipa_phonemes.split():
+        alternatives = []
+        for variant in word.split('|'):
+            # Remove leading/trailing slashes and split by '//' to get individual phonemes
+            cleaned = variant.strip('/')
+            alternatives.append([p.strip('/') for p in cleaned.split('//') if p.strip('/')])
+        if any(alternatives):
+            lattice.append(alternatives)
+    return lattice
@@ -0,0 +1,268 @@
+"""
+Shared POWSM model loading and task wrappers.
+Used by both assessment and IPA generation endpoints.
+
+POWSM serves every task (PR, G2P, ASR) from a single checkpoint; the tasks
+only differ in the task symbol and beam size used at decode time. Loading
+the weights once and decoding through lightweight per-task wrappers keeps a
+single copy of the model on the device.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+POWSM_MODEL_TAG = "espnet/powsm"
+
+# Model execution on the device is serialized: Speech2Text keeps per-call
+# decoding state (hyp primer, beam size) on the shared beam search, so calls
+# must not interleave across threads. Audio download/decode, scoring and MFA
+# of other jobs keep running while one job holds the device.
+device_semaphore = threading.Semaphore(1)
+
+# Opt-in dynamic INT8 quantization of CPU inference (see quantize_int8)
+QUANTIZE_INT8 = os.environ.get("POWSM_QUANTIZE", "").lower() == "int8"
+
+# Per-thread encoder states for shared_encoder()
+_encoder_cache = threading.local()
+_encoder_cache_lock = threading.Lock()
+
+
+def load_powsm(device: str, lang_sym: str = "<eng>", task_sym: str = "<pr>"):
+    """
+    Load the POWSM checkpoint once.
+
+    Uses the memory-mapped weights converted by shared/powsm_weights.py when
+    present, otherwise the Hugging Face checkpoint.
+
+    Args:
+        device: Device to load the model on ("cuda" or "cpu")
+        lang_sym: Default language symbol
+        task_sym: Default task symbol (overridden per call by PowsmTask)
+
+    Returns:
+        espnet2 Speech2Text instance
+    """
+    from espnet2.bin.s2t_inference import Speech2Text
+    from shared.powsm_weights import load_converted
+
+    try:
+        speech2text = load_converted(device, lang_sym=lang_sym, task_sym=task_sym)
+    except Exception as e:
+        print(f"ERROR: Failed to load converted POWSM weights, using checkpoint: {e}")
+        speech2text = None
+    if speech2text is not None:
+        return speech2text
+
+    return Speech2Text.from_pretrained(
+        POWSM_MODEL_TAG,
+        device=device,
+        lang_sym=lang_sym,
+        task_sym=task_sym,
+    )
+
+
+def quantize_int8(speech2text):
+    """
+    Dynamically quantize the encoder and decoder linear layers to INT8.
+
+    Weights are stored as int8 and activations quantized per batch at run
+    time, which speeds up CPU inference at a small accuracy cost (see
+    tests/benchmark_quantization.py). CPU only: quantized linear kernels do
+    not run on CUDA. The CTC projection stays in fp32.
+
+    Args:
+        speech2text: Speech2Text on CPU (see load_powsm), modified in place
+
+    Returns:
+        speech2text
+    """
+    import torch
+
+    s2t_model = speech2text.s2t_model
+    for name in ("encoder", "decoder"):
+        module = getattr(s2t_model, name, None)
+        if module is not None:
+            torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return speech2text
+
+
+class PowsmTask:
+    """
+    Decoding wrapper that runs one POWSM task on a shared Speech2Text.
+
+    Callable like Speech2Text itself: task(speech, text_prev=...) returns the
+    n-best list, so result[0][0] is the decoded text.
+    """
+
+    def __init__(self, speech2text, task_sym: str, beam_size: Optional[int] = None):
+        self.speech2text = speech2text
+        self.task_sym = task_sym
+        self.beam_size = beam_size
+
+    def __call__(self, speech, text_prev: Optional[str] = "<na>"):
+        with device_semaphore:
+            beam_search = self.speech2text.beam_search
+            beam_size = beam_search.beam_size
+            pre_beam_size = beam_search.pre_beam_size
+
+            if self.beam_size is not None and self.beam_size != beam_size:
+                # Keep the pre-beam ratio the model was configured with
+                beam_search.pre_beam_size = int(pre_beam_size * self.beam_size / beam_size)
+                beam_search.beam_size = self.beam_size
+
+            try:
+                return self.speech2text(speech, text_prev=text_prev, task_sym=self.task_sym)
+            finally:
+                beam_search.beam_size = beam_size
+                beam_search.pre_beam_size = pre_beam_size
+
+
+def _install_encoder_cache(s2t_model):
+    """Route s2t_model.encode through the calling thread's shared_encoder() states."""
+    with _encoder_cache_lock:
+        if getattr(s2t_model, "_encoder_cache_installed", False):
+            return
+        encode = s2t_model.encode
+
+        def cached_encode(*args, **kwargs):
+            slot = getattr(_encoder_cache, "slot", None)
+            if slot is None:
+                return encode(*args, **kwargs)
+            if slot["out"] is None:
+                slot["out"] = encode(*args, **kwargs)
+            return slot["out"]
+
+        s2t_model.encode = cached_encode
+        s2t_model._encoder_cache_installed = True
+
+
+@contextmanager
+def shared_encoder(speech2text, encoder_out=None):
+    """
+    Run the POWSM encoder at most once for everything decoded inside the block.
+
+    The encoder only sees the speech (task and prompt go to the decoder), so
+    PR, G2P and ASR on the same utterance can decode from the same encoder
+    states. The first encode inside the block is computed and cached; later
+    ones return the cached states. The block must only decode one utterance.
+    States are kept per thread, so concurrent jobs each get their own.
+
+    Args:
+        speech2text: Shared Speech2Text instance (see load_powsm)
+        encoder_out: Optional precomputed (enc, enc_lens) for the utterance,
+            e.g. one slice of encode_batch()
+    """
+    _install_encoder_cache(speech2text.s2t_model)
+    previous = getattr(_encoder_cache, "slot", None)
+    _encoder_cache.slot = {"out": encoder_out}
+    try:
+        yield
+    finally:
+        _encoder_cache.slot = previous
+
+
+def _fixed_length(speech2text) -> Optional[int]:
+    """Samples the model pads or trims every input to, if configured."""
+    conf = getattr(speech2text, "preprocessor_conf", None) or {}
+    if "fs" in conf and "speech_length" in conf:
+        return int(conf["fs"] * conf["speech_length"])
+    return None
+
+
+def _prepare_speech(speech, fixed_length: Optional[int]):
+    """1-D tensor prepared the way Speech2Text prepares a single utterance."""
+    import torch
+    import torch.nn.functional as F
+
+    x = torch.as_tensor(speech)
+    if x.dim() > 1:
+        x = x.squeeze(1)
+    if fixed_length is not None:
+        if x.size(-1) >= fixed_length:
+            x = x[:fixed_length]
+        else:
+            x = F.pad(x, (0, fixed_length - x.size(-1)))
+    return x
+
+
+def encode_batch(speech2text, speeches: List) -> List[Tuple]:
+    """
+    Run the POWSM encoder on several utterances in one forward pass.
+
+    Each utterance is prepared the way Speech2Text prepares a single one
+    (padded or trimmed to the model's fixed input length when configured),
+    then padded to the longest and stacked.
+
+    Args:
+        speech2text: Shared Speech2Text instance (see load_powsm)
+        speeches: List of 16kHz mono float arrays
+
+    Returns:
+        List of (enc, enc_lens) per utterance with batch size 1, in input
+        order, suitable for shared_encoder(encoder_out=...)
+    """
+    import torch
+
+    fixed_length = _fixed_length(speech2text)
+    tensors = [_prepare_speech(speech, fixed_length) for speech in speeches]
+
+    lengths = torch.tensor([x.size(-1) for x in tensors], dtype=torch.long)
+    batch = torch.nn.utils.rnn.pad_sequence(tensors, batch_first=True)
+    batch = batch.to(getattr(torch, speech2text.dtype))
+
+    with torch.no_grad(), device_semaphore:
+        enc, enc_lens = speech2text.s2t_model.encode(
+            batch.to(speech2text.device), lengths.to(speech2text.device)
+        )
+
+    intermediate = None
+    if isinstance(enc, tuple):
+        enc, intermediate = enc
+
+    outputs = []
+    for i in range(len(speeches)):
+        n = int(enc_lens[i])
+        enc_i = enc[i:i + 1, :n]
+        if intermediate is not None:
+            enc_i = (enc_i, [(layer, h[i:i + 1, :n]) for layer, h in intermediate])
+        outputs.append((enc_i, enc_lens[i:i + 1]))
+    return outputs
+
+
+def ctc_log_posteriors(speech2text, speech, sample_rate: int = 16000) -> Tuple:
+    """
+    Frame-level CTC log posteriors over the POWSM vocabulary for one utterance.
+
+    Inside a shared_encoder() block this reuses the cached encoder states,
+    so it only adds the CTC projection.
+
+    Args:
+        speech2text: Shared Speech2Text instance (see load_powsm)
+        speech: 16kHz mono float array
+        sample_rate: Sample rate of speech
+
+    Returns:
+        Tuple of (log_probs, frame_shift): float32 array of shape
+        (frames, vocab) covering the utterance (model padding dropped), and
+        seconds per encoder frame
+    """
+    import math
+    import torch
+
+    x = _prepare_speech(speech, _fixed_length(speech2text))
+    batch = x.unsqueeze(0).to(getattr(torch, speech2text.dtype))
+    lengths = torch.tensor([x.size(-1)], dtype=torch.long)
+
+    s2t_model = speech2text.s2t_model
+    with torch.no_grad(), device_semaphore:
+        enc, enc_lens = s2t_model.encode(
+            batch.to(speech2text.device), lengths.to(speech2text.device)
+        )
+        if isinstance(enc, tuple):
+            enc = enc[0]
+        log_probs = s2t_model.ctc.log_softmax(enc)[0, :int(enc_lens[0])]
+
+    frame_shift = x.size(-1) / sample_rate / log_probs.size(0)
+    n_frames = min(log_probs.size(0), math.ceil(len(speech) / sample_rate / frame_shift))
+    return log_probs[:n_frames].float().cpu().numpy(), frame_shift
@@ -0,0 +1,151 @@
+"""
+Pre-converted, memory-mapped POWSM weights on the network volume.
+
+Speech2Text.from_pretrained() unpickles the whole checkpoint into private
+memory in every worker process. Converting the weights once to safetensors
+lets load_powsm() map them instead: pages are read lazily, and on CPU the
+parameters stay backed by the mapped file, so worker processes on one host
+share the page cache rather than each holding a copy.
+
+The converted weights live on the network volume when one is attached
+(/runpod-volume/.cache/powsm_weights/), next to a manifest recording the
+model tag and the config/tokenizer files of the Hugging Face snapshot. Set
+POWSM_WEIGHTS_DIR to use a different directory ("" disables them).
+
+Convert once with:
+    python shared/powsm_weights.py convert
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from typing import Dict, Optional
+
+# Allow running as a script from mod/
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.powsm import POWSM_MODEL_TAG
+
+NETWORK_VOLUME_PATH = "/runpod-volume"
+WEIGHTS_FILE = "model.safetensors"
+MANIFEST_FILE = "manifest.json"
+
+
+def default_weights_dir() -> Optional[str]:
+    """Directory of the converted weights, or None if disabled."""
+    if "POWSM_WEIGHTS_DIR" in os.environ:
+        return os.environ["POWSM_WEIGHTS_DIR"] or None
+    if os.path.exists(NETWORK_VOLUME_PATH):
+        return os.path.join(NETWORK_VOLUME_PATH, ".cache", "powsm_weights")
+    return None
+
+
+def read_manifest(weights_dir: Optional[str]) -> Optional[Dict]:
+    """Manifest of converted weights for POWSM_MODEL_TAG in weights_dir, or None."""
+    if not weights_dir:
+        return None
+    path = os.path.join(weights_dir, MANIFEST_FILE)
+    if not os.path.exists(path) or not os.path.exists(os.path.join(weights_dir, WEIGHTS_FILE)):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Failed to read POWSM weights manifest {path}: {e}")
+        return None
+    if manifest.get("model_tag") != POWSM_MODEL_TAG:
+        return None
+    return manifest
+
+
+def convert(weights_dir: str, model_tag: str = POWSM_MODEL_TAG) -> Dict:
+    """
+    Write the checkpoint of model_tag as safetensors plus a manifest.
+
+    Args:
+        weights_dir: Output directory (created if missing)
+        model_tag: Model to convert (resolved like Speech2Text.from_pretrained)
+
+    Returns:
+        The manifest written
+    """
+    import torch
+    from espnet_model_zoo.downloader import ModelDownloader
+    from safetensors.torch import save_file
+
+    files = ModelDownloader().download_and_unpack(model_tag)
+    model_file = files.pop("s2t_model_file")
+    state = torch.load(model_file, map_location="cpu")
+    # safetensors refuses tensors sharing storage (tied embeddings), so
+    # every name gets its own copy; loading fills each name from its copy
+    state = {name: tensor.detach().clone().contiguous() for name, tensor in state.items()}
+
+    os.makedirs(weights_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=weights_dir, suffix=".tmp")
+    os.close(fd)
+    try:
+        save_file(state, tmp_path, metadata={"model_tag": model_tag})
+        os.replace(tmp_path, os.path.join(weights_dir, WEIGHTS_FILE))
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+    # Config and tokenizer stay in the Hugging Face snapshot (also on the volume)
+    manifest = {"model_tag": model_tag, "files": files}
+    with open(os.path.join(weights_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_converted(device: str, weights_dir: Optional[str] = None, **kwargs):
+    """
+    Build Speech2Text from converted weights, or return None if there are none.
+
+    On CPU the parameters are assigned the memory-mapped tensors directly;
+    on GPU the mapped pages are copied to the device as they are read.
+
+    Args:
+        device: Device to load the model on ("cuda" or "cpu")
+        weights_dir: Converted weights (default: default_weights_dir())
+        **kwargs: Further Speech2Text arguments (lang_sym, task_sym, ...)
+    """
+    weights_dir = weights_dir or default_weights_dir()
+    manifest = read_manifest(weights_dir)
+    if manifest is None:
+        return None
+
+    from espnet2.bin.s2t_inference import Speech2Text
+    from safetensors.torch import load_file
+
+    # No model file: the modules are built, then filled from the mapping
+    speech2text = Speech2Text(**manifest["files"], s2t_model_file=None, device=device, **kwargs)
+    state = load_file(os.path.join(weights_dir, WEIGHTS_FILE), device=device)
+    # Assigning unties shared weights (e.g. embedding/output), which is
+    # fine for inference and keeps every parameter on the mapped pages
+    speech2text.s2t_model.load_state_dict(state, assign=device == "cpu")
+    speech2text.s2t_model.eval()
+    return speech2text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert POWSM weights for memory-mapped loading")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="Write safetensors weights and manifest")
+    convert_parser.add_argument("--output-dir", default=None,
+                                help="Output directory (default: POWSM_WEIGHTS_DIR or network volume)")
+    convert_parser.add_argument("--model-tag", default=POWSM_MODEL_TAG, help="Model to convert")
+
+    args = parser.parse_args()
+
+    weights_dir = args.output_dir or default_weights_dir()
+    if not weights_dir:
+        parser.error("no network volume found; pass --output-dir or set POWSM_WEIGHTS_DIR")
+    manifest = convert(weights_dir, args.model_tag)
+    size = os.path.getsize(os.path.join(weights_dir, WEIGHTS_FILE))
+    print(f"Converted {manifest['model_tag']} to {weights_dir} ({size / 1e6:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Per-job latency tracing.
+
+A job opens a Trace and activates it; every stage it runs wraps its work in
+span("name"), wherever in the call stack (or thread, for code run through
+asyncio.to_thread) it happens. Span durations are summed per stage into the
+job's timings (returned to clients as the "timings" object) and recorded in
+worker-wide latency histograms, which are logged every TRACE_SUMMARY_EVERY
+jobs. Spans outside an active trace only feed the histograms.
+
+Debug output is gated by LOG_LEVEL: callers test DEBUG before formatting
+debug lines, so production workers (LOG_LEVEL=INFO) skip that work. The
+per-job TIMINGS and periodic METRICS lines are INFO output: LOG_LEVEL=WARNING
+(or ERROR) turns them off.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+DEBUG = LOG_LEVEL == "DEBUG"
+INFO = LOG_LEVEL in ("DEBUG", "INFO")
+
+# Jobs between histogram summaries in the log (0 disables them)
+SUMMARY_EVERY = int(os.environ.get("TRACE_SUMMARY_EVERY", "100"))
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000, 30000)
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram for one stage."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding quantile q (max for the open bucket)."""
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+class LatencyHistograms:
+    """Worker-wide histograms per stage, plus a job counter for summaries."""
+
+    def __init__(self):
+        self.stages: Dict[str, LatencyHistogram] = {}
+        self.jobs = 0
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, ms: float):
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = LatencyHistogram()
+            histogram.observe(ms)
+
+    def job_finished(self) -> Optional[Dict]:
+        """Count a finished job; return a summary when one is due."""
+        with self._lock:
+            self.jobs += 1
+            if SUMMARY_EVERY <= 0 or self.jobs % SUMMARY_EVERY:
+                return None
+            return self.summary()
+
+    def summary(self) -> Dict:
+        return {stage: histogram.summary() for stage, histogram in sorted(self.stages.items())}
+
+
+histograms = LatencyHistograms()
+
+
+class Trace:
+    """
+    Stage timings of one job.
+
+    Repeated spans of the same stage (e.g. two edit distance passes) are
+    summed. "total" is the wall time since the trace was created.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def span(self, stage: str):
+        """Time the enclosed block as stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    @contextmanager
+    def activate(self):
+        """Make this the current trace for span() in this context."""
+        token = _current_trace.set(self)
+        try:
+            yield self
+        finally:
+            _current_trace.reset(token)
+
+    def timings(self) -> Dict[str, float]:
+        """Milliseconds per stage, plus "total"."""
+        with self._lock:
+            timings = {stage: round(seconds * 1000, 1) for stage, seconds in self.stages.items()}
+        timings["total"] = round((time.perf_counter() - self.start) * 1000, 1)
+        return timings
+
+    def finish(self) -> Dict[str, float]:
+        """Record the job in the histograms, log its timings and return them."""
+        timings = self.timings()
+        for stage, ms in timings.items():
+            histograms.observe(stage, ms)
+        if INFO:
+            print(f"TIMINGS: {json.dumps(timings)}")
+        summary = histograms.job_finished()
+        if summary is not None and INFO:
+            print(f"METRICS: {json.dumps({'jobs': histograms.jobs, 'stages': summary})}")
+        return timings
+
+
+def current_trace() -> Optional[Trace]:
+    """The active trace in this context, or None."""
+    return _current_trace.get()
+
+
+@contextmanager
+def span(stage: str):
+    """
+    Time the enclosed block as stage of the active trace.
+
+    Without an active trace the duration goes straight to the histograms.
+    """
+    trace = _current_trace.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        if trace is not None:
+            trace.add(stage, seconds)
+        else:
+            histograms.observe(stage, seconds * 1000)
@@ -0,0 +1,160 @@
+"""
+Benchmark audio decoding across the formats the browser recorder produces.
+
+Decodes the same utterance encoded as 16kHz mono WAV (the app's converted
+upload), WebM/Opus (Chrome's MediaRecorder default), Ogg/Opus (Firefox),
+MP4/AAC (Safari) and a few others with decode_audio_bytes(), and, when
+librosa is installed, with the previous path (temporary file plus
+librosa.load(sr=16000)). WebM and MP4 are encoded with ffmpeg and skipped
+when it is not installed. Real recordings can be added with --clips.
+
+Run from mod/:
+    python tests/benchmark_audio_decode.py --seconds 10 --output decode_report.md
+"""
+import argparse
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import soundfile as sf
+
+from shared.audio import decode_audio_bytes, resample, sniff_container
+from shared.startup import synthetic_utterance
+
+AUDIO_SUFFIXES = ('.wav', '.flac', '.mp3', '.m4a', '.mp4', '.ogg', '.webm')
+
+
+def encode_soundfile(speech, rate, channels=1, **kwargs) -> bytes:
+    if channels > 1:
+        speech = np.repeat(speech[:, np.newaxis], channels, axis=1)
+    buffer = io.BytesIO()
+    sf.write(buffer, speech, rate, **kwargs)
+    return buffer.getvalue()
+
+
+def encode_ffmpeg(speech, rate, suffix, *codec_args) -> bytes:
+    """Encode 16-bit WAV input with ffmpeg (MP4 needs a seekable output file)."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        out_path = os.path.join(tmp_dir, "clip" + suffix)
+        subprocess.run(
+            ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", "pipe:0", *codec_args, out_path],
+            input=encode_soundfile(speech, rate, format='WAV', subtype='PCM_16'), check=True,
+        )
+        with open(out_path, 'rb') as f:
+            return f.read()
+
+
+def synthetic_clips(seconds: float):
+    """(name, encoded bytes, suffix) of one utterance in each recorder format."""
+    speech = synthetic_utterance(seconds=seconds)
+    speech_48k = resample(speech, 16000, 48000)
+    clips = [
+        ("wav 16k mono (app upload)", encode_soundfile(speech, 16000, format='WAV', subtype='PCM_16'), '.wav'),
+        ("wav 48k stereo", encode_soundfile(speech_48k, 48000, channels=2, format='WAV', subtype='PCM_16'), '.wav'),
+        ("flac 16k mono", encode_soundfile(speech, 16000, format='FLAC'), '.flac'),
+        ("ogg/opus 48k (Firefox)", encode_soundfile(speech_48k, 48000, format='OGG', subtype='OPUS'), '.ogg'),
+    ]
+    if shutil.which("ffmpeg"):
+        clips += [
+            ("webm/opus 48k (Chrome)", encode_ffmpeg(speech_48k, 48000, '.webm', "-c:a", "libopus"), '.webm'),
+            ("mp4/aac 48k (Safari)", encode_ffmpeg(speech_48k, 48000, '.m4a', "-c:a", "aac"), '.m4a'),
+        ]
+    else:
+        print("ffmpeg not found: skipping WebM and MP4")
+    return clips
+
+
+def load_clips(clips_dir: str):
+    clips = []
+    for name in sorted(os.listdir(clips_dir)):
+        suffix = os.path.splitext(name)[1].lower()
+        if suffix in AUDIO_SUFFIXES:
+            with open(os.path.join(clips_dir, name), 'rb') as f:
+                clips.append((name, f.read(), suffix))
+    return clips
+
+
+def legacy_decode(data: bytes, suffix: str) -> np.ndarray:
+    """The previous decoder: temporary file, then librosa.load(sr=16000)."""
+    import librosa
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+        tmp_file.write(data)
+        tmp_path = tmp_file.name
+    try:
+        return librosa.load(tmp_path, sr=16000, mono=True)[0]
+    finally:
+        os.unlink(tmp_path)
+
+
+def best_time(decode, data, suffix, repeat: int):
+    """Best-of-repeat seconds and the decoded samples."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        speech = decode(data, suffix)
+        times.append(time.perf_counter() - start)
+    return min(times), speech
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio decode latency per recorder format")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Length of the synthetic utterance")
+    parser.add_argument("--clips", default=None, help="Directory of real recordings to add")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions per clip (best is reported)")
+    parser.add_argument("--output", default=None, help="Also write the report (Markdown) to this file")
+    args = parser.parse_args()
+
+    clips = synthetic_clips(args.seconds)
+    if args.clips:
+        clips += load_clips(args.clips)
+
+    try:
+        import librosa  # noqa: F401
+        has_librosa = True
+    except ImportError:
+        has_librosa = False
+        print("librosa not installed: skipping the previous decoder")
+
+    def fast_decode(data, suffix):
+        return decode_audio_bytes(data, suffix=suffix)
+
+    lines = [
+        f"# Audio decode to 16kHz mono ({args.repeat} runs, best)",
+        "",
+        "| clip | container | KB | audio s | decode ms | x realtime | previous ms | speedup |",
+        "|------|-----------|---:|--------:|----------:|-----------:|------------:|--------:|",
+    ]
+    for name, data, suffix in clips:
+        fast_time, speech = best_time(fast_decode, data, suffix, args.repeat)
+        duration = len(speech) / 16000
+        cells = f"{fast_time * 1000:.1f} | {duration / fast_time:.0f}x"
+        if has_librosa:
+            try:
+                legacy_time, _ = best_time(legacy_decode, data, suffix, args.repeat)
+                cells += f" | {legacy_time * 1000:.1f} | {legacy_time / fast_time:.1f}x"
+            except Exception as e:
+                print(f"Previous decoder failed on {name}: {e}")
+                cells += " | - | -"
+        else:
+            cells += " | - | -"
+        lines.append(
+            f"| {name} | {sniff_container(data) or '?'} | {len(data) / 1024:.0f} | {duration:.1f} | {cells} |"
+        )
+
+    report = "\n".join(lines)
+    print(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
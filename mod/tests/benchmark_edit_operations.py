@@ -0,0 +1,97 @@
+"""
+Benchmark edit_operations_fast() and edit_operations_banded() against
+edit_operations_reference().
+
+Replays every input used by test_edit_operations.TestEditOperations, then
+paragraph-sized phone and word sequences built from them, checks that all
+implementations return identical operations and reports timings.
+
+Run from mod/:
+    python tests/benchmark_edit_operations.py
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from assessment import edit_distance
+from assessment.edit_distance import edit_operations_reference, edit_operations_fast, edit_operations_banded, HAS_NUMBA
+import test_edit_operations
+
+
+def collect_test_cases():
+    """Run the edit_operations tests, recording every (actual, target) pair they use."""
+    cases = []
+    original = test_edit_operations.edit_operations
+
+    def recording(actual, target):
+        cases.append((list(actual), list(target)))
+        return original(actual, target)
+
+    test_edit_operations.edit_operations = recording
+    try:
+        suite = unittest.defaultTestLoader.loadTestsFromTestCase(test_edit_operations.TestEditOperations)
+        unittest.TextTestRunner(stream=open(os.devnull, 'w')).run(suite)
+    finally:
+        test_edit_operations.edit_operations = original
+    return cases
+
+
+def scaled_case(cases, length, seed):
+    """Paragraph-sized pair: test symbols concatenated, then randomly edited."""
+    rng = random.Random(seed)
+    symbols = [s for actual, target in cases for s in actual + target]
+    target = [rng.choice(symbols) for _ in range(length)]
+    actual = []
+    for symbol in target:
+        roll = rng.random()
+        if roll < 0.05:
+            continue  # Deleted
+        actual.append(rng.choice(symbols) if roll < 0.12 else symbol)
+        if roll > 0.97:
+            actual.append(rng.choice(symbols))  # Inserted
+    return actual, target
+
+
+def best_time(func, cases, repeat):
+    return min(timeit.repeat(lambda: [func(a, t) for a, t in cases], number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark accelerated edit_operations")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (best is reported)")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[50, 200, 800, 2000],
+                        help="Sequence lengths for the scaled cases")
+    args = parser.parse_args()
+
+    cases = collect_test_cases()
+    print(f"Backend: {'numba' if HAS_NUMBA else 'numpy'} (fast path from {edit_distance.FAST_MIN_CELLS} cells)")
+
+    suites = [(f"test cases ({len(cases)})", cases)]
+    for length in args.lengths:
+        suites.append((f"length {length}", [scaled_case(cases, length, seed) for seed in range(3)]))
+
+    edit_operations_fast(*cases[0])  # JIT compile outside the timings
+    print(f"{'inputs':<20} {'reference':>12} {'fast':>12} {'speedup':>9} {'banded':>12} {'speedup':>9}")
+    for name, suite in suites:
+        for actual, target in suite:
+            expected = edit_operations_reference(actual, target)
+            for func in (edit_operations_fast, edit_operations_banded):
+                if func(actual, target) != expected:
+                    raise AssertionError(f"{func.__name__} differs for {name}: {actual} vs {target}")
+        reference_time = best_time(edit_operations_reference, suite, args.repeat)
+        fast_time = best_time(edit_operations_fast, suite, args.repeat)
+        banded_time = best_time(edit_operations_banded, suite, args.repeat)
+        print(
+            f"{name:<20} {reference_time * 1000:>10.2f}ms {fast_time * 1000:>10.2f}ms {reference_time / fast_time:>8.1f}x"
+            f" {banded_time * 1000:>10.2f}ms {reference_time / banded_time:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
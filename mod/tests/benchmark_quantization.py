@@ -0,0 +1,136 @@
+"""
+Compare INT8 dynamic-quantized POWSM against fp32 on CPU.
+
+Runs phone recognition (PR) with both models on a fixed local clip set and
+reports per-clip latency and phone error rate (PER). PER is measured
+against a reference transcript in POWSM format when the clip has one next
+to it (clip.wav -> clip.ipa), and always against the fp32 output, which
+isolates the error the quantization itself adds.
+
+Run from mod/ (needs torch and espnet):
+    python tests/benchmark_quantization.py path/to/clips --output quantization_report.md
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from assessment.edit_distance import edit_operations
+from shared.audio import decode_audio_bytes
+from shared.phonemes import parse_ipa_phonemes
+from shared.powsm import load_powsm, quantize_int8, PowsmTask
+
+AUDIO_SUFFIXES = ('.wav', '.flac', '.mp3', '.m4a', '.ogg', '.webm')
+
+
+def parse_phones(ipa: str):
+    """POWSM "/a//b/" output to a list of phones (as assess.extract_ipa_from_audio sees it)."""
+    if "<notimestamps>" in ipa:
+        ipa = ipa.split("<notimestamps>")[1]
+    return parse_ipa_phonemes(ipa.strip())
+
+
+def phone_error_rate(hypothesis, reference) -> float:
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+    return len(edit_operations(hypothesis, reference)) / len(reference)
+
+
+def load_clips(clips_dir: str):
+    """(name, 16kHz samples, reference phones or None) for every clip, sorted by name."""
+    clips = []
+    for name in sorted(os.listdir(clips_dir)):
+        stem, suffix = os.path.splitext(name)
+        if suffix.lower() not in AUDIO_SUFFIXES:
+            continue
+        with open(os.path.join(clips_dir, name), 'rb') as f:
+            speech = decode_audio_bytes(f.read(), suffix=suffix.lower())
+        reference = None
+        reference_path = os.path.join(clips_dir, stem + ".ipa")
+        if os.path.exists(reference_path):
+            with open(reference_path, 'r', encoding='utf-8') as f:
+                reference = parse_phones(f.read())
+        clips.append((name, speech, reference))
+    return clips
+
+
+def run(model, speech, repeat: int):
+    """Best-of-repeat latency in seconds and the recognized phones."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = model(speech, text_prev="<na>")
+        times.append(time.perf_counter() - start)
+    return min(times), parse_phones(result[0][0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="INT8 vs fp32 POWSM phone recognition on CPU")
+    parser.add_argument("clips_dir", help="Directory of audio clips (optional clip.ipa references)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions per clip (best is reported)")
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads (default: torch's choice)")
+    parser.add_argument("--output", default=None, help="Also write the report (Markdown) to this file")
+    args = parser.parse_args()
+
+    import torch
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    clips = load_clips(args.clips_dir)
+    if not clips:
+        parser.error(f"no audio clips in {args.clips_dir}")
+
+    fp32 = PowsmTask(load_powsm("cpu"), task_sym="<pr>")
+    int8 = PowsmTask(quantize_int8(load_powsm("cpu")), task_sym="<pr>")
+    run(fp32, clips[0][1], 1)  # Warm up both models outside the timings
+    run(int8, clips[0][1], 1)
+
+    lines = [
+        f"# INT8 vs fp32 POWSM PR ({len(clips)} clips, {torch.get_num_threads()} threads)",
+        "",
+        "| clip | fp32 s | int8 s | speedup | PER fp32 | PER int8 | PER int8 vs fp32 |",
+        "|------|-------:|-------:|--------:|---------:|---------:|-----------------:|",
+    ]
+    fp32_times, int8_times, drift, fp32_per, int8_per = [], [], [], [], []
+    for name, speech, reference in clips:
+        fp32_time, fp32_phones = run(fp32, speech, args.repeat)
+        int8_time, int8_phones = run(int8, speech, args.repeat)
+        fp32_times.append(fp32_time)
+        int8_times.append(int8_time)
+        drift.append(phone_error_rate(int8_phones, fp32_phones))
+        if reference is not None:
+            fp32_per.append(phone_error_rate(fp32_phones, reference))
+            int8_per.append(phone_error_rate(int8_phones, reference))
+            per_cells = f"{fp32_per[-1]:.3f} | {int8_per[-1]:.3f}"
+        else:
+            per_cells = "- | -"
+        lines.append(
+            f"| {name} | {fp32_time:.2f} | {int8_time:.2f} | {fp32_time / int8_time:.2f}x"
+            f" | {per_cells} | {drift[-1]:.3f} |"
+        )
+
+    lines += [
+        "",
+        f"Median latency: fp32 {statistics.median(fp32_times):.2f}s, int8 {statistics.median(int8_times):.2f}s"
+        f" ({sum(fp32_times) / sum(int8_times):.2f}x total throughput)",
+        f"Mean PER of int8 against fp32 output: {statistics.mean(drift):.3f}",
+    ]
+    if fp32_per:
+        lines.append(
+            f"Mean PER against references ({len(fp32_per)} clips): "
+            f"fp32 {statistics.mean(fp32_per):.3f}, int8 {statistics.mean(int8_per):.3f}"
+        )
+
+    report = "\n".join(lines)
+    print(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
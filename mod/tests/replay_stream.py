@@ -0,0 +1,83 @@
+"""
+Replay an audio file to the streaming assessment server as a live stream.
+
+Sends the recording as 16-bit PCM chunks at real-time pace (or faster),
+prints the segment events as they arrive and the final result, and reports
+the latency from the end of the stream to the result.
+
+Run from mod/ against a local server (python assessment/stream_server.py):
+    python tests/replay_stream.py path/to/clip.wav "the target text"
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from websockets.sync.client import connect
+
+from shared.audio import decode_audio_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay an audio file as a streamed assessment")
+    parser.add_argument("audio", help="Audio file (decoded to 16kHz mono)")
+    parser.add_argument("target_text", help="Target text")
+    parser.add_argument("--target-ipa", default=None, help="Target IPA (default: index or G2P)")
+    parser.add_argument("--url", default="ws://localhost:8000/ws/assess", help="Server endpoint")
+    parser.add_argument("--chunk-ms", type=int, default=100, help="Audio per message")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed (0 sends as fast as possible)")
+    args = parser.parse_args()
+
+    with open(args.audio, 'rb') as f:
+        speech = decode_audio_bytes(f.read(), suffix=os.path.splitext(args.audio)[1].lower())
+    pcm = (np.clip(speech, -1.0, 32767 / 32768) * 32768).astype('<i2').tobytes()
+    chunk_bytes = 2 * 16 * args.chunk_ms
+
+    with connect(args.url, max_size=None) as websocket:
+        start = {"target_text": args.target_text, "sample_rate": 16000}
+        if args.target_ipa is not None:
+            start["target_ipa"] = args.target_ipa
+        websocket.send(json.dumps(start))
+
+        stream_start = time.perf_counter()
+        done = {}
+
+        def receive():
+            for message in websocket:
+                event = json.loads(message)
+                elapsed = time.perf_counter() - stream_start
+                if event.get("type") == "segment":
+                    print(f"[{elapsed:6.2f}s] segment {event['start']:.2f}-{event['end']:.2f}s: "
+                          f"{event['actual_ipa']} ({event['actual_text']})")
+                else:
+                    done["event"] = event
+                    done["at"] = time.perf_counter()
+                    return
+
+        receiver = threading.Thread(target=receive, daemon=True)
+        receiver.start()
+
+        for offset in range(0, len(pcm), chunk_bytes):
+            websocket.send(pcm[offset:offset + chunk_bytes])
+            if args.speed > 0:
+                # Pace against the clock so slow sends don't accumulate drift
+                due = stream_start + (offset + chunk_bytes) / 32000 / args.speed
+                time.sleep(max(0.0, due - time.perf_counter()))
+        end_sent = time.perf_counter()
+        websocket.send(json.dumps({"type": "end"}))
+        receiver.join()
+
+    event = done.get("event", {})
+    print(json.dumps(event, indent=2, ensure_ascii=False))
+    if "at" in done:
+        print(f"Stream: {end_sent - stream_start:.2f}s, result {done['at'] - end_sent:.2f}s after the end")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import hashlib
+import io
+import tempfile
+import unittest
+from unittest import mock
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+try:
+    import numpy as np
+    import soundfile as sf
+    import shared.audio
+    from shared.audio import AudioClip, decode_audio_bytes, download_bytes, load_audio, resample, sniff_container
+    HAS_DEPS = True
+except ImportError:
+    HAS_DEPS = False
+
+try:
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'assessment'))
+    from assess import preflight_check
+    HAS_ASSESS = True
+except ImportError:
+    HAS_ASSESS = False
+
+RATE = 16000
+
+
+def tone(seconds=1.0, rate=RATE):
+    t = np.arange(int(seconds * rate)) / rate
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def encode(speech, rate, **kwargs):
+    buffer = io.BytesIO()
+    sf.write(buffer, speech, rate, **kwargs)
+    return buffer.getvalue()
+
+
+@unittest.skipUnless(HAS_DEPS, "audio dependencies not installed")
+class TestSniffContainer(unittest.TestCase):
+
+    def test_magic_bytes(self):
+        self.assertEqual(sniff_container(b"RIFF\x24\x00\x00\x00WAVEfmt "), "wav")
+        self.assertEqual(sniff_container(b"fLaC\x00\x00\x00\x22"), "flac")
+        self.assertEqual(sniff_container(b"OggS\x00\x02"), "ogg")
+        self.assertEqual(sniff_container(b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81"), "webm")
+        self.assertEqual(sniff_container(b"\x00\x00\x00\x1cftypM4A "), "mp4")
+        self.assertEqual(sniff_container(b"ID3\x04\x00"), "mp3")
+        self.assertEqual(sniff_container(b"\xff\xfb\x90\x64"), "mp3")
+
+    def test_unknown(self):
+        self.assertIsNone(sniff_container(b""))
+        self.assertIsNone(sniff_container(b"hello world!"))
+        # ADTS AAC shares the frame sync but has no MPEG layer
+        self.assertIsNone(sniff_container(b"\xff\xf1\x50\x80"))
+
+
+@unittest.skipUnless(HAS_DEPS, "audio dependencies not installed")
+class TestDecodeAudioBytes(unittest.TestCase):
+
+    def test_16k_mono_wav_is_not_resampled(self):
+        speech = tone()
+        decoded = decode_audio_bytes(encode(speech, RATE, format='WAV', subtype='FLOAT'))
+        self.assertEqual(decoded.dtype, np.float32)
+        np.testing.assert_array_equal(decoded, speech)
+
+    def test_stereo_48k_is_downmixed_and_resampled(self):
+        speech = tone(rate=48000)
+        decoded = decode_audio_bytes(encode(np.stack([speech, speech], axis=1), 48000, format='WAV', subtype='PCM_16'))
+        self.assertEqual(decoded.ndim, 1)
+        self.assertEqual(decoded.dtype, np.float32)
+        self.assertEqual(len(decoded), RATE)
+        np.testing.assert_allclose(decoded[1000:-1000], tone()[1000:-1000], atol=2e-3)
+
+    def test_flac_ignores_wrong_suffix(self):
+        speech = tone()
+        decoded = decode_audio_bytes(encode(speech, RATE, format='FLAC'), suffix='.webm')
+        np.testing.assert_allclose(decoded, speech, atol=1e-4)
+
+    def test_resample_same_rate_is_identity(self):
+        speech = tone()
+        self.assertIs(resample(speech, RATE, RATE), speech)
+
+
+@unittest.skipUnless(HAS_DEPS, "audio dependencies not installed")
+class TestInMemoryDownload(unittest.TestCase):
+
+    def setUp(self):
+        self.speech = tone()
+        self.data = encode(self.speech, RATE, format='WAV', subtype='FLOAT')
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
+            f.write(self.data)
+        self.addCleanup(os.unlink, f.name)
+        self.uri = "file://" + f.name
+
+    def test_download_bytes(self):
+        self.assertEqual(download_bytes(self.uri), self.data)
+
+    def test_load_audio_writes_no_temporary_file(self):
+        with mock.patch("tempfile.NamedTemporaryFile", side_effect=AssertionError("temporary file written")):
+            speech, rate = load_audio(self.uri)
+        self.assertEqual(rate, RATE)
+        np.testing.assert_array_equal(speech, self.speech)
+
+    def test_load_audio_download_failure(self):
+        with self.assertRaises(ValueError):
+            load_audio(self.uri + ".missing")
+
+
+@unittest.skipUnless(HAS_DEPS, "audio dependencies not installed")
+class TestAudioClip(unittest.TestCase):
+
+    def setUp(self):
+        self.speech = tone()
+        self.data = encode(self.speech, RATE, format='WAV', subtype='FLOAT')
+        patcher = mock.patch.object(shared.audio, "decode_audio_bytes", wraps=decode_audio_bytes)
+        self.decode = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_decodes_once(self):
+        audio = AudioClip(self.data)
+        self.decode.assert_not_called()
+        self.assertEqual(audio.duration, 1.0)
+        speech = audio.speech
+        self.assertIs(audio.speech, speech)
+        audio.duration
+        if HAS_ASSESS:
+            preflight_check(audio)
+            preflight_check(audio)
+        self.assertEqual(self.decode.call_count, 1)
+        np.testing.assert_array_equal(speech, self.speech)
+
+    def test_wav_path_written_once_and_removed(self):
+        audio = AudioClip(self.data)
+        with mock.patch("soundfile.write", wraps=sf.write) as write:
+            with audio:
+                write.assert_not_called()
+                path = audio.wav_path()
+                self.assertEqual(audio.wav_path(), path)
+                self.assertEqual(write.call_count, 1)
+                self.assertTrue(os.path.exists(path))
+                np.testing.assert_allclose(sf.read(path, dtype='float32')[0], self.speech, atol=1e-4)
+            self.assertFalse(os.path.exists(path))
+
+        audio = AudioClip(self.data)
+        path = audio.wav_path()
+        audio.close()
+        self.assertFalse(os.path.exists(path))
+        audio.close()
+
+    def test_slice_is_a_view(self):
+        audio = AudioClip(self.data)
+        part = audio.slice(1000, 5000)
+        self.assertEqual(len(part.speech), 4000)
+        self.assertTrue(np.shares_memory(part.speech, audio.speech))
+        self.assertEqual(part.sample_rate, audio.sample_rate)
+        self.assertEqual(self.decode.call_count, 1)
+
+    def test_digest_is_cached(self):
+        audio = AudioClip(self.data)
+        with mock.patch("hashlib.sha256", wraps=hashlib.sha256) as sha256:
+            first = audio.digest()
+            self.assertEqual(audio.digest(), first)
+            self.assertEqual(sha256.call_count, 1)
+        self.assertEqual(first, hashlib.sha256(self.data).hexdigest())
+        self.decode.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
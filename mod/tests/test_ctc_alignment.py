@@ -0,0 +1,148 @@
+import unittest
+from unittest import mock
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'assessment'))
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+if HAS_NUMPY:
+    from assessment.ctc_alignment import ctc_forced_align, spans_to_alignments
+
+try:
+    import assess
+    from shared.audio import AudioClip
+    HAS_ASSESS = True
+except ImportError:
+    HAS_ASSESS = False
+
+RATE = 16000
+
+
+def posteriors(frame_labels, vocab=4, peak=0.9):
+    """Log posteriors where each frame strongly favours one label."""
+    probs = np.full((len(frame_labels), vocab), (1.0 - peak) / (vocab - 1))
+    probs[np.arange(len(frame_labels)), frame_labels] = peak
+    return np.log(probs)
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class TestCtcForcedAlign(unittest.TestCase):
+
+    def test_empty_targets(self):
+        self.assertEqual(ctc_forced_align(posteriors([0, 0]), []), [])
+
+    def test_follows_peaks(self):
+        # blank, 1, 1, blank, 2, blank, 3
+        log_probs = posteriors([0, 1, 1, 0, 2, 0, 3])
+        spans = ctc_forced_align(log_probs, [1, 2, 3])
+        self.assertEqual(spans, [(1, 2), (4, 4), (6, 6)])
+
+    def test_repeated_label_needs_blank(self):
+        # Two consecutive 1s must be separated by a blank frame
+        log_probs = posteriors([1, 1, 0, 1])
+        spans = ctc_forced_align(log_probs, [1, 1])
+        self.assertEqual(len(spans), 2)
+        self.assertLess(spans[0][1] + 1, spans[1][0])
+
+    def test_forces_labels_not_in_peaks(self):
+        # Label 3 never peaks but must still be emitted, in order
+        log_probs = posteriors([0, 1, 0, 0, 2, 0])
+        spans = ctc_forced_align(log_probs, [1, 3, 2])
+        starts = [start for start, _ in spans]
+        self.assertEqual(starts, sorted(starts))
+        self.assertEqual(spans[0][0], 1)
+
+    def test_too_few_frames(self):
+        with self.assertRaises(ValueError):
+            ctc_forced_align(posteriors([1, 1]), [1, 1])
+
+    def test_spans_to_alignments(self):
+        # "h" extends up to the next phone, "ɛ" over one trailing blank frame
+        alignments = spans_to_alignments(["h", "ɛ"], [(1, 2), (4, 4)], frame_shift=0.04, max_trailing_frames=1)
+        self.assertEqual(alignments, [
+            {"phone": "h", "start": 0.04, "end": 0.16},
+            {"phone": "ɛ", "start": 0.16, "end": 0.24},
+        ])
+
+
+@unittest.skipUnless(HAS_ASSESS, "assessment dependencies not installed")
+class TestAlignmentMethod(unittest.TestCase):
+
+    def resolve(self, mode, mfa):
+        with mock.patch.object(assess, "ALIGNMENT_MODE", mode), \
+                mock.patch.object(assess, "get_mfa_aligner", lambda: mfa):
+            return assess.resolve_alignment_method()
+
+    def test_ctc_is_opt_in(self):
+        self.assertEqual(self.resolve("auto", None), "estimated")
+        self.assertEqual(self.resolve("auto", object()), "mfa")
+        self.assertEqual(self.resolve("mfa", None), "estimated")
+        self.assertEqual(self.resolve("ctc", object()), "ctc")
+        self.assertEqual(self.resolve("estimated", object()), "estimated")
+
+    def test_vocabulary_map_built_once_per_model(self):
+        class TokenList(list):
+            iterations = 0
+
+            def __iter__(self):
+                TokenList.iterations += 1
+                return super().__iter__()
+
+        first = mock.Mock(s2t_model=mock.Mock(token_list=TokenList(["<blank>", "<unk>", "/a/"])))
+        second = mock.Mock(s2t_model=mock.Mock(token_list=TokenList(["<blank>", "/b/"])))
+        with mock.patch.object(assess, "_token_ids", None):
+            with mock.patch.object(assess, "get_powsm", lambda device=None: first):
+                self.assertEqual(assess.get_token_ids()["/a/"], 2)
+                self.assertIs(assess.get_token_ids(), assess.get_token_ids())
+            self.assertEqual(TokenList.iterations, 1)
+            with mock.patch.object(assess, "get_powsm", lambda device=None: second):
+                self.assertEqual(assess.get_token_ids(), {"<blank>": 0, "/b/": 1})
+            self.assertEqual(TokenList.iterations, 2)
+
+    def test_ctc_and_estimated_on_same_input(self):
+        # One second of tone in two seconds of silence, recognized as "hɛloʊ"
+        t = np.arange(2 * RATE) / RATE
+        speech = (0.3 * np.sin(2 * np.pi * 220 * t) * ((t > 0.5) & (t < 1.5))).astype(np.float32)
+        audio = AudioClip.from_samples(speech)
+        preflight = assess.preflight_check(audio)
+        recognized = {
+            "actual_ipa": "/h//ɛ//l//o//ʊ/",
+            "ctc_alignments": [
+                {"phone": p, "start": 0.5 + 0.2 * i, "end": 0.7 + 0.2 * i} for i, p in enumerate("hɛloʊ")
+            ],
+            "target_ipa": "/h//ə//l//o//ʊ/",
+            "actual_text_raw": "hello",
+            "actual_text": "hello",
+        }
+        ctc = assess.score_assessment(audio, "hello", dict(recognized), preflight, "ctc")
+        estimated = assess.score_assessment(audio, "hello", dict(recognized), preflight, "estimated")
+
+        self.assertEqual(ctc["alignment_method"], "ctc")
+        self.assertEqual(estimated["alignment_method"], "estimated")
+        # Same scoring; only the timestamps differ
+        self.assertEqual(ctc["score"], estimated["score"])
+        strip = lambda errors: [{k: v for k, v in e.items() if k != "timestamp"} for e in errors]
+        self.assertEqual(strip(ctc["errors"]), strip(estimated["errors"]))
+        self.assertEqual(
+            [(a["start"], a["end"]) for a in ctc["alignments"]],
+            [(a["start"], a["end"]) for a in recognized["ctc_alignments"]],
+        )
+        self.assertFalse(ctc["errors"][0]["timestamp"]["estimated"])
+        self.assertTrue(estimated["errors"][0]["timestamp"]["estimated"])
+        # Estimates stay within the detected speech, in order
+        starts = [a["start"] for a in estimated["alignments"]]
+        self.assertEqual(starts, sorted(starts))
+        self.assertGreater(starts[0], 0.3)
+        self.assertLess(estimated["alignments"][-1]["end"], 1.7)
+
+
+if __name__ == '__main__':
+    unittest.main()
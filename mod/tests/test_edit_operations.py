@@ -5,7 +5,16 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from assessment.edit_distance import edit_operations
+from assessment.edit_distance import (
+    edit_operations,
+    edit_operations_reference,
+    edit_operations_fast,
+    edit_operations_banded,
+    hierarchical_edit_operations,
+    lattice_edit_operations,
+    operation_word_indices,
+    HAS_NUMPY,
+)
 
 class TestEditOperations(unittest.TestCase):
     
@@ -274,6 +283,151 @@ class TestEditOperations(unittest.TestCase):
         self.assertEqual(ops[0][3], "ɪ")
 
 
+class TestHierarchicalEditOperations(unittest.TestCase):
+    
+    def test_matches_global_alignment(self):
+        words = [["ð", "ə"], ["k", "w", "ɪ", "k"], ["b", "ɹ", "aʊ", "n"], ["f", "ɑ", "k", "s"]]
+        target = [p for word in words for p in word]
+        actual = ["ð", "ə", "k", "w", "i", "k", "b", "ɹ", "aʊ", "n", "n", "f", "ɑ", "s"]
+        hierarchical = hierarchical_edit_operations(actual, words)
+        # Same cost as the global DP (which duplicated "n" is inserted may differ)
+        self.assertEqual(
+            sorted(op[0] for op in hierarchical),
+            sorted(op[0] for op in edit_operations(actual, target)),
+        )
+        self.assertIn(("substitute", 4, "ɪ", "i"), hierarchical)
+    
+    def test_identical(self):
+        words = [["h", "ə"], ["l", "oʊ"]]
+        self.assertEqual(hierarchical_edit_operations(["h", "ə", "l", "oʊ"], words), [])
+    
+    def test_missing_word(self):
+        words = [["ð", "ə"], ["k", "æ", "t"], ["s", "æ", "t"]]
+        ops = hierarchical_edit_operations(["ð", "ə", "s", "æ", "t"], words)
+        self.assertEqual(ops, [("delete", 2, "k"), ("delete", 3, "æ"), ("delete", 4, "t")])
+    
+    def test_empty(self):
+        self.assertEqual(hierarchical_edit_operations([], []), [])
+        self.assertEqual(hierarchical_edit_operations(["a"], []), [("insert", 0, "a")])
+    
+    def test_word_indices(self):
+        words = [["ð", "ə"], ["k", "æ", "t"], ["s", "æ", "t"]]
+        actual = ["z", "ð", "ə", "k", "ɛ", "t", "s", "æ", "t", "s"]
+        ops = hierarchical_edit_operations(actual, words)
+        self.assertEqual(ops, [("insert", 0, "z"), ("substitute", 4, "æ", "ɛ"), ("insert", 9, "s")])
+        self.assertEqual(operation_word_indices(ops, [2, 3, 3]), [0, 1, 2])
+    
+    def test_word_indices_deletions(self):
+        ops = [("delete", 0, "ð"), ("delete", 4, "t")]
+        self.assertEqual(operation_word_indices(ops, [2, 3]), [0, 1])
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class TestEditOperationsFast(unittest.TestCase):
+    """edit_operations_fast() must match the reference exactly, tie-breaks included."""
+    
+    def assertSameAsReference(self, actual, reference):
+        self.assertEqual(edit_operations_fast(actual, reference), edit_operations_reference(actual, reference))
+    
+    def test_empty(self):
+        self.assertSameAsReference([], [])
+        self.assertSameAsReference(list("abc"), [])
+        self.assertSameAsReference([], list("abc"))
+    
+    def test_ipa_phonemes(self):
+        self.assertSameAsReference(["ð", "ɪ", "s", "ɪ", "z"], ["ð", "ɪ", "s", "ɪ", "z", "ə"])
+        self.assertSameAsReference(["ˈh", "ɛ", "l", "oʊ"], ["h", "ɛ", "l", "oʊ"])
+    
+    def test_words(self):
+        actual = "the quick brown fox jumped over a lazy dog".split()
+        reference = "the quick brown fox jumps over the lazy dog".split()
+        self.assertSameAsReference(actual, reference)
+    
+    def test_random_sequences(self):
+        import random
+        rng = random.Random(0)
+        for alphabet in ("ab", "abcd", "abcdefghijklmnop"):
+            for _ in range(200):
+                actual = [rng.choice(alphabet) for _ in range(rng.randint(0, 30))]
+                reference = [rng.choice(alphabet) for _ in range(rng.randint(0, 30))]
+                self.assertSameAsReference(actual, reference)
+    
+    def test_long_sequences_use_fast_path(self):
+        import random
+        rng = random.Random(1)
+        actual = [rng.choice("abcdefgh") for _ in range(300)]
+        reference = [rng.choice("abcdefgh") for _ in range(280)]
+        self.assertEqual(edit_operations(actual, reference), edit_operations_reference(actual, reference))
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class TestEditOperationsBanded(unittest.TestCase):
+    """edit_operations_banded() must widen its band until the result matches the reference."""
+    
+    def test_random_sequences_narrow_band(self):
+        import random
+        rng = random.Random(2)
+        for alphabet in ("ab", "abcd", "abcdefghijklmnop"):
+            for _ in range(200):
+                actual = [rng.choice(alphabet) for _ in range(rng.randint(0, 30))]
+                reference = [rng.choice(alphabet) for _ in range(rng.randint(0, 30))]
+                for slack in (1, 4):
+                    self.assertEqual(
+                        edit_operations_banded(actual, reference, initial_slack=slack),
+                        edit_operations_reference(actual, reference),
+                    )
+    
+    def test_long_passage(self):
+        import random
+        rng = random.Random(3)
+        reference = [rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(600)]
+        actual = list(reference)
+        for _ in range(30):
+            position = rng.randrange(len(actual))
+            edit = rng.choice(("insert", "delete", "substitute"))
+            if edit == "insert":
+                actual.insert(position, rng.choice("abc"))
+            elif edit == "delete":
+                del actual[position]
+            else:
+                actual[position] = rng.choice("abc")
+        self.assertEqual(edit_operations(actual, reference), edit_operations_reference(actual, reference))
+        self.assertEqual(edit_operations_banded(actual, reference, initial_slack=1), edit_operations_reference(actual, reference))
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class TestLatticeEditOperations(unittest.TestCase):
+    
+    def test_single_variant_matches_reference(self):
+        import random
+        rng = random.Random(4)
+        for _ in range(300):
+            words = [[rng.choice("abcd") for _ in range(rng.randint(1, 4))] for _ in range(rng.randint(0, 5))]
+            actual = [rng.choice("abcd") for _ in range(rng.randint(0, 15))]
+            target = [p for word in words for p in word]
+            ops, choices = lattice_edit_operations(actual, [[word] for word in words])
+            self.assertEqual(ops, edit_operations_reference(actual, target))
+            self.assertEqual(choices, [0] * len(words))
+    
+    def test_chooses_matching_variant(self):
+        lattice = [[["t", "ə"], ["t", "u"]], [["m", "ɑ", "ɹ", "oʊ"]]]
+        ops, choices = lattice_edit_operations(["t", "u", "m", "ɑ", "ɹ", "oʊ"], lattice)
+        self.assertEqual(ops, [])
+        self.assertEqual(choices, [1, 0])
+    
+    def test_positions_follow_chosen_variants(self):
+        lattice = [[["ð", "ə"], ["ð", "i"]], [["k", "æ", "t"]]]
+        ops, choices = lattice_edit_operations(["ð", "i", "k", "æ"], lattice)
+        self.assertEqual(choices, [1, 0])
+        self.assertEqual(ops, [("delete", 4, "t")])
+    
+    def test_optional_word(self):
+        lattice = [[["ə"], []], [["k", "æ", "t"]]]
+        ops, choices = lattice_edit_operations(["k", "æ", "t"], lattice)
+        self.assertEqual(ops, [])
+        self.assertEqual(choices, [1, 0])
+
+
 if __name__ == "__main__":
     unittest.main()
 
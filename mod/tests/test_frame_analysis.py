@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'assessment'))
+
+try:
+    import numpy as np
+    from assess import analyze_frames, check_signal_quality, estimate_speech_boundaries
+    HAS_DEPS = True
+except ImportError:
+    HAS_DEPS = False
+
+RATE = 16000
+
+
+def loop_frames(audio, sample_rate):
+    """The per-frame loops analyze_frames() replaced, as an analyze_frames() result."""
+    frame_size = int(0.025 * sample_rate)
+    hop_size = int(0.010 * sample_rate)
+    num_frames = max(1, (len(audio) - frame_size) // hop_size + 1)
+    energies, rms, times = [], [], []
+    for i in range(num_frames):
+        start = i * hop_size
+        end = min(start + frame_size, len(audio))
+        frame = audio[start:end]
+        energies.append(np.sum(frame ** 2))
+        rms.append(np.sqrt(np.mean(frame ** 2)))
+        times.append(start / sample_rate)
+    return {
+        "energies": np.array(energies),
+        "rms": np.array(rms),
+        "frame_times": np.array(times),
+        "frame_size": frame_size,
+        "hop_size": hop_size,
+    }
+
+
+def loop_speech_boundaries(audio, sample_rate):
+    """estimate_speech_boundaries() before it shared analyze_frames()."""
+    duration = len(audio) / sample_rate
+    frames = loop_frames(audio, sample_rate)
+    frame_energies, frame_times = frames["rms"], frames["frame_times"]
+    threshold = np.max(frame_energies) * 0.1
+    speech_frames = np.where(frame_energies > threshold)[0]
+    if len(speech_frames) == 0:
+        return 0.0, duration
+    speech_start = frame_times[speech_frames[0]]
+    speech_end = frame_times[speech_frames[-1]] + frames["frame_size"] / sample_rate
+    return max(0.0, speech_start - 0.05), min(duration, speech_end + 0.05)
+
+
+def clip(samples, seed=0):
+    """Tone bursts over noise, samples long."""
+    t = np.arange(samples) / RATE
+    noise = 0.01 * np.random.default_rng(seed).standard_normal(samples)
+    return (0.3 * np.sin(2 * np.pi * 220 * t) * ((t % 0.6) < 0.4) + noise).astype(np.float32)
+
+
+@unittest.skipUnless(HAS_DEPS, "assessment dependencies not installed")
+class TestAnalyzeFramesMatchesLoops(unittest.TestCase):
+
+    # One sample, shorter than one frame, exactly one frame, whole hops,
+    # partial hops, and a few seconds
+    LENGTHS = (1, 100, 399, 400, 560, 1999, 16000, 16157, 3 * RATE + 77)
+
+    def test_frames(self):
+        for length in self.LENGTHS:
+            audio = clip(length)
+            frames, reference = analyze_frames(audio, RATE), loop_frames(audio, RATE)
+            self.assertEqual(len(frames["energies"]), len(reference["energies"]), length)
+            np.testing.assert_allclose(frames["energies"], reference["energies"], rtol=1e-5, err_msg=str(length))
+            np.testing.assert_allclose(frames["rms"], reference["rms"], rtol=1e-5, err_msg=str(length))
+            np.testing.assert_array_equal(frames["frame_times"], reference["frame_times"])
+            self.assertEqual(frames["frame_size"], reference["frame_size"])
+            self.assertEqual(frames["hop_size"], reference["hop_size"])
+
+    def test_signal_quality(self):
+        for length in self.LENGTHS:
+            audio = clip(length)
+            self.assertEqual(
+                check_signal_quality(audio, RATE, analyze_frames(audio, RATE)),
+                check_signal_quality(audio, RATE, loop_frames(audio, RATE)),
+                length,
+            )
+
+    def test_speech_boundaries(self):
+        for length in self.LENGTHS:
+            audio = clip(length)
+            expected = loop_speech_boundaries(audio, RATE)
+            for actual, reference in zip(estimate_speech_boundaries(audio, RATE), expected):
+                self.assertAlmostEqual(actual, reference, places=9, msg=length)
+
+    def test_empty(self):
+        frames = analyze_frames(np.zeros(0, dtype=np.float32), RATE)
+        self.assertEqual(len(frames["energies"]), 1)
+        self.assertEqual(frames["rms"][0], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'assessment'))
+
+try:
+    import numpy as np
+    import assess
+    from assess import analyze_frames, segment_at_pauses, shift_alignments, speech_region
+    from shared.audio import AudioClip
+    HAS_DEPS = True
+except ImportError:
+    HAS_DEPS = False
+
+RATE = 16000
+
+
+def bursts(seconds, speech=4.0, pause=0.5):
+    """Tone bursts of speech seconds separated by pause seconds of near-silence."""
+    t = np.arange(int(seconds * RATE)) / RATE
+    on = (t % (speech + pause)) < speech
+    noise = 0.001 * np.random.default_rng(0).standard_normal(len(t))
+    return (0.3 * np.sin(2 * np.pi * 220 * t) * on + noise).astype(np.float32)
+
+
+@unittest.skipUnless(HAS_DEPS, "assessment dependencies not installed")
+class TestSegmentAtPauses(unittest.TestCase):
+    
+    def segments(self, audio, **kwargs):
+        return segment_at_pauses(analyze_frames(audio, RATE), RATE, len(audio), **kwargs)
+    
+    def test_short_recording_is_one_segment(self):
+        audio = bursts(20)
+        self.assertEqual(self.segments(audio), [(0, len(audio))])
+    
+    def test_cuts_in_pauses(self):
+        audio = bursts(70)
+        segments = self.segments(audio, max_segment_seconds=25)
+        self.assertEqual(segments[0][0], 0)
+        self.assertEqual(segments[-1][1], len(audio))
+        for (_, end), (start, _) in zip(segments, segments[1:]):
+            self.assertEqual(end, start)
+            # Pauses run from 4.0 to 4.5s in every 4.5s period
+            self.assertGreaterEqual((end / RATE) % 4.5, 4.0)
+        for start, end in segments:
+            self.assertLessEqual(end - start, 25 * RATE)
+    
+    def test_no_pauses_still_bounded(self):
+        t = np.arange(60 * RATE) / RATE
+        audio = (0.3 * np.sin(2 * np.pi * 220 * t) * (1 + 0.5 * np.sin(2 * np.pi * 0.3 * t))).astype(np.float32)
+        segments = self.segments(audio, max_segment_seconds=25)
+        self.assertGreater(len(segments), 2)
+        for start, end in segments:
+            self.assertLessEqual(end - start, 25 * RATE)
+        self.assertEqual(segments[-1][1], len(audio))
+
+
+@unittest.skipUnless(HAS_DEPS, "assessment dependencies not installed")
+class TestSilenceTrimming(unittest.TestCase):
+    
+    def test_speech_region_with_margin(self):
+        audio = AudioClip.from_samples(np.zeros(5 * RATE, dtype=np.float32))
+        self.assertEqual(speech_region(audio, 1.5, 3.0, margin=0.2), (int(1.3 * RATE), int(3.2 * RATE)))
+        # Clamped to the clip
+        self.assertEqual(speech_region(audio, 0.1, 4.9, margin=0.2), (0, 5 * RATE))
+    
+    def test_shift_alignments(self):
+        alignments = [{"phone": "h", "start": 0.0, "end": 0.08}, {"phone": "ɛ", "start": 0.08, "end": 0.2}]
+        shifted = shift_alignments(alignments, 1.25)
+        self.assertEqual([(a["start"], a["end"]) for a in shifted], [(1.25, 1.33), (1.33, 1.45)])
+        self.assertEqual(shifted[0]["phone"], "h")
+        self.assertIsNone(shift_alignments(None, 1.0))
+
+
+@unittest.skipUnless(HAS_DEPS, "assessment dependencies not installed")
+class TestSegmentTargetIpa(unittest.TestCase):
+    
+    def test_g2p_reuses_segment_encoder_states(self):
+        active = []
+        
+        @contextmanager
+        def shared_encoder(powsm, encoder_out=None):
+            active.append(encoder_out)
+            try:
+                yield
+            finally:
+                active.pop()
+        
+        g2p_calls = []
+        
+        def generate_target_ipa(clip, text, device=None):
+            g2p_calls.append((text, active[-1] if active else None))
+            return f"/{text}/"
+        
+        clips = [AudioClip.from_samples(np.zeros(RATE, dtype=np.float32)) for _ in range(3)]
+        recognized = [{"actual_text": "one two"}, {"actual_text": ""}, {"actual_text": "three"}]
+        with mock.patch.object(assess, "shared_encoder", shared_encoder), \
+                mock.patch.object(assess, "generate_target_ipa", generate_target_ipa), \
+                mock.patch.object(assess, "get_powsm", lambda device=None: None):
+            target_ipa = assess.segment_target_ipa(
+                clips, recognized, "one two three", "cpu", encoder_outs=["enc0", "enc1", "enc2"]
+            )
+        self.assertEqual(g2p_calls, [("one two", "enc0"), ("three", "enc2")])
+        self.assertEqual(target_ipa, "/one two//three/")
+
+
+if __name__ == "__main__":
+    unittest.main()
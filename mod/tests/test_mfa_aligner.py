@@ -0,0 +1,78 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'assessment'))
+
+from mfa_aligner import MfaAligner
+
+
+class FakeServer:
+    """Stands in for the mfa_server.py process."""
+
+    def __init__(self, responses):
+        self.stdin = mock.Mock()
+        self.responses = list(responses)
+
+    def poll(self):
+        return None
+
+    def kill(self):
+        pass
+
+    def wait(self):
+        pass
+
+
+class TestMfaAligner(unittest.TestCase):
+
+    def aligner(self, responses, timeout=5.0):
+        aligner = MfaAligner("mfa", timeout=timeout, startup_timeout=1.0)
+        server = FakeServer(responses)
+
+        def start_server():
+            aligner._process = server
+            return True
+
+        def next_response(timeout):
+            response = server.responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        aligner._start_server = start_server
+        aligner._next_response = next_response
+        return aligner
+
+    def test_alignments(self):
+        alignments = [{"phone": "h", "start": 0.0, "end": 0.1}]
+        aligner = self.aligner([{"id": 1, "alignments": alignments}])
+        self.assertEqual(aligner.align("a.wav", "h"), alignments)
+
+    def test_aligned_nothing(self):
+        self.assertEqual(self.aligner([{"id": 1, "alignments": []}]).align("a.wav", "h"), [])
+
+    def test_timeout_and_errors_fall_back(self):
+        # None: server timed out or exited; callers then run one-shot `mfa align`
+        aligner = self.aligner([None, {"id": 2, "error": "boom"}, ["not", "a", "dict"]])
+        self.assertIsNone(aligner.align("a.wav", "h"))
+        self.assertIsNone(aligner.align("a.wav", "h"))
+        self.assertIsNone(aligner.align("a.wav", "h"))
+
+    def test_unexpected_exception_does_not_block_callers(self):
+        aligner = self.aligner([KeyError("id"), {"id": 2, "alignments": []}])
+        self.assertIsNone(aligner.align("a.wav", "h"))
+        # The dispatcher keeps serving later jobs
+        self.assertEqual(aligner.align("a.wav", "h"), [])
+
+    def test_queue_timeout(self):
+        aligner = MfaAligner("mfa", timeout=0.05, startup_timeout=0.05)
+        aligner._thread = object()  # No dispatcher: the job is never picked up
+        self.assertIsNone(aligner.align("a.wav", "h"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+from array import array
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.phonemes import (
+    PhonemeInventory,
+    BASE_PHONES,
+    classify_phone,
+    DIPHTHONG,
+    VOWEL,
+    AFFRICATE,
+    STOP,
+    FRICATIVE,
+    OTHER,
+    parse_ipa_lattice,
+    parse_ipa_phonemes,
+    parse_ipa_words,
+)
+from assessment.edit_distance import edit_operations
+
+
+class TestPhonemeInventory(unittest.TestCase):
+
+    def test_encode_decode_roundtrip(self):
+        inventory = PhonemeInventory(BASE_PHONES)
+        phones = ["h", "ɛ", "l", "oʊ", "ɜ˞", "tʰ"]
+        scope = inventory.scope()
+        ids = scope.encode(phones)
+        self.assertIsInstance(ids, array)
+        self.assertEqual(ids.typecode, 'H')
+        self.assertEqual(scope.decode(ids), phones)
+        self.assertEqual(inventory.decode(ids[:4]), phones[:4])
+
+    def test_ids_are_stable(self):
+        inventory = PhonemeInventory()
+        first = inventory.intern("ʃ")
+        inventory.intern("ʒ")
+        self.assertEqual(inventory.intern("ʃ"), first)
+        self.assertEqual(len(inventory), 2)
+
+    def test_categories(self):
+        self.assertEqual(classify_phone("aɪ"), DIPHTHONG)
+        self.assertEqual(classify_phone("ɪ̃"), DIPHTHONG)
+        self.assertEqual(classify_phone("ə"), VOWEL)
+        self.assertEqual(classify_phone("tʃ"), AFFRICATE)
+        self.assertEqual(classify_phone("k"), STOP)
+        self.assertEqual(classify_phone("θ"), FRICATIVE)
+        self.assertEqual(classify_phone("ˈ"), OTHER)
+
+    def test_tables_follow_ids(self):
+        inventory = PhonemeInventory(["a", "k"])
+        scope = inventory.scope()
+        ids = scope.encode(["a", "k", "ˈ"])
+        self.assertEqual(inventory.category_of(ids[:2]), [VOWEL, STOP])
+        self.assertEqual(scope.category_of(ids), [VOWEL, STOP, OTHER])
+        self.assertEqual(scope.duration_weights(ids), [1.5, 0.7, 1.0])
+
+    def test_unknown_phones_are_not_interned(self):
+        inventory = PhonemeInventory(BASE_PHONES)
+        size = len(inventory)
+        for i in range(PhonemeInventory.MAX_PHONES + 10):
+            inventory.encode([f"x{i}", "k"])
+        self.assertEqual(len(inventory), size)
+
+    def test_unknown_phones_within_scope(self):
+        inventory = PhonemeInventory(BASE_PHONES)
+        scope = inventory.scope()
+        actual = scope.encode(["k", "qq", "ʘ"])
+        target = scope.encode(["k", "ʘ", "zz"])
+        self.assertEqual(actual[0], inventory.lookup("k"))
+        self.assertEqual(actual[2], target[1])
+        self.assertNotEqual(actual[1], target[2])
+        self.assertNotIn(actual[1], range(len(inventory)))
+        self.assertEqual(scope.decode(actual), ["k", "qq", "ʘ"])
+        self.assertIsNone(inventory.lookup("qq"))
+
+    def test_model_vocabulary(self):
+        inventory = PhonemeInventory(BASE_PHONES)
+        inventory.add_vocabulary(["<blank>", "<unk>", "/ɛ/", "/ʘ/", "hello", "//"])
+        self.assertIsNotNone(inventory.lookup("ʘ"))
+        self.assertIsNone(inventory.lookup("hello"))
+        self.assertIsNone(inventory.lookup("<unk>"))
+
+    def test_edit_operations_on_ids(self):
+        inventory = PhonemeInventory(BASE_PHONES)
+        actual = ["θ", "ɪ", "ŋ", "k"]
+        target = ["θ", "ɛ", "ŋ", "k"]
+        ops = edit_operations(inventory.encode(actual), inventory.encode(target))
+        self.assertEqual(ops, [("substitute", 1, inventory.intern("ɛ"), inventory.intern("ɪ"))])
+
+
+class TestParseIpa(unittest.TestCase):
+
+    def test_phonemes(self):
+        self.assertEqual(parse_ipa_phonemes("/h//ɛ//l//oʊ/"), ["h", "ɛ", "l", "oʊ"])
+        self.assertEqual(parse_ipa_phonemes(""), [])
+
+    def test_word_boundaries_are_not_phonemes(self):
+        ipa = "/h//ɛ//l//o//ʊ// //w//ɜ//r//l//d/"
+        self.assertEqual(parse_ipa_phonemes(ipa), ["h", "ɛ", "l", "o", "ʊ", "w", "ɜ", "r", "l", "d"])
+        self.assertEqual(parse_ipa_words("/h//ə/ /l//oʊ/"), [["h", "ə"], ["l", "oʊ"]])
+
+    def test_variants(self):
+        lattice = parse_ipa_lattice("/t//ə/|/t//u/ /m//ɑ/")
+        self.assertEqual(lattice, [[["t", "ə"], ["t", "u"]], [["m", "ɑ"]]])
+        self.assertEqual(parse_ipa_phonemes("/t//ə/|/t//u/ /m//ɑ/"), ["t", "ə", "m", "ɑ"])
+
+
+if __name__ == "__main__":
+    unittest.main()
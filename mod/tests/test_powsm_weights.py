@@ -0,0 +1,39 @@
+import json
+import tempfile
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared import powsm_weights
+from shared.powsm import POWSM_MODEL_TAG
+
+
+class TestConvertedWeights(unittest.TestCase):
+    
+    def write(self, weights_dir, manifest, weights=True):
+        with open(os.path.join(weights_dir, powsm_weights.MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f)
+        if weights:
+            open(os.path.join(weights_dir, powsm_weights.WEIGHTS_FILE), 'wb').close()
+    
+    def test_manifest_for_current_model(self):
+        with tempfile.TemporaryDirectory() as weights_dir:
+            self.write(weights_dir, {"model_tag": POWSM_MODEL_TAG, "files": {"s2t_train_config": "config.yaml"}})
+            manifest = powsm_weights.read_manifest(weights_dir)
+            self.assertEqual(manifest["files"]["s2t_train_config"], "config.yaml")
+    
+    def test_stale_or_incomplete_conversion_ignored(self):
+        with tempfile.TemporaryDirectory() as weights_dir:
+            self.write(weights_dir, {"model_tag": "other/model", "files": {}})
+            self.assertIsNone(powsm_weights.read_manifest(weights_dir))
+        with tempfile.TemporaryDirectory() as weights_dir:
+            self.write(weights_dir, {"model_tag": POWSM_MODEL_TAG, "files": {}}, weights=False)
+            self.assertIsNone(powsm_weights.read_manifest(weights_dir))
+        self.assertIsNone(powsm_weights.load_converted("cpu", weights_dir="/nonexistent"))
+
+
+if __name__ == "__main__":
+    unittest.main()
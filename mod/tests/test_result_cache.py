@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'assessment'))
+
+import result_cache
+from result_cache import ResultCache, cache_key
+
+try:
+    import assess
+    from shared.audio import AudioClip
+    HAS_ASSESS = True
+except ImportError:
+    HAS_ASSESS = False
+
+
+class TestResultCache(unittest.TestCase):
+
+    def test_memory_lru(self):
+        cache = ResultCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, {"score": key})
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), {"score": "c"})
+
+    def test_disk_tier_is_bounded(self):
+        with tempfile.TemporaryDirectory() as disk_dir:
+            cache = ResultCache(max_entries=1, disk_dir=disk_dir, max_disk_entries=3)
+            keys = [cache_key(str(i), "text", None, "v") for i in range(5)]
+            for i, key in enumerate(keys):
+                cache.put(key, {"score": i})
+                os.utime(cache._disk_path(key), (i, i))
+            cache.prune_disk()
+            stored = [key for key in keys if os.path.exists(cache._disk_path(key))]
+            self.assertEqual(stored, keys[2:])
+
+    def test_disk_tier_is_opt_in(self):
+        with mock.patch.dict(os.environ, {"ASSESSMENT_RESULT_CACHE_SIZE": "4"}), \
+                mock.patch.object(result_cache, "_cache", None), \
+                mock.patch.object(result_cache, "_cache_initialized", False):
+            os.environ.pop("ASSESSMENT_RESULT_CACHE_DIR", None)
+            self.assertIsNone(result_cache.get_result_cache().disk_dir)
+
+
+@unittest.skipUnless(HAS_ASSESS, "assessment dependencies not installed")
+class TestAssessLookup(unittest.TestCase):
+
+    def assess(self, cache, **kwargs):
+        audio = AudioClip(b"recording")
+        self.runs = getattr(self, "runs", 0)
+
+        def assess_uncached(*args):
+            self.runs += 1
+            return {"score": 1.0}
+
+        with mock.patch.object(assess, "get_result_cache", lambda: cache), \
+                mock.patch.object(assess, "resolve_alignment_method", lambda: "estimated"), \
+                mock.patch.object(assess, "_assess_uncached", assess_uncached), \
+                mock.patch("shared.tracing.INFO", False):
+            return assess.assess_audio(audio, "hello", "/h//ə/", device="cpu", **kwargs)
+
+    def test_miss_is_looked_up_once(self):
+        cache = mock.Mock(wraps=ResultCache(max_entries=4))
+        self.assess(cache, check_cache=False)
+        cache.get.assert_not_called()
+        cache.put.assert_called_once()
+        # Stored under the key cached_result() looks up
+        self.assertEqual(self.assess(cache)["score"], 1.0)
+        cache.get.assert_called_once()
+        self.assertEqual(self.runs, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+from unittest import mock
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'assessment'))
+
+try:
+    import numpy as np
+    import assess
+    from assess import analyze_frames, check_signal_quality, preflight_check
+    from shared.audio import AudioClip
+    HAS_DEPS = True
+except ImportError:
+    HAS_DEPS = False
+
+RATE = 16000
+
+
+def speech_like(seconds=2.0, level=0.3, noise=0.001):
+    """Tone bursts (speech on 70% of the time) over low noise."""
+    t = np.arange(int(seconds * RATE)) / RATE
+    on = (t % 0.5) < 0.35
+    hiss = noise * np.random.default_rng(0).standard_normal(len(t))
+    return (level * np.sin(2 * np.pi * 220 * t) * on + hiss).astype(np.float32)
+
+
+def relative_silence_ratio(audio):
+    """Silence ratio by the 1%-of-loudest-frame rule alone (before the -80 dBFS floor)."""
+    energies = analyze_frames(audio, RATE)["energies"]
+    return round(float(np.mean(energies < np.max(energies) * 0.01)), 2)
+
+
+@unittest.skipUnless(HAS_DEPS, "assessment dependencies not installed")
+class TestCheckSignalQuality(unittest.TestCase):
+
+    def test_clean_speech(self):
+        quality = check_signal_quality(speech_like(), RATE)
+        self.assertTrue(quality["is_acceptable"])
+        self.assertEqual(quality["warnings"], [])
+
+    def test_empty_recording(self):
+        quality = check_signal_quality(np.zeros(0, dtype=np.float32), RATE)
+        self.assertFalse(quality["is_acceptable"])
+        self.assertEqual(quality["warnings"], ["empty_recording"])
+        self.assertEqual(set(quality), set(check_signal_quality(speech_like(), RATE)))
+
+    def test_all_zero_is_silence(self):
+        quality = check_signal_quality(np.zeros(2 * RATE, dtype=np.float32), RATE)
+        self.assertFalse(quality["is_acceptable"])
+        self.assertIn("mostly_silence", quality["warnings"])
+        self.assertEqual(quality["silence_ratio"], 1.0)
+
+    def test_clipped(self):
+        audio = np.clip(speech_like(level=3.0), -1.0, 1.0)
+        quality = check_signal_quality(audio, RATE)
+        self.assertIn("severe_clipping", quality["warnings"])
+        self.assertFalse(quality["is_acceptable"])
+
+    def test_quiet_but_valid(self):
+        # Quiet speech (down to about -65 dBFS) with pauses of -83 to -90 dBFS
+        # noise: still usable, and pauses louder than -80 dBFS are not silence
+        # unless the relative threshold says so
+        for level, noise in ((0.01, 0.00003), (0.003, 0.00003), (0.0008, 0.00007)):
+            audio = speech_like(level=level, noise=noise)
+            quality = check_signal_quality(audio, RATE)
+            self.assertTrue(quality["is_acceptable"], level)
+            self.assertNotIn("mostly_silence", quality["warnings"])
+            # The -80 dBFS floor only applies when every frame is below it
+            self.assertEqual(quality["silence_ratio"], relative_silence_ratio(audio))
+
+
+@unittest.skipUnless(HAS_DEPS, "assessment dependencies not installed")
+class TestDurationLimits(unittest.TestCase):
+
+    def quality(self, seconds, long_form=30, cap=60):
+        with mock.patch.object(assess, "LONG_FORM_SECONDS", long_form), \
+                mock.patch.object(assess, "MAX_LONG_FORM_SECONDS", cap):
+            return check_signal_quality(speech_like(seconds), RATE)
+
+    def test_long_form_within_cap(self):
+        quality = self.quality(45)
+        self.assertTrue(quality["is_acceptable"])
+        self.assertNotIn("too_long", quality["warnings"])
+
+    def test_over_cap_is_rejected(self):
+        quality = self.quality(61)
+        self.assertFalse(quality["is_acceptable"])
+        self.assertIn("too_long", quality["warnings"])
+        with mock.patch.object(assess, "MAX_LONG_FORM_SECONDS", 60):
+            rejection = preflight_check(AudioClip.from_samples(speech_like(61)))["rejection"]
+        self.assertIn("too_long", rejection["error"])
+
+    def test_cap_disabled(self):
+        self.assertTrue(self.quality(61, cap=0)["is_acceptable"])
+
+    def test_without_long_form_only_warns(self):
+        quality = self.quality(31, long_form=0)
+        self.assertIn("too_long", quality["warnings"])
+        self.assertTrue(quality["is_acceptable"])
+
+
+@unittest.skipUnless(HAS_DEPS, "assessment dependencies not installed")
+class TestPreflightRejection(unittest.TestCase):
+
+    def test_preflight(self):
+        self.assertIsNone(preflight_check(AudioClip.from_samples(speech_like()))["rejection"])
+        rejection = preflight_check(AudioClip.from_samples(np.zeros(RATE, dtype=np.float32)))["rejection"]
+        self.assertTrue(rejection["rejected"])
+        self.assertIn("mostly_silence", rejection["error"])
+
+    def test_assess_audio_rejects_without_models(self):
+        def no_models(device=None):
+            raise AssertionError("model used for a rejected recording")
+
+        with mock.patch.object(assess, "get_models", no_models), \
+                mock.patch.object(assess, "get_powsm", no_models), \
+                mock.patch.object(assess, "get_result_cache", lambda: None), \
+                mock.patch("shared.tracing.INFO", False):
+            for speech in (np.zeros(0, dtype=np.float32), np.zeros(RATE, dtype=np.float32)):
+                result = assess.assess_audio(AudioClip.from_samples(speech), "hello", device="cpu")
+                self.assertEqual(set(result), {"error", "rejected", "signal_quality", "timings"})
+                self.assertTrue(result["rejected"])
+                self.assertFalse(result["signal_quality"]["is_acceptable"])
+                self.assertTrue(result["error"].startswith("Recording rejected: "))
+
+
+if __name__ == "__main__":
+    unittest.main()
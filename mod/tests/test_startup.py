@@ -0,0 +1,59 @@
+import io
+import contextlib
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+if HAS_NUMPY:
+    from shared.startup import boot_worker, synthetic_utterance
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class TestBootWorker(unittest.TestCase):
+    
+    def boot(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            timings = boot_worker(**kwargs)
+        return timings, out.getvalue()
+    
+    def test_synthetic_utterance(self):
+        speech = synthetic_utterance(seconds=0.5)
+        self.assertEqual(speech.dtype, np.float32)
+        self.assertEqual(len(speech), 8000)
+        self.assertLess(np.abs(speech).max(), 1.0)
+        self.assertGreater(np.abs(speech).max(), 0.05)
+    
+    def test_phases_and_warm_up(self):
+        calls = []
+        timings, out = self.boot(
+            load_models=lambda: calls.append("load"),
+            warm_up=lambda speech: calls.append(("warm", len(speech))),
+            background={"index": lambda: calls.append("index")},
+        )
+        self.assertIn("load", calls)
+        self.assertIn("index", calls)
+        self.assertIn(("warm", 16000), calls)
+        for phase in ("load_models", "warmup", "index", "total"):
+            self.assertIn(phase, timings)
+        self.assertIn("STARTUP:", out)
+    
+    def test_failed_step_does_not_stop_boot(self):
+        def fail(*args):
+            raise RuntimeError("boom")
+        timings, out = self.boot(load_models=lambda: None, warm_up=fail, background={"mfa": fail})
+        self.assertIn("ERROR: Startup step mfa failed: boom", out)
+        self.assertIn("ERROR: Startup step warmup failed: boom", out)
+        self.assertIn("total", timings)
+
+
+if __name__ == "__main__":
+    unittest.main()
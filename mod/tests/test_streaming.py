@@ -0,0 +1,156 @@
+import unittest
+from unittest import mock
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'assessment'))
+
+try:
+    import numpy as np
+    import streaming
+    from streaming import SpeechSegmenter, StreamingSession
+    HAS_DEPS = True
+except ImportError:
+    HAS_DEPS = False
+
+try:
+    from stream_server import is_end_message
+    HAS_SERVER_DEPS = True
+except ImportError:
+    HAS_SERVER_DEPS = False
+
+RATE = 16000
+CHUNK = RATE // 10  # 100ms messages
+
+
+def bursts(seconds, speech=4.0, pause=0.5):
+    """Tone bursts of speech seconds separated by pause seconds of near-silence."""
+    t = np.arange(int(seconds * RATE)) / RATE
+    on = (t % (speech + pause)) < speech
+    noise = 0.001 * np.random.default_rng(0).standard_normal(len(t))
+    return (0.3 * np.sin(2 * np.pi * 220 * t) * on + noise).astype(np.float32)
+
+
+def to_pcm(audio):
+    return (audio * 32767).astype('<i2').tobytes()
+
+
+@unittest.skipUnless(HAS_DEPS, "assessment dependencies not installed")
+class TestSpeechSegmenter(unittest.TestCase):
+
+    def stream(self, audio, segmenter):
+        """(samples received when completed, segment) for every segment, then the flushed ones."""
+        completed = []
+        for offset in range(0, len(audio), CHUNK):
+            completed += [(offset + CHUNK, segment) for segment in segmenter.feed(audio[offset:offset + CHUNK])]
+        return completed, segmenter.flush()
+
+    def test_segments_close_at_pauses_while_streaming(self):
+        completed, flushed = self.stream(bursts(14), SpeechSegmenter(RATE, pause_seconds=0.3, pad_seconds=0.2))
+        self.assertEqual(len(completed), 3)
+        for received, (start, end) in completed:
+            # Closed within the pause that follows the burst, before the next one
+            self.assertLessEqual(received, end + 0.5 * RATE)
+        bounds = [(start / RATE, end / RATE) for _, (start, end) in completed]
+        for (start, end), burst_start in zip(bounds, (0.0, 4.5, 9.0)):
+            self.assertAlmostEqual(start, max(0.0, burst_start - 0.2), delta=0.02)
+            self.assertAlmostEqual(end, burst_start + 4.2, delta=0.02)
+        # The last burst (from 13.5s) is still open when the stream ends
+        self.assertEqual(flushed, [(int(13.3 * RATE), 14 * RATE)])
+
+    def test_open_segment_is_flushed(self):
+        audio = bursts(3)
+        completed, flushed = self.stream(audio, SpeechSegmenter(RATE))
+        self.assertEqual(completed, [])
+        self.assertEqual(flushed, [(0, len(audio))])
+
+    def test_silence_has_no_segments(self):
+        audio = 0.001 * np.random.default_rng(0).standard_normal(5 * RATE).astype(np.float32)
+        self.assertEqual(self.stream(audio, SpeechSegmenter(RATE)), ([], []))
+
+    def test_long_speech_is_cut_at_max_segment(self):
+        completed, flushed = self.stream(bursts(10, speech=10.0), SpeechSegmenter(RATE, max_segment_seconds=3))
+        segments = [segment for _, segment in completed] + flushed
+        self.assertEqual(segments[0][0], 0)
+        for (_, end), (start, _) in zip(segments, segments[1:]):
+            self.assertEqual(end, start)
+        for start, end in segments:
+            self.assertLessEqual(end - start, 3 * RATE)
+
+
+@unittest.skipUnless(HAS_DEPS, "assessment dependencies not installed")
+class TestStreamingSession(unittest.TestCase):
+
+    def setUp(self):
+        def recognize_utterance(clip, target_text, target_ipa, device, alignment_method, encoder_out=None):
+            return {
+                "actual_ipa": "/a/",
+                "ctc_alignments": [{"phone": "a", "start": 0.5, "end": 0.6}],
+                "target_ipa": target_ipa,
+                "actual_text_raw": "a",
+                "actual_text": "a",
+            }
+
+        def score_assessment(audio, target_text, recognized, preflight, alignment_method):
+            return {"recognized": recognized, "duration": audio.duration}
+
+        for name, value in (
+            ("recognize_utterance", recognize_utterance),
+            ("score_assessment", score_assessment),
+            ("resolve_alignment_method", lambda: "ctc"),
+        ):
+            patcher = mock.patch.object(streaming, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # No TIMINGS lines in the test output
+        patcher = mock.patch("shared.tracing.INFO", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_recognizes_segments_during_stream_and_stitches(self):
+        session = StreamingSession("a a a", target_ipa="/a//a//a/", device="cpu")
+        pcm = to_pcm(bursts(13))
+        events = []
+        # Odd-sized messages: samples may be split across them
+        for offset in range(0, len(pcm), 3201):
+            for segment in session.feed(pcm[offset:offset + 3201]):
+                events.append(session.recognize(segment))
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[0]["type"], "segment")
+        self.assertAlmostEqual(events[1]["start"], 4.3, delta=0.02)
+
+        result = session.finish()
+        self.assertAlmostEqual(result["duration"], 13.0, places=3)
+        recognized = result["recognized"]
+        self.assertEqual(recognized["actual_ipa"], "/a//a//a/")
+        self.assertEqual(recognized["target_ipa"], "/a//a//a/")
+        starts = [alignment["start"] for alignment in recognized["ctc_alignments"]]
+        self.assertEqual(starts, [0.5, 4.8, 9.3])
+        self.assertIn("stream", result["timings"])
+
+    def test_rejects_other_sample_rates(self):
+        with self.assertRaises(ValueError):
+            StreamingSession("a", target_ipa="/a/", sample_rate=44100, device="cpu")
+
+    def test_silent_stream_is_rejected(self):
+        session = StreamingSession("a", target_ipa="/a/", device="cpu")
+        session.feed(to_pcm(np.zeros(2 * RATE, dtype=np.float32)))
+        result = session.finish()
+        self.assertTrue(result["rejected"])
+
+
+@unittest.skipUnless(HAS_SERVER_DEPS, "streaming server dependencies not installed")
+class TestStreamProtocol(unittest.TestCase):
+
+    def test_end_message(self):
+        self.assertTrue(is_end_message('{"type": "end"}'))
+
+    def test_other_text_is_ignored(self):
+        for text in (None, "", "ping", "{", "[1, 2]", '"end"', "null", '{"type": "ping"}'):
+            self.assertFalse(is_end_message(text), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
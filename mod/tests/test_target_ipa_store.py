@@ -0,0 +1,137 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'assessment'))
+
+import target_ipa_store
+from target_ipa_store import TargetIpaStore, build_index, normalize_text, practice_records
+
+try:
+    import numpy as np
+    import assess
+    from shared.audio import AudioClip
+    HAS_ASSESS = True
+except ImportError:
+    HAS_ASSESS = False
+
+
+class StoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.path = os.path.join(self.directory, "index.json")
+
+
+class TestLookup(StoreTestCase):
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("  The weather,  looks NICE outside! "), "the weather looks nice outside")
+        self.assertEqual(normalize_text("I'm here."), "i'm here")
+
+    def test_hit_after_normalization(self):
+        store = TargetIpaStore(self.path)
+        store.put("The weather looks nice outside.", "/ð//ə/ /w//ɛ//ð//ɚ/")
+        self.assertEqual(store.get("the weather   looks nice outside"), "/ð//ə/ /w//ɛ//ð//ɚ/")
+        self.assertIn("THE WEATHER LOOKS NICE OUTSIDE", store)
+
+    def test_miss(self):
+        store = TargetIpaStore(self.path)
+        store.put("Hello", "/h//ɛ//l//oʊ/")
+        self.assertIsNone(store.get("Hello there"))
+        self.assertIsNone(TargetIpaStore(os.path.join(self.directory, "missing.json")).get("Hello"))
+
+    def test_persists(self):
+        store = TargetIpaStore(self.path)
+        store.put("Hello", "/h//ɛ//l//oʊ/")
+        store.save()
+        self.assertEqual(TargetIpaStore(self.path).get("hello"), "/h//ɛ//l//oʊ/")
+
+    def test_lookup_uses_worker_store(self):
+        store = TargetIpaStore(self.path)
+        store.put("Hello", "/h//ɛ//l//oʊ/")
+        with mock.patch.object(target_ipa_store, "_store", store):
+            self.assertEqual(target_ipa_store.lookup_target_ipa("hello!"), "/h//ɛ//l//oʊ/")
+            self.assertIsNone(target_ipa_store.lookup_target_ipa("goodbye"))
+
+
+class TestIndexRevision(StoreTestCase):
+
+    def test_revision_follows_content(self):
+        store = TargetIpaStore(self.path)
+        empty = store.revision()
+        store.put("Hello", "/h//ɛ//l//oʊ/")
+        self.assertNotEqual(store.revision(), empty)
+        store.save()
+        self.assertEqual(TargetIpaStore(store.path).revision(), store.revision())
+
+
+class TestBuildIndex(StoreTestCase):
+
+    def test_records_with_ipa(self):
+        store = TargetIpaStore(self.path)
+        added, skipped = build_index([
+            {"text": "Hello", "ipa_tokens": ["h", "ɛ", "l", "oʊ"]},
+            {"content": "Go home", "word_ipa_tokens": [["ɡ", "oʊ"], ["h", "oʊ", "m"]]},
+            {"text": "No IPA"},
+        ], store)
+        self.assertEqual(added, 2)
+        self.assertEqual(skipped, ["No IPA"])
+        self.assertEqual(store.get("go home"), "/ɡ//oʊ/ /h//oʊ//m/")
+
+    def test_practice_catalogue_with_g2p(self):
+        catalogue = [{"content": "I need milk."}, {"difficulty": "beginner"}, {"content": "Nice weather."}]
+        with open(os.path.join(self.directory, "3.wav"), "wb"):
+            pass
+        records = practice_records(catalogue, self.directory)
+        self.assertEqual(records[0], {"text": "I need milk."})
+        self.assertTrue(records[1]["audio_uri"].endswith("3.wav"))
+
+        store = TargetIpaStore(self.path)
+        with mock.patch.object(target_ipa_store, "_g2p_without_audio", lambda text: "/a/"):
+            added, skipped = build_index(records[:1], store, text_only=True)
+        self.assertEqual((added, skipped), (1, []))
+        self.assertEqual(store.get("i need milk"), "/a/")
+
+
+@unittest.skipUnless(HAS_ASSESS, "assessment dependencies not installed")
+class TestAssessUsesIndex(unittest.TestCase):
+
+    class Task:
+        def __init__(self, output):
+            self.output = output
+            self.calls = 0
+
+        def __call__(self, speech, text_prev=None):
+            self.calls += 1
+            return [(self.output,)]
+
+    class Model:
+        def encode(self, *args, **kwargs):
+            return None
+
+    def test_index_hit_skips_g2p(self):
+        pr, g2p, asr = self.Task("/h//ɛ//l//oʊ/"), self.Task("/x/"), self.Task("hello")
+        powsm = mock.Mock(s2t_model=self.Model())
+        t = np.arange(16000) / 16000
+        speech = (0.3 * np.sin(2 * np.pi * 220 * t) * ((t > 0.2) & (t < 0.8))).astype(np.float32)
+        with mock.patch.object(assess, "get_models", lambda device=None: (pr, g2p, asr)), \
+                mock.patch.object(assess, "get_powsm", lambda device=None: powsm), \
+                mock.patch.object(assess, "get_result_cache", lambda: None), \
+                mock.patch.object(assess, "resolve_alignment_method", lambda: "estimated"), \
+                mock.patch.object(assess, "lookup_target_ipa", lambda text: "/h//ə//l//oʊ/"), \
+                mock.patch("shared.tracing.INFO", False):
+            result = assess.assess_audio(AudioClip.from_samples(speech), "hello", device="cpu")
+        self.assertEqual(g2p.calls, 0)
+        self.assertEqual(pr.calls, 1)
+        self.assertEqual(result["target_ipa"], "/h//ə//l//oʊ/")
+
+
+if __name__ == "__main__":
+    unittest.main()
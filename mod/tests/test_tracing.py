@@ -0,0 +1,89 @@
+import asyncio
+import contextlib
+import io
+import unittest
+from unittest import mock
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.tracing import LatencyHistogram, Trace, current_trace, span
+
+
+class TestTrace(unittest.TestCase):
+    
+    def test_spans_sum_per_stage(self):
+        trace = Trace()
+        trace.add("edit_distance", 0.002)
+        trace.add("edit_distance", 0.003)
+        trace.add("pr", 0.1)
+        timings = trace.timings()
+        self.assertEqual(timings["edit_distance"], 5.0)
+        self.assertEqual(timings["pr"], 100.0)
+        self.assertIn("total", timings)
+    
+    def test_span_records_into_active_trace(self):
+        trace = Trace()
+        self.assertIsNone(current_trace())
+        with trace.activate():
+            self.assertIs(current_trace(), trace)
+            with span("decode"):
+                pass
+        self.assertIsNone(current_trace())
+        self.assertIn("decode", trace.timings())
+    
+    def test_trace_follows_to_thread(self):
+        trace = Trace()
+        
+        def stage():
+            with span("asr"):
+                pass
+        
+        async def job():
+            with trace.activate():
+                await asyncio.to_thread(stage)
+        
+        asyncio.run(job())
+        self.assertIn("asr", trace.timings())
+
+
+class TestTraceLog(unittest.TestCase):
+    
+    def finish(self, info):
+        output = io.StringIO()
+        with mock.patch("shared.tracing.INFO", info), contextlib.redirect_stdout(output):
+            timings = Trace().finish()
+        return timings, output.getvalue()
+    
+    def test_timings_logged_at_info(self):
+        _, output = self.finish(True)
+        self.assertTrue(output.startswith("TIMINGS: "))
+    
+    def test_quiet_above_info(self):
+        timings, output = self.finish(False)
+        self.assertIn("total", timings)
+        self.assertEqual(output, "")
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    
+    def test_summary(self):
+        histogram = LatencyHistogram()
+        for ms in [3, 8, 8, 40, 90, 400, 22000]:
+            histogram.observe(ms)
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 7)
+        self.assertEqual(summary["p50_ms"], 50)
+        self.assertEqual(summary["p95_ms"], 30000)
+        self.assertEqual(summary["max_ms"], 22000)
+    
+    def test_open_bucket_reports_max(self):
+        histogram = LatencyHistogram()
+        histogram.observe(45000)
+        self.assertEqual(histogram.quantile(0.5), 45000)
+
+
+if __name__ == "__main__":
+    unittest.main()